@@ -1,6 +1,7 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+import asyncio
 import json
 import os
 from datetime import datetime
@@ -30,6 +31,25 @@ app.include_router(consents.router, prefix="/consents", tags=["consents"])
 app.include_router(access_logs.router, prefix="/access-logs", tags=["access-logs"])
 app.include_router(yarn_adapter.router, prefix="/yarn", tags=["yarn-gpt"])
 
+@app.on_event("startup")
+async def startup():
+    app.state.access_log_maintenance = asyncio.create_task(access_logs.run_access_log_maintenance())
+    app.state.consent_snapshots = asyncio.create_task(consents.run_consent_snapshots())
+    app.state.consent_expiry = asyncio.create_task(consents.run_consent_expiry())
+    app.state.trust_score_refresh = asyncio.create_task(orgs.run_trust_score_refresh())
+    app.state.google_key_refresh = asyncio.create_task(auth.run_google_key_refresh())
+
+@app.on_event("shutdown")
+async def shutdown():
+    app.state.access_log_maintenance.cancel()
+    app.state.consent_snapshots.cancel()
+    app.state.consent_expiry.cancel()
+    app.state.trust_score_refresh.cancel()
+    app.state.google_key_refresh.cancel()
+    access_logs.close_segments()
+    consents.CONSENT_EVENTS.close()
+    auth.PASSWORD_HASHER.shutdown()
+
 # Load seed data
 def load_seed_data():
     seed_file = os.path.join(os.path.dirname(__file__), "seed_data.json")
@@ -1,9 +1,27 @@
-from fastapi import APIRouter, HTTPException, Query
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, ValidationError
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple
 from datetime import datetime, timedelta
+from collections import Counter
+from itertools import islice
+import csv
+import io
+import asyncio
+import json
+import os
 import uuid
 
+from ..services.access_log_feed import AccessLogFeed
+from ..services.access_log_columns import ACCESS_LOG_STATUSES, MICROS, format_micros, to_micros
+from ..services.access_log_history import SegmentHistory
+from ..services.access_log_index import decode_cursor, encode_cursor, parse_timestamp
+from ..services.access_log_partitions import PartitionedAccessLogs
+from ..services.access_log_rollups import DAY_SECONDS, AccessLogRollups, day_of
+from ..services.access_log_segments import SegmentLog
+from .consents import CONSENT_DECISIONS
+from .orgs import ORG_CATALOG, TRUST_SCORES
+
 router = APIRouter()
 
 class AccessLog(BaseModel):
@@ -21,7 +39,19 @@ class AccessLog(BaseModel):
 
 class AccessLogResponse(BaseModel):
     access_logs: List[AccessLog]
-    total: int
+    total: int  # all matching logs in the lookback window, not just this page
+    next_cursor: Optional[str] = None  # pass as `before` to fetch older logs
+    prev_cursor: Optional[str] = None  # pass as `after` to fetch newer logs
+
+class AccessLogCreate(BaseModel):
+    user_id: str
+    organization_id: str
+    data_type: str
+    purpose: str
+    status: str = "approved"
+    timestamp: Optional[str] = None  # defaults to the time the batch is received
+    ip_address: Optional[str] = None
+    user_agent: Optional[str] = None
 
 class AccessLogStats(BaseModel):
     total_accesses: int
@@ -165,6 +195,286 @@ DEMO_ACCESS_LOGS = [
     }
 ]
 
+# Access log storage settings:
+#   ACCESS_LOG_PARTITION - "day" or "week" partitions
+#   ACCESS_LOG_RETENTION_DAYS - drop partitions older than this (unset keeps everything)
+#   ACCESS_LOG_DATA_DIR - persist logs in append-only segment files instead of
+#     reloading the seed data on startup (unset keeps logs in memory only)
+#   ACCESS_LOG_MEMORY_DAYS - with ACCESS_LOG_DATA_DIR, keep only this many recent days
+#     in memory; older pages are read straight from the segment files
+ACCESS_LOG_PARTITION = os.environ.get("ACCESS_LOG_PARTITION", "day")
+ACCESS_LOG_RETENTION_DAYS = int(os.environ.get("ACCESS_LOG_RETENTION_DAYS", "0")) or None
+ACCESS_LOG_DATA_DIR = os.environ.get("ACCESS_LOG_DATA_DIR")
+ACCESS_LOG_MEMORY_DAYS = int(os.environ.get("ACCESS_LOG_MEMORY_DAYS", "30")) or None
+
+# Access logs live in time partitions, each a columnar store behind a per-user,
+# time-ordered index, with per-day rollups alongside; _record_access_logs keeps
+# them and the segment files in step. DEMO_ACCESS_LOGS is only seed data.
+ACCESS_LOG_SEGMENTS = SegmentLog(ACCESS_LOG_DATA_DIR) if ACCESS_LOG_DATA_DIR else None
+ACCESS_LOG_ROLLUPS = AccessLogRollups()
+ACCESS_LOG_STORE = PartitionedAccessLogs(
+    ORG_CATALOG.details,
+    partition=ACCESS_LOG_PARTITION,
+    retention_days=ACCESS_LOG_RETENTION_DAYS,
+    history=SegmentHistory(ACCESS_LOG_SEGMENTS, ORG_CATALOG.details, ACCESS_LOG_ROLLUPS) if ACCESS_LOG_SEGMENTS else None,
+    memory_days=ACCESS_LOG_MEMORY_DAYS
+)
+# Columns cache each org's name and logo; drop them when the catalog changes
+ORG_CATALOG.on_change(lambda org_ids: ACCESS_LOG_STORE.forget_organization_details())
+
+# Live feed for /access-logs/stream subscribers
+ACCESS_LOG_FEED = AccessLogFeed()
+
+# Number of NDJSON rows validated and stored together while a batch streams in
+BATCH_CHUNK_SIZE = 1000
+
+# Number of rows serialized into each chunk of an export stream
+EXPORT_CHUNK_SIZE = 500
+
+EXPORT_FIELDS = list(AccessLog.model_fields)
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv"
+}
+
+# Seconds between keep-alive comments on idle live-feed streams
+STREAM_HEARTBEAT_SECONDS = 15
+
+# Most logs replayed to a live-feed client resuming from Last-Event-ID
+STREAM_REPLAY_LIMIT = 1000
+
+def _index_access_log(log: dict, timestamp: float) -> None:
+    """Add a stored access log to the in-memory structures"""
+    ACCESS_LOG_STORE.add(log, timestamp)
+    ACCESS_LOG_ROLLUPS.add(log, timestamp)
+    TRUST_SCORES.record_access(
+        log["organization_id"],
+        log["status"],
+        out_of_consent=not CONSENT_DECISIONS.allowed(log["user_id"], log["organization_id"], log["data_type"])
+    )
+
+def _record_access_log(log: dict) -> None:
+    """Store a new access log and update every structure derived from it"""
+    _record_access_logs([(log, parse_timestamp(log["timestamp"]))])
+
+def _record_access_logs(entries: List[Tuple[dict, float]]) -> None:
+    """Store many (log, epoch timestamp) pairs in one pass"""
+    if ACCESS_LOG_SEGMENTS is not None:
+        ACCESS_LOG_SEGMENTS.append((log, to_micros(timestamp)) for log, timestamp in entries)
+    for log, timestamp in entries:
+        _index_access_log(log, timestamp)
+        ACCESS_LOG_FEED.publish(log["user_id"], log["id"], lambda: _encode_stream_event(log, timestamp))
+
+def _encode_stream_event(log: dict, timestamp: float) -> str:
+    """
+    Server-Sent Event for a log, using its cursor as the event id.
+    
+    The payload is the log as the store returns it (UTC "Z" timestamp,
+    current organization details), so a live event and the same log
+    replayed after a reconnect are identical.
+    """
+    micros = to_micros(timestamp)
+    organization_name, organization_logo = ORG_CATALOG.details(log["organization_id"])
+    row = dict(log, timestamp=format_micros(micros), organization_name=organization_name, organization_logo=organization_logo)
+    data = json.dumps({field: row.get(field) for field in EXPORT_FIELDS})
+    return f"id: {encode_cursor((micros, log['id']))}\nevent: access_log\ndata: {data}\n\n"
+
+async def _iter_stream_events(user_id: str, last_event_id: Optional[str]) -> AsyncIterator[str]:
+    """Replay anything missed since `last_event_id`, then relay live events until dropped or disconnected"""
+    subscription = ACCESS_LOG_FEED.subscribe(user_id)
+    try:
+        replayed = set()
+        if last_event_id:
+            try:
+                after = decode_cursor(last_event_id)
+            except ValueError:
+                after = None
+            if after is not None:
+                # Fetched whole before the first yield; the index may change while the client reads
+                missed = list(islice(
+                    ACCESS_LOG_STORE.iter_recent(user_id, float("-inf"), after=after, ascending=True), STREAM_REPLAY_LIMIT + 1
+                ))
+                for log in missed[:STREAM_REPLAY_LIMIT]:
+                    timestamp = parse_timestamp(log["timestamp"])
+                    after = (to_micros(timestamp), log["id"])
+                    replayed.add(log["id"])
+                    yield _encode_stream_event(log, timestamp)
+                if len(missed) > STREAM_REPLAY_LIMIT:
+                    # Too much to replay; the client pages the rest through the list endpoint
+                    yield f"event: truncated\ndata: {json.dumps({'after': encode_cursor(after)})}\n\n"
+                    return
+        
+        while True:
+            if subscription.dropped and subscription.queue.empty():
+                yield "event: dropped\ndata: {}\n\n"
+                return
+            try:
+                log_id, event = await asyncio.wait_for(subscription.queue.get(), STREAM_HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if log_id not in replayed:
+                yield event
+    finally:
+        ACCESS_LOG_FEED.unsubscribe(subscription)
+
+def _retention_cutoff() -> Optional[float]:
+    """Oldest timestamp still inside the retention window, if retention is configured"""
+    if ACCESS_LOG_RETENTION_DAYS is None:
+        return None
+    return (datetime.now() - timedelta(days=ACCESS_LOG_RETENTION_DAYS)).timestamp()
+
+def maintain_access_logs() -> dict:
+    """Drop expired partitions, rollups and segments, evict aged-out partitions from memory, then compact small ones"""
+    now = datetime.now().timestamp()
+    expired = ACCESS_LOG_STORE.drop_expired(now)
+    evicted = ACCESS_LOG_STORE.evict(now)
+    cutoff = _retention_cutoff()
+    if cutoff is not None:
+        ACCESS_LOG_ROLLUPS.drop_before(day_of(cutoff))
+        if ACCESS_LOG_SEGMENTS is not None:
+            ACCESS_LOG_SEGMENTS.drop_before(to_micros(cutoff))
+    return {
+        "expired_logs": expired,
+        "evicted_logs": evicted,
+        "merged_partitions": ACCESS_LOG_STORE.compact(now),
+        "partitions": len(ACCESS_LOG_STORE.partitions)
+    }
+
+async def run_access_log_maintenance(interval: float = 3600) -> None:
+    """Background job started by the app: apply retention and compaction every `interval` seconds"""
+    while True:
+        maintain_access_logs()
+        await asyncio.sleep(interval)
+
+def close_segments() -> None:
+    """Flush and seal the active access log segment on shutdown"""
+    if ACCESS_LOG_SEGMENTS is not None:
+        ACCESS_LOG_SEGMENTS.close()
+
+def _build_access_log(item, organizations: Dict[str, dict], received_at: str) -> dict:
+    """Validate one batch item and turn it into a stored log, raising ValueError if it is invalid"""
+    if isinstance(item, bytes):
+        try:
+            item = item.decode("utf-8")
+        except UnicodeDecodeError:
+            raise ValueError("Line is not valid UTF-8")
+    if isinstance(item, str):
+        try:
+            item = json.loads(item)
+        except ValueError as exc:
+            raise ValueError(f"Invalid JSON: {exc}")
+    if not isinstance(item, dict):
+        raise ValueError("Expected a JSON object")
+    
+    try:
+        entry = AccessLogCreate(**item)
+    except ValidationError as exc:
+        raise ValueError("; ".join(
+            f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" for error in exc.errors()
+        ))
+    
+    if entry.status not in ACCESS_LOG_STATUSES:
+        raise ValueError(f"status: must be one of {', '.join(sorted(ACCESS_LOG_STATUSES))}")
+    
+    org = organizations.get(entry.organization_id)
+    return {
+        "id": f"log_{uuid.uuid4().hex[:8]}",
+        "user_id": entry.user_id,
+        "organization_id": entry.organization_id,
+        "organization_name": org["name"] if org else "Unknown Organization",
+        "organization_logo": org["logo"] if org else "business",
+        "data_type": entry.data_type,
+        "purpose": entry.purpose,
+        "timestamp": entry.timestamp or received_at,
+        "status": entry.status,
+        "ip_address": entry.ip_address,
+        "user_agent": entry.user_agent
+    }
+
+def _ingest_batch(
+    items: list,
+    first_index: int,
+    organizations: Dict[str, dict],
+    received_at: str,
+    line_numbers: Optional[List[int]] = None
+) -> List[dict]:
+    """Validate and store a chunk of batch items, returning one result per item"""
+    results = []
+    entries = []
+    for offset, item in enumerate(items):
+        result = {"index": first_index + offset}
+        if line_numbers is not None:
+            result["line"] = line_numbers[offset]
+        try:
+            log = _build_access_log(item, organizations, received_at)
+            entries.append((log, parse_timestamp(log["timestamp"])))
+        except ValueError as exc:
+            result.update(success=False, error=str(exc))
+        else:
+            result.update(success=True, log_id=log["id"])
+        results.append(result)
+    
+    _record_access_logs(entries)
+    return results
+
+def _iter_export_chunks(user_id: str, format: str) -> Iterator[str]:
+    """
+    Serialize a user's full history oldest first, a chunk of rows at a time.
+    
+    Each chunk is fetched whole by keyset, after the (timestamp, id) of the
+    last row sent, so rows stored or compacted while the client reads are
+    neither repeated nor skipped.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS, extrasaction="ignore")
+    if format == "csv":
+        writer.writeheader()
+    
+    after = None
+    while True:
+        logs = list(islice(
+            ACCESS_LOG_STORE.iter_recent(user_id, float("-inf"), after=after, ascending=True), EXPORT_CHUNK_SIZE
+        ))
+        for log in logs:
+            if format == "csv":
+                writer.writerow(log)
+            else:
+                buffer.write(json.dumps({field: log.get(field) for field in EXPORT_FIELDS}))
+                buffer.write("\n")
+        if buffer.tell():
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+        if len(logs) < EXPORT_CHUNK_SIZE:
+            return
+        after = ACCESS_LOG_STORE.key_of(logs[-1])
+
+# Startup reads every retained record once for the rollups and trust scores;
+# the store keeps only those inside its in-memory window
+if ACCESS_LOG_SEGMENTS is not None and ACCESS_LOG_SEGMENTS.records:
+    _cutoff = _retention_cutoff()
+    for _log, _micros in ACCESS_LOG_SEGMENTS.scan(None if _cutoff is None else to_micros(_cutoff)):
+        _log["organization_name"], _log["organization_logo"] = ORG_CATALOG.details(_log["organization_id"])
+        _index_access_log(_log, _micros / MICROS)
+else:
+    _record_access_logs([(log, parse_timestamp(log["timestamp"])) for log in DEMO_ACCESS_LOGS])
+
+async def _iter_ndjson_lines(request: Request) -> AsyncIterator[Tuple[int, bytes]]:
+    """Yield (1-based line number, raw line) for non-blank lines of a streamed NDJSON request body"""
+    buffer = b""
+    line_number = 0
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            line_number += 1
+            if line.strip():
+                yield line_number, line
+    if buffer.strip():
+        yield line_number + 1, buffer
+
 @router.get("/", response_model=AccessLogResponse)
 async def get_access_logs(
     user_id: str = Query(...),
@@ -172,48 +482,93 @@ async def get_access_logs(
     status: Optional[str] = Query(None),
     data_type: Optional[str] = Query(None),
     days: int = Query(30, description="Number of days to look back"),
-    limit: int = Query(50, description="Maximum number of logs to return")
+    limit: int = Query(50, description="Maximum number of logs to return"),
+    before: Optional[str] = Query(None, description="Cursor: return logs older than this one"),
+    after: Optional[str] = Query(None, description="Cursor: return logs newer than this one")
 ):
-    """Get access logs for a user with optional filtering"""
+    """Get access logs for a user with optional filtering and cursor pagination"""
     
-    # Filter by user
-    logs = [log for log in DEMO_ACCESS_LOGS if log["user_id"] == user_id]
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either before or after, not both")
     
-    # Apply filters
-    if organization_id:
-        logs = [log for log in logs if log["organization_id"] == organization_id]
+    try:
+        before_key = decode_cursor(before) if before else None
+        after_key = decode_cursor(after) if after else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     
-    if status:
-        logs = [log for log in logs if log["status"] == status]
+    since = (datetime.now() - timedelta(days=days)).timestamp()
+    filters = {"organization_id": organization_id, "status": status, "data_type": data_type}
     
-    if data_type:
-        logs = [log for log in logs if log["data_type"] == data_type]
+    # Walk from the cursor position, taking one past the limit to learn whether more remain.
+    # An `after` page walks forward from the cursor so it returns the logs immediately newer than it.
+    ascending = after_key is not None
+    logs = list(islice(
+        ACCESS_LOG_STORE.iter_recent(user_id, since, before=before_key, after=after_key, ascending=ascending, **filters),
+        max(limit, 0) + 1
+    ))
+    has_more = len(logs) > limit
+    logs = logs[:max(limit, 0)]
     
-    # Filter by date range
-    cutoff_date = datetime.now() - timedelta(days=days)
-    logs = [
-        log for log in logs 
-        if datetime.fromisoformat(log["timestamp"].replace('Z', '+00:00')) >= cutoff_date
-    ]
+    if ascending:
+        logs.reverse()
     
-    # Sort by timestamp (most recent first)
-    logs.sort(key=lambda x: x["timestamp"], reverse=True)
+    # Count the whole window separately so the total doesn't depend on the page
+    total = ACCESS_LOG_STORE.count(user_id, since, **filters)
     
-    # Apply limit
-    logs = logs[:limit]
+    next_cursor = None
+    if logs and (has_more or ascending):
+        next_cursor = encode_cursor(ACCESS_LOG_STORE.key_of(logs[-1]))
+    prev_cursor = encode_cursor(ACCESS_LOG_STORE.key_of(logs[0])) if logs else after
     
     return AccessLogResponse(
         access_logs=[AccessLog(**log) for log in logs],
-        total=len(logs)
+        total=total,
+        next_cursor=next_cursor,
+        prev_cursor=prev_cursor
+    )
+
+@router.get("/export")
+async def export_access_logs(
+    user_id: str = Query(...),
+    format: str = Query("ndjson", description="Export format: ndjson or csv")
+):
+    """Stream a user's complete access history for data-subject access requests"""
+    
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail="Format must be ndjson or csv")
+    
+    return StreamingResponse(
+        _iter_export_chunks(user_id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="access_logs_{user_id}.{format}"'}
+    )
+
+@router.get("/stream")
+async def stream_access_logs(request: Request, user_id: str = Query(...)):
+    """
+    Live feed of a user's new access logs as Server-Sent Events.
+    
+    Clients that reconnect with a Last-Event-ID header first receive the
+    logs they missed. If more than STREAM_REPLAY_LIMIT were missed, the
+    replay ends with a `truncated` event whose `after` cursor continues
+    through the list endpoint, and the stream closes. A client that falls
+    too far behind live events receives a `dropped` event and is disconnected.
+    """
+    
+    return StreamingResponse(
+        _iter_stream_events(user_id, request.headers.get("last-event-id")),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 @router.get("/{log_id}", response_model=AccessLog)
 async def get_access_log(log_id: str):
     """Get specific access log details"""
     
-    for log in DEMO_ACCESS_LOGS:
-        if log["id"] == log_id:
-            return AccessLog(**log)
+    log = ACCESS_LOG_STORE.get(log_id)
+    if log:
+        return AccessLog(**log)
     
     raise HTTPException(status_code=404, detail="Access log not found")
 
@@ -224,52 +579,37 @@ async def get_access_stats(
 ):
     """Get access statistics for a user"""
     
-    # Filter logs for user and date range
-    cutoff_date = datetime.now() - timedelta(days=days)
-    user_logs = [
-        log for log in DEMO_ACCESS_LOGS 
-        if (log["user_id"] == user_id and 
-            datetime.fromisoformat(log["timestamp"].replace('Z', '+00:00')) >= cutoff_date)
-    ]
+    cutoff = (datetime.now() - timedelta(days=days)).timestamp()
     
-    # Calculate stats
-    total_accesses = len(user_logs)
-    approved = len([log for log in user_logs if log["status"] == "approved"])
-    denied = len([log for log in user_logs if log["status"] == "denied"])
+    # Whole days in the window come from the rollups; the partially covered
+    # first day is topped up from the index
+    first_full_day = day_of(cutoff) + 1
+    summary = ACCESS_LOG_ROLLUPS.merge(user_id, first_full_day)
+    for log in ACCESS_LOG_STORE.iter_recent(user_id, cutoff, until=first_full_day * DAY_SECONDS):
+        summary.add(log)
     
     # Recent 24h accesses
-    recent_cutoff = datetime.now() - timedelta(hours=24)
-    recent_24h = len([
-        log for log in user_logs 
-        if datetime.fromisoformat(log["timestamp"].replace('Z', '+00:00')) >= recent_cutoff
-    ])
-    
-    # Top organizations
-    org_counts = {}
-    for log in user_logs:
-        org_name = log["organization_name"]
-        org_counts[org_name] = org_counts.get(org_name, 0) + 1
+    recent_cutoff = (datetime.now() - timedelta(hours=24)).timestamp()
+    recent_24h = ACCESS_LOG_STORE.count(user_id, max(cutoff, recent_cutoff))
     
+    # Counted by id; ids that share a name (e.g. unknown ones) are reported together
+    organization_counts = Counter()
+    for org_id, count in summary.organizations.items():
+        organization_counts[ORG_CATALOG.name(org_id)] += count
     top_organizations = [
         {"name": org, "count": count} 
-        for org, count in sorted(org_counts.items(), key=lambda x: x[1], reverse=True)[:5]
+        for org, count in organization_counts.most_common(5)
     ]
     
-    # Data types accessed
-    data_type_counts = {}
-    for log in user_logs:
-        data_type = log["data_type"]
-        data_type_counts[data_type] = data_type_counts.get(data_type, 0) + 1
-    
     data_types_accessed = [
         {"type": dtype, "count": count} 
-        for dtype, count in sorted(data_type_counts.items(), key=lambda x: x[1], reverse=True)
+        for dtype, count in summary.data_types.most_common()
     ]
     
     return AccessLogStats(
-        total_accesses=total_accesses,
-        approved=approved,
-        denied=denied,
+        total_accesses=summary.total,
+        approved=summary.approved,
+        denied=summary.denied,
         recent_24h=recent_24h,
         top_organizations=top_organizations,
         data_types_accessed=data_types_accessed
@@ -284,16 +624,7 @@ async def simulate_access_log(
 ):
     """Simulate a new access log entry (demo only)"""
     
-    # Find organization details
-    from .orgs import DEMO_ORGANIZATIONS
-    org_name = "Unknown Organization"
-    org_logo = "business"
-    
-    for org in DEMO_ORGANIZATIONS:
-        if org["id"] == organization_id:
-            org_name = org["name"]
-            org_logo = org["logo"]
-            break
+    org_name, org_logo = ORG_CATALOG.details(organization_id)
     
     new_log = {
         "id": f"log_{uuid.uuid4().hex[:8]}",
@@ -309,10 +640,53 @@ async def simulate_access_log(
         "user_agent": "Demo-Client/1.0"
     }
     
-    DEMO_ACCESS_LOGS.append(new_log)
+    _record_access_log(new_log)
     
     return {
         "success": True,
         "message": "Access log created",
         "log_id": new_log["id"]
-    }
\ No newline at end of file
+    }
+
+@router.post("/batch")
+async def batch_access_logs(request: Request):
+    """
+    Record many access logs in one request.
+    
+    Accepts either a JSON array of access log objects or, with an
+    application/x-ndjson content type, a stream of one object per line.
+    Returns a result per row; invalid rows are reported without failing the batch.
+    NDJSON results also carry the row's line number in the body.
+    """
+    
+    organizations = ORG_CATALOG.organizations
+    received_at = datetime.now().isoformat()
+    
+    results = []
+    if "ndjson" in request.headers.get("content-type", ""):
+        chunk = []
+        line_numbers = []
+        async for line_number, line in _iter_ndjson_lines(request):
+            chunk.append(line)
+            line_numbers.append(line_number)
+            if len(chunk) >= BATCH_CHUNK_SIZE:
+                results.extend(_ingest_batch(chunk, len(results), organizations, received_at, line_numbers))
+                chunk = []
+                line_numbers = []
+        results.extend(_ingest_batch(chunk, len(results), organizations, received_at, line_numbers))
+    else:
+        try:
+            items = json.loads(await request.body())
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array or NDJSON")
+        results = _ingest_batch(items, 0, organizations, received_at)
+    
+    accepted = sum(1 for result in results if result["success"])
+    return {
+        "success": True,
+        "accepted": accepted,
+        "rejected": len(results) - accepted,
+        "results": results
+    }
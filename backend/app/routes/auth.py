@@ -1,9 +1,23 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Header
 from pydantic import BaseModel, EmailStr
 from typing import Optional
+import os
+import secrets
 import uuid
 from datetime import datetime, timedelta
 
+from ..services.google_id_tokens import (
+    GOOGLE_JWKS_URL,
+    FileJwksSource,
+    GoogleIdTokens,
+    HttpJwksSource,
+    InvalidIdToken,
+    SigningKeysUnavailable
+)
+from ..services.password_hashing import PasswordHasher, PasswordHasherBusy
+from ..services.session_store import SessionStore
+from ..services.session_tokens import InvalidToken, SessionTokens
+
 router = APIRouter()
 
 class LoginRequest(BaseModel):
@@ -38,7 +52,7 @@ DEMO_USERS = {
         "email": "demo@trustbase.ng",
         "firstName": "Adaora",
         "lastName": "Okafor",
-        "password": "demo123",  # In production, this would be hashed
+        "password": "$2b$12$ikf2CT65zjm7OQqUDx/aqecD7W6ukWC86iGZjawdaqD26x1DJhoi6",  # bcrypt hash of demo123
         "profileComplete": False,
         "provider": "email",
         "createdAt": "2024-01-15T10:00:00Z"
@@ -55,22 +69,128 @@ DEMO_USERS = {
     }
 }
 
-# Demo tokens (in production, use JWT with proper signing)
+# Opaque demo tokens from before signed tokens; still accepted through SESSIONS
 DEMO_TOKENS = {
     "demo_token_123": "demo_user_1",
     "demo_google_token_456": "demo_google_user"
 }
 
+# bcrypt runs on a bounded thread pool so logins never block the event loop:
+#   PASSWORD_BCRYPT_ROUNDS - bcrypt cost factor
+#   PASSWORD_HASH_CONCURRENCY - hashes running at once
+#   PASSWORD_HASH_MAX_WAITING - logins queued for a slot before new ones get a 503
+PASSWORD_HASHER = PasswordHasher(
+    rounds=int(os.environ.get("PASSWORD_BCRYPT_ROUNDS", "12")),
+    max_concurrency=int(os.environ.get("PASSWORD_HASH_CONCURRENCY", "2")),
+    max_waiting=int(os.environ.get("PASSWORD_HASH_MAX_WAITING", "64"))
+)
+
+async def _password_hasher(operation, *args):
+    """Run a PASSWORD_HASHER operation, turning a full queue into a 503"""
+    try:
+        return await operation(*args)
+    except PasswordHasherBusy:
+        raise HTTPException(status_code=503, detail="Too many logins in progress, retry shortly", headers={"Retry-After": "1"})
+
+# Users by id, kept alongside DEMO_USERS (which is keyed by email)
+USERS_BY_ID = {user["id"]: user for user in DEMO_USERS.values()}
+
+# Legacy opaque tokens only. Login and Google sign-in issue signed tokens
+# (SESSION_TOKENS), so nothing but DEMO_TOKENS is ever stored here; they never
+# expire on their own and logout removes them.
+SESSIONS = SessionStore(ttl_seconds=float("inf"), max_sessions=len(DEMO_TOKENS))
+for _token, _user_id in DEMO_TOKENS.items():
+    SESSIONS.create(_token, _user_id)
+
+# Signed session tokens. Every worker must share JWT_SECRET_KEY to accept each
+# other's tokens; without it each process signs with its own random key.
+SESSION_TOKENS = SessionTokens(
+    keys={"primary": os.environ.get("JWT_SECRET_KEY") or secrets.token_urlsafe(32)},
+    active_kid="primary",
+    algorithm=os.environ.get("JWT_ALGORITHM", "HS256"),
+    ttl_seconds=60 * float(os.environ.get("JWT_EXPIRE_MINUTES", "1440"))
+)
+
+# Google ID tokens are verified against Google's signing keys, cached and
+# refreshed in the background. Without GOOGLE_CLIENT_IDS sign-in stays in demo mode.
+#   GOOGLE_CLIENT_IDS - comma-separated OAuth client ids accepted as the token audience
+#   GOOGLE_JWKS_FILE - read keys from a local JWKS file instead of GOOGLE_JWKS_URL
+#   GOOGLE_JWKS_REFRESH_SECONDS - longest time between key refreshes
+_google_client_ids = [client_id.strip() for client_id in os.environ.get("GOOGLE_CLIENT_IDS", "").split(",") if client_id.strip()]
+GOOGLE_ID_TOKENS = GoogleIdTokens(
+    source=(
+        FileJwksSource(os.environ["GOOGLE_JWKS_FILE"]) if os.environ.get("GOOGLE_JWKS_FILE")
+        else HttpJwksSource(os.environ.get("GOOGLE_JWKS_URL", GOOGLE_JWKS_URL))
+    ),
+    audiences=_google_client_ids,
+    refresh_seconds=float(os.environ.get("GOOGLE_JWKS_REFRESH_SECONDS", "3600"))
+) if _google_client_ids else None
+
+async def run_google_key_refresh() -> None:
+    """Background job started by the app: keep Google's signing keys fresh"""
+    if GOOGLE_ID_TOKENS is not None:
+        await GOOGLE_ID_TOKENS.run()
+
+def _google_user(claims: dict) -> dict:
+    """The user for verified Google claims, registered on first sign-in"""
+    user_data = DEMO_USERS.get(claims["email"])
+    if user_data is None:
+        user_data = {
+            "id": f"google_{claims['sub']}",
+            "email": claims["email"],
+            "firstName": claims.get("given_name") or claims["email"].split("@")[0].capitalize(),
+            "lastName": claims.get("family_name") or "",
+            "password": None,
+            "profileComplete": False,
+            "provider": "google",
+            "createdAt": datetime.now().isoformat()
+        }
+        DEMO_USERS[claims["email"]] = user_data
+        USERS_BY_ID[user_data["id"]] = user_data
+    return user_data
+
+def _session_user_id(token: str) -> str:
+    """User id for a session token, signed or legacy opaque; raises 401 if it is not valid"""
+    if token.count(".") == 2:
+        try:
+            return SESSION_TOKENS.verify(token)["sub"]
+        except InvalidToken:
+            raise HTTPException(status_code=401, detail="Invalid or expired token")
+    
+    session = SESSIONS.get(token)
+    if session is None:
+        raise HTTPException(status_code=401, detail="Invalid or expired token")
+    return session.user_id
+
+async def current_user_id(authorization: Optional[str] = Header(None)) -> str:
+    """
+    FastAPI dependency for any router: the user id of the request's bearer token.
+    
+    Usage: `user_id: str = Depends(current_user_id)`
+    """
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(
+            status_code=401,
+            detail="Missing bearer token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+    return _session_user_id(token.strip())
+
 @router.post("/login", response_model=AuthResponse)
 async def login(request: LoginRequest):
     """Demo login endpoint - accepts any email/password for demo purposes"""
     
-    # Check if it's a known demo user
+    # Check if it's a known demo user. Passwords are stored as bcrypt hashes;
+    # the hash is only checked when the demo rules wouldn't let the login in anyway
     if request.email in DEMO_USERS:
         user_data = DEMO_USERS[request.email]
-        if user_data["password"] is None or request.password == user_data["password"] or len(request.password) >= 6:
-            token = f"demo_token_{uuid.uuid4().hex[:8]}"
-            DEMO_TOKENS[token] = user_data["id"]
+        if (
+            user_data["password"] is None
+            or len(request.password) >= 6
+            or await _password_hasher(PASSWORD_HASHER.verify, request.password, user_data["password"])
+        ):
+            token = SESSION_TOKENS.issue(user_data["id"])
             
             return AuthResponse(
                 success=True,
@@ -81,8 +201,9 @@ async def login(request: LoginRequest):
     
     # For demo purposes, accept any email/password combination with minimum validation
     if "@" in request.email and len(request.password) >= 6:
+        password_hash = await _password_hasher(PASSWORD_HASHER.hash, request.password)
         user_id = f"demo_user_{uuid.uuid4().hex[:8]}"
-        token = f"demo_token_{uuid.uuid4().hex[:8]}"
+        token = SESSION_TOKENS.issue(user_id)
         
         # Extract name from email for demo
         email_parts = request.email.split("@")[0].split(".")
@@ -99,8 +220,8 @@ async def login(request: LoginRequest):
             "createdAt": datetime.now().isoformat()
         }
         
-        DEMO_TOKENS[token] = user_id
-        DEMO_USERS[request.email] = {**user_data, "password": request.password}
+        DEMO_USERS[request.email] = {**user_data, "password": password_hash}
+        USERS_BY_ID[user_id] = DEMO_USERS[request.email]
         
         return AuthResponse(
             success=True,
@@ -113,15 +234,22 @@ async def login(request: LoginRequest):
 
 @router.post("/google-signin", response_model=AuthResponse)
 async def google_signin(request: GoogleSignInRequest):
-    """Demo Google sign-in endpoint - design only, returns demo user"""
+    """Google sign-in - verifies the ID token when GOOGLE_CLIENT_IDS is set, otherwise returns the demo user"""
     
-    # Simulate Google token validation delay
-    import asyncio
-    await asyncio.sleep(0.5)
+    if GOOGLE_ID_TOKENS is None:
+        user_data = DEMO_USERS["adaora.okafor@gmail.com"]
+    else:
+        try:
+            claims = GOOGLE_ID_TOKENS.verify(request.id_token)
+        except SigningKeysUnavailable:
+            raise HTTPException(status_code=503, detail="Google sign-in is starting up, retry shortly", headers={"Retry-After": "5"})
+        except InvalidIdToken:
+            raise HTTPException(status_code=401, detail="Invalid Google ID token")
+        if not claims.get("email_verified"):
+            raise HTTPException(status_code=401, detail="Google account email is not verified")
+        user_data = _google_user(claims)
     
-    user_data = DEMO_USERS["adaora.okafor@gmail.com"]
-    token = f"demo_google_token_{uuid.uuid4().hex[:8]}"
-    DEMO_TOKENS[token] = user_data["id"]
+    token = SESSION_TOKENS.issue(user_data["id"])
     
     return AuthResponse(
         success=True,
@@ -134,18 +262,12 @@ async def google_signin(request: GoogleSignInRequest):
 async def session_check(request: SessionCheckRequest):
     """Check if session token is valid and return user profile"""
     
-    if request.token not in DEMO_TOKENS:
-        raise HTTPException(status_code=401, detail="Invalid or expired token")
-    
-    user_id = DEMO_TOKENS[request.token]
-    
-    # Find user data
-    for email, user_data in DEMO_USERS.items():
-        if user_data["id"] == user_id:
-            return {
-                "success": True,
-                "user": UserProfile(**{k: v for k, v in user_data.items() if k != "password"})
-            }
+    user_data = USERS_BY_ID.get(_session_user_id(request.token))
+    if user_data:
+        return {
+            "success": True,
+            "user": UserProfile(**{k: v for k, v in user_data.items() if k != "password"})
+        }
     
     raise HTTPException(status_code=404, detail="User not found")
 
@@ -153,7 +275,34 @@ async def session_check(request: SessionCheckRequest):
 async def logout(request: SessionCheckRequest):
     """Logout and invalidate token"""
     
-    if request.token in DEMO_TOKENS:
-        del DEMO_TOKENS[request.token]
+    if not SESSION_TOKENS.revoke(request.token):
+        SESSIONS.delete(request.token)
+    
+    return {"success": True, "message": "Logged out successfully"}
+
+@router.get("/me")
+async def get_current_user(user_id: str = Depends(current_user_id)):
+    """Profile of the user whose bearer token authorized the request"""
+    
+    user_data = USERS_BY_ID.get(user_id)
+    if not user_data:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    return {
+        "success": True,
+        "user": UserProfile(**{k: v for k, v in user_data.items() if k != "password"})
+    }
+
+@router.get("/google-keys/stats")
+async def get_google_key_stats():
+    """Cached Google signing keys and ID token verification counts"""
+    
+    if GOOGLE_ID_TOKENS is None:
+        return {"enabled": False}
+    return {"enabled": True, **GOOGLE_ID_TOKENS.stats()}
+
+@router.get("/password-hashing/stats")
+async def get_password_hashing_stats():
+    """Queue depth and timings of the password hashing pool"""
     
-    return {"success": True, "message": "Logged out successfully"}
\ No newline at end of file
+    return PASSWORD_HASHER.stats()
@@ -1,9 +1,20 @@
 from fastapi import APIRouter, HTTPException, Query
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, Iterator, List, Literal, Optional, Tuple
 from datetime import datetime
+from itertools import chain
+import asyncio
+import os
+import time
 import uuid
 
+from ..services.consent_counters import ConsentCounters
+from ..services.consent_decisions import ConsentDecisions
+from ..services.consent_events import ConsentEventLog, apply_event
+from ..services.consent_expiry import ConsentExpiryQueue
+from ..services.consent_repository import ConsentRepository
+from .orgs import ORG_CATALOG, TRUST_SCORES
+
 router = APIRouter()
 
 class ConsentRequest(BaseModel):
@@ -32,7 +43,7 @@ class Consent(BaseModel):
 class ConsentHistory(BaseModel):
     id: str
     consent_id: str
-    action: str  # granted, revoked, updated, accessed
+    action: str  # granted, revoked, updated, expired, accessed
     timestamp: str
     data_types: Optional[List[str]] = None
     reason: Optional[str] = None
@@ -41,6 +52,37 @@ class ConsentResponse(BaseModel):
     consents: List[Consent]
     total: int
 
+class ConsentCheck(BaseModel):
+    user_id: str
+    organization_id: str
+    data_type: str
+
+class ConsentCheckBatch(BaseModel):
+    checks: List[ConsentCheck]
+
+class BulkConsentOperation(BaseModel):
+    action: Literal["grant", "revoke"]
+    user_id: str
+    organization_id: str
+    data_types: Optional[List[str]] = None  # required for grant
+    purpose: Optional[str] = None  # required for grant
+    reason: Optional[str] = None
+
+class BulkConsentRequest(BaseModel):
+    operations: List[BulkConsentOperation]
+
+class BulkConsentOutcome(BaseModel):
+    index: int
+    action: str
+    success: bool
+    consent_id: Optional[str] = None
+    error: Optional[str] = None
+
+class BulkConsentResponse(BaseModel):
+    results: List[BulkConsentOutcome]
+    succeeded: int
+    failed: int
+
 # Demo consents data
 DEMO_CONSENTS = [
     {
@@ -121,6 +163,131 @@ DEMO_CONSENT_HISTORY = [
     }
 ]
 
+def _seed_events() -> List[dict]:
+    """
+    DEMO_CONSENTS and DEMO_CONSENT_HISTORY as the events that produce them:
+    a full granted event per consent, then the later history, oldest first
+    """
+    history_granted = {event["consent_id"]: event for event in DEMO_CONSENT_HISTORY if event["action"] == "granted"}
+    events = []
+    for consent in DEMO_CONSENTS:
+        recorded = history_granted.get(consent["id"], {})
+        events.append({
+            "id": recorded.get("id", f"history_{consent['id']}_granted"),
+            "consent_id": consent["id"],
+            "action": "granted",
+            "timestamp": consent["granted_at"],
+            "data_types": recorded.get("data_types", consent["data_types"]),
+            "reason": recorded.get("reason", f"Consent granted for: {consent['purpose']}"),
+            "user_id": consent["user_id"],
+            "organization_id": consent["organization_id"],
+            "organization_name": consent["organization_name"],
+            "purpose": consent["purpose"],
+            "expires_at": consent["expires_at"]
+        })
+    later = [event for event in DEMO_CONSENT_HISTORY if event["action"] != "granted"]
+    return events + sorted(later, key=lambda event: event["timestamp"])
+
+# Consent state is derived from an append-only event log: every change is
+# recorded as a granted/revoked/updated/expired event and folded into the repository,
+# which indexes consents by id and (user, organization, status).
+# Set CONSENT_DATA_DIR to persist events and periodic snapshots on disk;
+# otherwise the demo data is replayed into memory as events on every start.
+CONSENT_DATA_DIR = os.environ.get("CONSENT_DATA_DIR")
+CONSENTS = ConsentRepository()
+CONSENT_EVENTS = ConsentEventLog(CONSENT_DATA_DIR)
+
+if not CONSENT_EVENTS.load(CONSENTS):
+    # Seed state comes only from events, so the log alone can rebuild it
+    _seed = _seed_events()
+    CONSENT_EVENTS.append(_seed)
+    for _event in _seed:
+        apply_event(CONSENTS, _event)
+    if CONSENT_EVENTS.persistent:
+        CONSENT_EVENTS.write_snapshot(CONSENT_EVENTS.snapshot_state(CONSENTS))
+
+# Pending expirations; built once at startup, then fed by granted events
+CONSENT_EXPIRY = ConsentExpiryQueue(CONSENTS, CONSENTS)
+# (user, organization) -> permitted data types bitmask for /check
+CONSENT_DECISIONS = ConsentDecisions(CONSENTS)
+# Per-user status counts for /stats/summary
+CONSENT_COUNTERS = ConsentCounters(CONSENTS)
+
+for _consent in CONSENTS:
+    TRUST_SCORES.record_consent(_consent["organization_id"], granted=1, revoked=_consent["status"] == "revoked")
+
+def _apply_consent_event(event: dict) -> Optional[dict]:
+    previous = CONSENTS.get(event["consent_id"])
+    previous_status = previous["status"] if previous is not None else None
+    consent = apply_event(CONSENTS, event)
+    if consent is not None:
+        CONSENT_COUNTERS.move(consent, previous_status)
+        if consent["status"] != previous_status:
+            TRUST_SCORES.record_consent(
+                consent["organization_id"],
+                granted=previous_status is None,
+                revoked=consent["status"] == "revoked"
+            )
+        if event["action"] == "granted":
+            CONSENT_EXPIRY.schedule(consent)
+        CONSENT_DECISIONS.refresh(consent["user_id"], consent["organization_id"])
+    return consent
+
+def _record_consent_events(events: List[dict]) -> None:
+    """Append events to the log and apply them; the only way consent state changes"""
+    CONSENT_EVENTS.append(events)
+    for event in events:
+        _apply_consent_event(event)
+
+def _random_ids(count: int) -> Iterator[str]:
+    """`count` random 8-hex-digit ids from a single urandom call, for batch endpoints"""
+    digits = os.urandom(4 * count).hex()
+    return (digits[start:start + 8] for start in range(0, len(digits), 8))
+
+def _expires_at(timestamp: str) -> str:
+    """Consents granted through the API expire one year after being granted"""
+    return datetime.fromisoformat(timestamp.replace('Z', '+00:00')).replace(year=datetime.now().year + 1).isoformat()
+
+def expire_due_consents(now: float, batch_size: int = 1000) -> int:
+    """Flip up to `batch_size` due consents to expired, recording an event for each"""
+    due = CONSENT_EXPIRY.pop_due(now, batch_size)
+    if due:
+        timestamp = datetime.now().isoformat()
+        _record_consent_events([
+            {
+                "id": f"history_{uuid.uuid4().hex[:8]}",
+                "consent_id": consent["id"],
+                "action": "expired",
+                "timestamp": timestamp,
+                "data_types": consent["data_types"],
+                "reason": f"Consent expired at {consent['expires_at']}"
+            }
+            for consent in due
+        ])
+    return len(due)
+
+async def run_consent_expiry(interval: float = 60, batch_size: int = 1000) -> None:
+    """Background job started by the app: expire consents as they fall due"""
+    while True:
+        if expire_due_consents(time.time(), batch_size) == batch_size:
+            # More may be due; yield to requests between batches
+            await asyncio.sleep(0)
+            continue
+        next_due = CONSENT_EXPIRY.next_due()
+        delay = interval if next_due is None else min(interval, max(next_due - time.time(), 0))
+        await asyncio.sleep(delay)
+
+async def run_consent_snapshots(interval: float = 300, min_events: int = 10_000) -> None:
+    """Background job started by the app: snapshot consent state once enough new events have accumulated"""
+    if not CONSENT_EVENTS.persistent:
+        return
+    loop = asyncio.get_event_loop()
+    while True:
+        await asyncio.sleep(interval)
+        if CONSENT_EVENTS.count - CONSENT_EVENTS.count_at_snapshot >= min_events:
+            state = await CONSENT_EVENTS.snapshot_state_incrementally(CONSENTS)
+            await loop.run_in_executor(None, CONSENT_EVENTS.write_snapshot, state)
+
 @router.get("/", response_model=ConsentResponse)
 async def get_consents(
     user_id: str = Query(...),
@@ -129,27 +296,44 @@ async def get_consents(
 ):
     """Get user's consents with optional filtering"""
     
-    consents = [c for c in DEMO_CONSENTS if c["user_id"] == user_id]
-    
-    # Apply filters
-    if status:
-        consents = [c for c in consents if c["status"] == status]
-    
-    if organization_id:
-        consents = [c for c in consents if c["organization_id"] == organization_id]
+    consents = CONSENTS.find(user_id, status=status or None, organization_id=organization_id or None)
     
     return ConsentResponse(
         consents=[Consent(**consent) for consent in consents],
         total=len(consents)
     )
 
+@router.get("/check")
+async def check_consent(
+    user_id: str = Query(...),
+    organization_id: str = Query(...),
+    data_type: str = Query(...)
+):
+    """Decide whether an organization may read a data type for a user right now"""
+    
+    return {"allowed": CONSENT_DECISIONS.allowed(user_id, organization_id, data_type)}
+
+@router.post("/check/batch")
+async def check_consents(request: ConsentCheckBatch):
+    """Decide many (user, organization, data type) checks in one call; results follow request order"""
+    
+    results = CONSENT_DECISIONS.allowed_many(
+        (check.user_id, check.organization_id, check.data_type) for check in request.checks
+    )
+    
+    return {
+        "results": results,
+        "allowed": sum(results),
+        "total": len(results)
+    }
+
 @router.get("/{consent_id}", response_model=Consent)
 async def get_consent(consent_id: str):
     """Get specific consent details"""
     
-    for consent in DEMO_CONSENTS:
-        if consent["id"] == consent_id:
-            return Consent(**consent)
+    consent = CONSENTS.get(consent_id)
+    if consent:
+        return Consent(**consent)
     
     raise HTTPException(status_code=404, detail="Consent not found")
 
@@ -160,38 +344,19 @@ async def grant_consent(request: ConsentRequest):
     consent_id = f"consent_{uuid.uuid4().hex[:8]}"
     timestamp = datetime.now().isoformat()
     
-    # Find organization name
-    from .orgs import DEMO_ORGANIZATIONS
-    org_name = "Unknown Organization"
-    for org in DEMO_ORGANIZATIONS:
-        if org["id"] == request.organization_id:
-            org_name = org["name"]
-            break
-    
-    new_consent = {
-        "id": consent_id,
-        "user_id": request.user_id,
-        "organization_id": request.organization_id,
-        "organization_name": org_name,
-        "data_types": request.data_types,
-        "purpose": request.purpose,
-        "status": "active",
-        "granted_at": timestamp,
-        "revoked_at": None,
-        "expires_at": datetime.fromisoformat(timestamp.replace('Z', '+00:00')).replace(year=datetime.now().year + 1).isoformat()
-    }
-    
-    DEMO_CONSENTS.append(new_consent)
-    
-    # Add to history
-    DEMO_CONSENT_HISTORY.append({
+    _record_consent_events([{
         "id": f"history_{uuid.uuid4().hex[:8]}",
         "consent_id": consent_id,
         "action": "granted",
         "timestamp": timestamp,
         "data_types": request.data_types,
-        "reason": f"Consent granted for: {request.purpose}"
-    })
+        "reason": f"Consent granted for: {request.purpose}",
+        "user_id": request.user_id,
+        "organization_id": request.organization_id,
+        "organization_name": ORG_CATALOG.name(request.organization_id),
+        "purpose": request.purpose,
+        "expires_at": _expires_at(timestamp)
+    }])
     
     return {
         "success": True,
@@ -203,38 +368,105 @@ async def grant_consent(request: ConsentRequest):
 async def revoke_consent(request: ConsentRevoke):
     """Revoke existing consent"""
     
-    # Find and update consent
-    for consent in DEMO_CONSENTS:
-        if (consent["user_id"] == request.user_id and 
-            consent["organization_id"] == request.organization_id and 
-            consent["status"] == "active"):
-            
-            consent["status"] = "revoked"
-            consent["revoked_at"] = datetime.now().isoformat()
-            
-            # Add to history
-            DEMO_CONSENT_HISTORY.append({
-                "id": f"history_{uuid.uuid4().hex[:8]}",
+    consent = CONSENTS.active_for(request.user_id, request.organization_id)
+    if not consent:
+        raise HTTPException(status_code=404, detail="Active consent not found")
+    
+    _record_consent_events([{
+        "id": f"history_{uuid.uuid4().hex[:8]}",
+        "consent_id": consent["id"],
+        "action": "revoked",
+        "timestamp": datetime.now().isoformat(),
+        "data_types": consent["data_types"],
+        "reason": request.reason or "User requested consent revocation"
+    }])
+    
+    return {
+        "success": True,
+        "message": f"Consent revoked for {consent['organization_name']}",
+        "consent_id": consent["id"]
+    }
+
+@router.post("/bulk", response_model=BulkConsentResponse)
+async def bulk_consents(request: BulkConsentRequest):
+    """Apply many grant/revoke operations in order with a single history append"""
+    
+    timestamp = datetime.now().isoformat()
+    expires_at = _expires_at(timestamp)
+    random_ids = _random_ids(2 * len(request.operations))
+    
+    # Nothing is applied until the whole batch is in the log, as with every
+    # other change; a revoke sees the grants and revokes before it in the
+    # batch through these.
+    granted: Dict[Tuple[str, str], List[dict]] = {}
+    granted_ids = set()
+    revoked_ids = set()
+    events = []
+    results = []
+    for index, operation in enumerate(request.operations):
+        if operation.action == "grant":
+            if operation.data_types is None or operation.purpose is None:
+                results.append({"index": index, "action": "grant", "success": False, "error": "data_types and purpose are required"})
+                continue
+            # 8 hex digits collide often enough at bulk scale to check
+            consent_id = f"consent_{next(random_ids)}"
+            while CONSENTS.get(consent_id) is not None or consent_id in granted_ids:
+                consent_id = f"consent_{uuid.uuid4().hex[:8]}"
+            event = {
+                "id": f"history_{next(random_ids)}",
+                "consent_id": consent_id,
+                "action": "granted",
+                "timestamp": timestamp,
+                "data_types": operation.data_types,
+                "reason": f"Consent granted for: {operation.purpose}",
+                "user_id": operation.user_id,
+                "organization_id": operation.organization_id,
+                "organization_name": ORG_CATALOG.name(operation.organization_id),
+                "purpose": operation.purpose,
+                "expires_at": expires_at
+            }
+            granted.setdefault((operation.user_id, operation.organization_id), []).append(
+                {"id": consent_id, "data_types": operation.data_types}
+            )
+            granted_ids.add(consent_id)
+        else:
+            # The oldest consent still active at this point in the batch
+            consent = next((
+                consent for consent in chain(
+                    CONSENTS.find(operation.user_id, status="active", organization_id=operation.organization_id),
+                    granted.get((operation.user_id, operation.organization_id), ())
+                )
+                if consent["id"] not in revoked_ids
+            ), None)
+            if not consent:
+                results.append({"index": index, "action": "revoke", "success": False, "error": "Active consent not found"})
+                continue
+            event = {
+                "id": f"history_{next(random_ids)}",
                 "consent_id": consent["id"],
                 "action": "revoked",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": timestamp,
                 "data_types": consent["data_types"],
-                "reason": request.reason or "User requested consent revocation"
-            })
-            
-            return {
-                "success": True,
-                "message": f"Consent revoked for {consent['organization_name']}",
-                "consent_id": consent["id"]
+                "reason": operation.reason or "User requested consent revocation"
             }
+            revoked_ids.add(consent["id"])
+        events.append(event)
+        results.append({"index": index, "action": operation.action, "success": True, "consent_id": event["consent_id"]})
     
-    raise HTTPException(status_code=404, detail="Active consent not found")
+    _record_consent_events(events)
+    
+    # Plain dicts: response_model validates them once on the way out
+    return {
+        "results": results,
+        "succeeded": len(events),
+        "failed": len(results) - len(events)
+    }
 
 @router.get("/{consent_id}/history")
 async def get_consent_history(consent_id: str):
     """Get consent history"""
     
-    history = [h for h in DEMO_CONSENT_HISTORY if h["consent_id"] == consent_id]
+    history = CONSENT_EVENTS.history(consent_id)
     
     return {
         "history": [ConsentHistory(**h) for h in history],
@@ -245,15 +477,16 @@ async def get_consent_history(consent_id: str):
 async def get_consent_stats(user_id: str = Query(...)):
     """Get consent statistics for user"""
     
-    user_consents = [c for c in DEMO_CONSENTS if c["user_id"] == user_id]
+    return CONSENT_COUNTERS.summary(user_id)
+
+@router.get("/stats/consistency")
+async def check_consent_stats():
+    """Recompute every user's consent counters from scratch and report any drift"""
     
-    active_count = len([c for c in user_consents if c["status"] == "active"])
-    revoked_count = len([c for c in user_consents if c["status"] == "revoked"])
+    drift = CONSENT_COUNTERS.drift(CONSENTS)
     
     return {
-        "total": len(user_consents),
-        "active": active_count,
-        "revoked": revoked_count,
-        "expired": len(user_consents) - active_count - revoked_count,
-        "organizations": len(set(c["organization_id"] for c in user_consents))
+        "consistent": not drift,
+        "consents_checked": len(CONSENTS),
+        "drift": drift
     }
\ No newline at end of file
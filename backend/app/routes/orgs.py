@@ -1,8 +1,14 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Query, Request
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
 import json
 
+from ..services.org_catalog import OrgCatalog
+from ..services.org_search import OrgSearchIndex
+from ..services.response_cache import ResponseCache
+from ..services.trust_scores import TrustScoreEngine
+
 router = APIRouter()
 
 class Organization(BaseModel):
@@ -73,62 +79,129 @@ DEMO_ORGANIZATIONS = [
     }
 ]
 
+# Shared by every router: lookups by id, per-category lists and prebuilt
+# Organization models. Change orgs through ORG_CATALOG.upsert/remove so the
+# version and everything derived from it stay current.
+ORG_CATALOG = OrgCatalog(DEMO_ORGANIZATIONS, Organization)
+
+# Search over name, description, category and data types, kept in step with the catalog
+ORG_SEARCH = OrgSearchIndex(DEMO_ORGANIZATIONS)
+
+def _reindex_organizations(org_ids: List[str]) -> None:
+    for org_id in org_ids:
+        org = ORG_CATALOG.get(org_id)
+        if org is None:
+            ORG_SEARCH.remove(org_id)
+        else:
+            ORG_SEARCH.update(org)
+
+ORG_CATALOG.on_change(_reindex_organizations)
+
+# Serialized catalog responses with ETags, rebuilt when the catalog version moves
+ORG_RESPONSES = ResponseCache(lambda: ORG_CATALOG.version)
+
+# Trust scores computed from access and consent behaviour. The consents and
+# access_logs routers feed it events; the seeded trustScore values are each
+# org's baseline, and refresh_trust_scores() writes the results back into the
+# catalog.
+TRUST_SCORES = TrustScoreEngine((org["id"], org["trustScore"]) for org in DEMO_ORGANIZATIONS)
+
+def refresh_trust_scores() -> int:
+    """Rescore every org and publish changed scores to the catalog; returns how many changed"""
+    for org_id, org in ORG_CATALOG.organizations.items():
+        if org_id not in TRUST_SCORES:
+            TRUST_SCORES.set_baseline(org_id, org["trustScore"])
+    
+    changed = TRUST_SCORES.recompute()
+    org_ids = TRUST_SCORES.org_ids
+    ORG_CATALOG.update_fields({
+        org_ids[row]: {"trustScore": float(TRUST_SCORES.scores[row])} for row in changed.tolist()
+    })
+    return len(changed)
+
+async def run_trust_score_refresh(interval: float = 60) -> None:
+    """Background job started by the app: rescore orgs from the events recorded since the last pass"""
+    while True:
+        refresh_trust_scores()
+        await asyncio.sleep(interval)
+
+def _organizations_payload(category: Optional[str], active_only: bool) -> OrganizationResponse:
+    organizations = ORG_CATALOG.models(category)
+    
+    # Apply filters
+    if active_only:
+        organizations = [org for org in organizations if org.consentActive]
+    
+    return OrganizationResponse(
+        organizations=organizations,
+        total=len(organizations)
+    )
+
+def _categories_payload() -> dict:
+    categories = ORG_CATALOG.categories()
+    return {
+        "categories": categories,
+        "total": len(categories)
+    }
+
+def _trust_score_summary_payload() -> dict:
+    return TRUST_SCORES.summary(ORG_CATALOG.organizations)
+
 @router.get("/", response_model=OrganizationResponse)
 async def get_organizations(
+    request: Request,
     user_id: Optional[str] = Query(None),
     category: Optional[str] = Query(None),
     active_only: bool = Query(False)
 ):
     """Get list of organizations with optional filtering"""
     
-    organizations = DEMO_ORGANIZATIONS.copy()
-    
-    # Apply filters
-    if category:
-        organizations = [org for org in organizations if org.get("category") == category]
+    # user_id does not affect the response, so it is left out of the cache key
+    category = category or None
+    return ORG_RESPONSES.respond(
+        request,
+        ("organizations", category, active_only),
+        lambda: _organizations_payload(category, active_only)
+    )
+
+@router.get("/search", response_model=OrganizationResponse)
+async def search_organizations(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """Search organizations by name, description, category or data type; word prefixes and unaccented spellings match"""
     
-    if active_only:
-        organizations = [org for org in organizations if org["consentActive"]]
+    organizations = [ORG_CATALOG.model(org_id) for org_id, _ in ORG_SEARCH.search(q, limit)]
     
     return OrganizationResponse(
-        organizations=[Organization(**org) for org in organizations],
+        organizations=organizations,
         total=len(organizations)
     )
 
+@router.get("/cache/stats")
+async def get_response_cache_stats():
+    """Hit/miss counters for the cached organization responses"""
+    
+    return ORG_RESPONSES.stats()
+
 @router.get("/{org_id}", response_model=Organization)
 async def get_organization(org_id: str):
     """Get specific organization details"""
     
-    for org in DEMO_ORGANIZATIONS:
-        if org["id"] == org_id:
-            return Organization(**org)
+    org = ORG_CATALOG.model(org_id)
+    if org:
+        return org
     
     raise HTTPException(status_code=404, detail="Organization not found")
 
 @router.get("/categories/list")
-async def get_categories():
+async def get_categories(request: Request):
     """Get list of organization categories"""
     
-    categories = list(set(org.get("category", "Other") for org in DEMO_ORGANIZATIONS))
-    return {
-        "categories": sorted(categories),
-        "total": len(categories)
-    }
+    return ORG_RESPONSES.respond(request, ("categories",), _categories_payload)
 
 @router.get("/trust-scores/summary")
-async def get_trust_score_summary():
+async def get_trust_score_summary(request: Request):
     """Get trust score statistics"""
     
-    scores = [org["trustScore"] for org in DEMO_ORGANIZATIONS]
-    
-    return {
-        "average": sum(scores) / len(scores),
-        "highest": max(scores),
-        "lowest": min(scores),
-        "distribution": {
-            "excellent": len([s for s in scores if s >= 9.0]),
-            "good": len([s for s in scores if 7.5 <= s < 9.0]),
-            "fair": len([s for s in scores if 6.0 <= s < 7.5]),
-            "poor": len([s for s in scores if s < 6.0])
-        }
-    }
\ No newline at end of file
+    return ORG_RESPONSES.respond(request, ("trust-scores",), _trust_score_summary_payload)
\ No newline at end of file
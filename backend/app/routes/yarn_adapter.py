@@ -1,9 +1,13 @@
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 import asyncio
+import os
 import random
 
+from ..services.generation_cache import GenerationCache
+from ..services.intent_classifier import KeywordClassifier
+
 router = APIRouter()
 
 class YarnQueryRequest(BaseModel):
@@ -16,6 +20,11 @@ class YarnResponse(BaseModel):
     audio_url: str
     language: str
     processing_time: float
+    cached: bool = False
+
+class YarnWarmupRequest(BaseModel):
+    language: str
+    speakers: List[str] = ["default"]
 
 # Demo responses for YarnGPT - deterministic based on input
 DEMO_RESPONSES = {
@@ -92,55 +101,135 @@ DEMO_RESPONSES = {
     }
 }
 
-def _determine_response_type(text: str) -> str:
+# Keyword groups per language. English keywords apply to every language, since
+# questions often mix English in; each language adds its own words.
+INTENT_KEYWORDS = {
+    "*": {
+        "explain": ["explain", "why", "access", "purpose", "first bank", "bank"],
+        "banking": ["bank", "first bank", "financial", "loan", "transaction"],
+        "telecom": ["mtn", "telecom", "phone", "network", "usage"],
+        "rights": ["rights", "consent", "withdraw", "delete", "revoke"]
+    },
+    "ig": {
+        "explain": ["gịnị mere", "kọwaa", "ụlọ akụ"],
+        "banking": ["ụlọ akụ", "mbinye ego"],
+        "telecom": ["ekwentị", "netwọk"],
+        "rights": ["ikike", "nkwenye"]
+    },
+    "yo": {
+        "explain": ["kilode", "ṣàlàyé", "ile-owo"],
+        "banking": ["ile-owo", "awin"],
+        "telecom": ["foonu", "nẹtiwọọki"],
+        "rights": ["igbanilaaye"]
+    },
+    "ha": {
+        "explain": ["me yasa", "bayyana", "banki"],
+        "banking": ["banki", "rance"],
+        "telecom": ["waya", "sadarwa"],
+        "rights": ["hakki", "hakoki", "izini"]
+    }
+}
+
+# Response types in priority order with the keyword groups each needs; the first satisfied wins
+INTENT_RULES = [
+    ("banking_data", ["explain", "banking"]),
+    ("telecom_data", ["explain", "telecom"]),
+    ("explain_access", ["explain"]),
+    ("consent_rights", ["rights"])
+]
+
+def _compile_classifier(language: str) -> KeywordClassifier:
+    groups = {group: list(keywords) for group, keywords in INTENT_KEYWORDS["*"].items()}
+    for group, keywords in INTENT_KEYWORDS.get(language, {}).items():
+        groups.setdefault(group, []).extend(keywords)
+    return KeywordClassifier(groups, INTENT_RULES)
+
+# Compiled once at import: one matcher per supported language
+INTENT_CLASSIFIERS = {language: _compile_classifier(language) for language in DEMO_RESPONSES}
+
+def _determine_response_type(text: str, language: str = "en-ng") -> str:
     """Determine response type based on input text keywords"""
-    text_lower = text.lower()
-    
-    if any(keyword in text_lower for keyword in ['explain', 'why', 'access', 'purpose', 'first bank', 'bank']):
-        if any(keyword in text_lower for keyword in ['bank', 'first bank', 'financial', 'loan', 'transaction']):
-            return 'banking_data'
-        elif any(keyword in text_lower for keyword in ['mtn', 'telecom', 'phone', 'network', 'usage']):
-            return 'telecom_data'
-        else:
-            return 'explain_access'
-    elif any(keyword in text_lower for keyword in ['rights', 'consent', 'withdraw', 'delete', 'revoke']):
-        return 'consent_rights'
-    else:
-        return 'default'
+    return INTENT_CLASSIFIERS.get(language, INTENT_CLASSIFIERS["en-ng"]).classify(text)
 
-@router.post("/query", response_model=YarnResponse)
-async def yarn_query(request: YarnQueryRequest):
+# Generated responses by (language, response type, speaker). A response depends
+# only on those, so repeated questions skip generation:
+#   YARN_CACHE_MAX_ENTRIES - least recently used responses are evicted beyond this many
+#   YARN_CACHE_TTL_SECONDS - responses are regenerated after this long
+YARN_CACHE = GenerationCache(
+    max_entries=int(os.environ.get("YARN_CACHE_MAX_ENTRIES", "1024")),
+    ttl_seconds=float(os.environ.get("YARN_CACHE_TTL_SECONDS", "3600"))
+)
+
+def _cache_key(language: str, response_type: str, speaker: str) -> tuple:
+    """Unsupported languages are answered in Nigerian English, so they share its entries"""
+    language = language if language in DEMO_RESPONSES else "en-ng"
+    return (language, response_type, speaker.strip().lower() or "default")
+
+async def _generate_response(language: str, response_type: str, speaker: str) -> dict:
     """
-    Demo YarnGPT query endpoint - returns deterministic responses
-    
-    In production, this would:
+    The generation step - in production, this would:
     1. Send request to YarnGPT inference server
     2. Process audio generation with WavTokenizer
     3. Return generated audio file URL
     """
     
     # Simulate processing time
-    processing_start = asyncio.get_event_loop().time()
     await asyncio.sleep(random.uniform(0.8, 2.0))  # Realistic API delay
     
-    # Get language responses
-    language_responses = DEMO_RESPONSES.get(request.language, DEMO_RESPONSES["en-ng"])
-    
-    # Determine response type based on input
-    response_type = _determine_response_type(request.text)
-    
     # Get appropriate response
+    language_responses = DEMO_RESPONSES[language]
     response_data = language_responses.get(response_type, language_responses["default"])
+    return {
+        "text": response_data["text"],
+        "audio_url": f"demo_audio/{response_data['audio_file']}"
+    }
+
+@router.post("/query", response_model=YarnResponse)
+async def yarn_query(request: YarnQueryRequest):
+    """Demo YarnGPT query endpoint - returns deterministic responses, cached by language, intent and speaker"""
+    
+    processing_start = asyncio.get_event_loop().time()
+    
+    # Determine response type based on input
+    key = _cache_key(request.language, _determine_response_type(request.text, request.language), request.speaker)
+    response_data, cached = await YARN_CACHE.get_or_generate(key, lambda: _generate_response(*key))
     
     processing_time = asyncio.get_event_loop().time() - processing_start
     
     return YarnResponse(
         text=response_data["text"],
-        audio_url=f"demo_audio/{response_data['audio_file']}",
+        audio_url=response_data["audio_url"],
         language=request.language,
-        processing_time=processing_time
+        processing_time=processing_time,
+        cached=cached
     )
 
+@router.post("/cache/warmup")
+async def warm_up_cache(request: YarnWarmupRequest):
+    """Generate every response type of a language ahead of its first questions"""
+    
+    if request.language not in DEMO_RESPONSES:
+        raise HTTPException(status_code=404, detail="Language not supported")
+    
+    keys = [
+        _cache_key(request.language, response_type, speaker)
+        for response_type in DEMO_RESPONSES[request.language]
+        for speaker in request.speakers
+    ]
+    results = await asyncio.gather(*(YARN_CACHE.get_or_generate(key, lambda key=key: _generate_response(*key)) for key in keys))
+    
+    return {
+        "language": request.language,
+        "responses": len(keys),
+        "generated": sum(1 for _, cached in results if not cached),
+        "already_cached": sum(1 for _, cached in results if cached)
+    }
+
+@router.get("/cache/stats")
+async def get_cache_stats():
+    """Hit rates of the response cache, overall and per language"""
+    return YARN_CACHE.stats()
+
 @router.get("/languages")
 async def get_supported_languages():
     """Get list of supported languages"""
@@ -239,7 +328,6 @@ To replace this demo adapter with the real YarnGPT model:
    - Update yarn_query function to make HTTP requests to YarnGPT server
    - Handle audio file storage and URL generation
    - Add error handling for server unavailability
-   - Implement caching for repeated queries
    - Add authentication if required
 
 5. Production Considerations:
@@ -0,0 +1 @@
+# TrustBase backend services
\ No newline at end of file
@@ -0,0 +1,118 @@
+from array import array
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Tuple
+
+ACCESS_LOG_STATUSES = ("approved", "denied", "pending")
+
+MICROS = 1_000_000
+
+def to_micros(timestamp: float) -> int:
+    """Convert epoch seconds to integer epoch microseconds"""
+    return round(timestamp * MICROS)
+
+def format_micros(micros: int) -> str:
+    """Format epoch microseconds as an ISO-8601 UTC timestamp with a Z suffix"""
+    return datetime.fromtimestamp(micros / MICROS, timezone.utc).isoformat().replace('+00:00', 'Z')
+
+class StringDictionary:
+    """Interns repeated strings as small integer codes; None is stored as -1"""
+
+    def __init__(self):
+        self._codes: Dict[str, int] = {}
+        self._values: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def encode(self, value: Optional[str]) -> int:
+        if value is None:
+            return -1
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self._values)
+            self._values.append(value)
+        return code
+
+    def decode(self, code: int) -> Optional[str]:
+        return None if code < 0 else self._values[code]
+
+    def lookup(self, value: str) -> int:
+        """Code of an already interned value, or -1 if it has never been seen"""
+        return self._codes.get(value, -1)
+
+class AccessLogColumns:
+    """
+    Access logs stored column by column instead of one dict per row.
+
+    Timestamps are int64 epoch microseconds and statuses are small ints;
+    users, organizations, data types, purposes, IP addresses and user agents
+    are interned dictionary codes. Organization name and logo are not stored
+    at all and come from `organization_lookup` when a row is read back.
+    """
+
+    def __init__(self, organization_lookup: Callable[[str], Tuple[str, str]]):
+        self._organization_lookup = organization_lookup
+        self._organization_details: Dict[int, Tuple[str, str]] = {}
+
+        self.users = StringDictionary()
+        self.organizations = StringDictionary()
+        self.data_types = StringDictionary()
+        self.purposes = StringDictionary()
+        self.ip_addresses = StringDictionary()
+        self.user_agents = StringDictionary()
+
+        self.ids: List[str] = []
+        self.timestamps = array('q')
+        self.statuses = array('b')
+        self.user_codes = array('i')
+        self.organization_codes = array('i')
+        self.data_type_codes = array('i')
+        self.purpose_codes = array('i')
+        self.ip_address_codes = array('i')
+        self.user_agent_codes = array('i')
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, log: dict, micros: int) -> int:
+        """Append a log whose timestamp is `micros` and return its row number"""
+        row = len(self.ids)
+        self.ids.append(log["id"])
+        self.timestamps.append(micros)
+        self.statuses.append(ACCESS_LOG_STATUSES.index(log["status"]))
+        self.user_codes.append(self.users.encode(log["user_id"]))
+        self.organization_codes.append(self.organizations.encode(log["organization_id"]))
+        self.data_type_codes.append(self.data_types.encode(log["data_type"]))
+        self.purpose_codes.append(self.purposes.encode(log["purpose"]))
+        self.ip_address_codes.append(self.ip_addresses.encode(log.get("ip_address")))
+        self.user_agent_codes.append(self.user_agents.encode(log.get("user_agent")))
+        return row
+
+    def organization_details(self, code: int) -> Tuple[str, str]:
+        """(name, logo) for an organization code, looked up once per organization"""
+        details = self._organization_details.get(code)
+        if details is None:
+            details = self._organization_details[code] = self._organization_lookup(self.organizations.decode(code))
+        return details
+
+    def forget_organization_details(self) -> None:
+        """Drop cached organization names and logos after the organization table changes"""
+        self._organization_details.clear()
+
+    def row(self, row: int) -> dict:
+        """Materialize a row as the dict shape used by the AccessLog model"""
+        organization_code = self.organization_codes[row]
+        organization_name, organization_logo = self.organization_details(organization_code)
+        return {
+            "id": self.ids[row],
+            "user_id": self.users.decode(self.user_codes[row]),
+            "organization_id": self.organizations.decode(organization_code),
+            "organization_name": organization_name,
+            "organization_logo": organization_logo,
+            "data_type": self.data_types.decode(self.data_type_codes[row]),
+            "purpose": self.purposes.decode(self.purpose_codes[row]),
+            "timestamp": format_micros(self.timestamps[row]),
+            "status": ACCESS_LOG_STATUSES[self.statuses[row]],
+            "ip_address": self.ip_addresses.decode(self.ip_address_codes[row]),
+            "user_agent": self.user_agents.decode(self.user_agent_codes[row])
+        }
@@ -0,0 +1,59 @@
+import asyncio
+from typing import Callable, Dict, Set
+
+class AccessLogSubscription:
+    """One live-feed listener: a bounded queue of (event id, pre-encoded event) pairs"""
+
+    __slots__ = ("user_id", "queue", "dropped")
+
+    def __init__(self, user_id: str, buffer_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=buffer_size)
+        self.dropped = False
+
+class AccessLogFeed:
+    """
+    Per-user fan-out of newly ingested access logs.
+
+    Each event is encoded once and pushed onto every subscriber queue for
+    that user without awaiting. A subscriber whose queue is full is dropped
+    rather than allowed to slow down ingest; it drains what it already has
+    and then disconnects, and can resume from its last event id.
+    """
+
+    def __init__(self, buffer_size: int = 256):
+        self.buffer_size = buffer_size
+        self._subscribers: Dict[str, Set[AccessLogSubscription]] = {}
+        self.dropped_total = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def subscribe(self, user_id: str) -> AccessLogSubscription:
+        subscription = AccessLogSubscription(user_id, self.buffer_size)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: AccessLogSubscription) -> None:
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is None:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id: str, event_id: str, encode: Callable[[], str]) -> None:
+        """Deliver an event to the user's subscribers; `encode` only runs if anyone is listening"""
+        subscribers = self._subscribers.get(user_id)
+        if not subscribers:
+            return
+
+        event = (event_id, encode())
+        for subscription in list(subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                subscription.dropped = True
+                self.dropped_total += 1
+                self.unsubscribe(subscription)
@@ -0,0 +1,155 @@
+from bisect import bisect_left, bisect_right
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .access_log_columns import format_micros, to_micros
+from .access_log_rollups import DAY_SECONDS, AccessLogRollups, day_of
+from .access_log_segments import SegmentLog
+
+class SegmentHistory:
+    """
+    Per-user timeline queries answered straight from the segment files.
+
+    Used for logs older than the in-memory window. The blocks of the sparse
+    index that overlap the requested range are read in order of their time
+    bounds (newest maximum first, or oldest minimum first when ascending),
+    each at most once. Matching records wait in a sorted list until no
+    unread block can hold anything that sorts before them, then are yielded,
+    so a page stops reading blocks as soon as it has enough rows and only
+    the matches of overlapping blocks are held in memory.
+
+    Given the per-day rollups, counts with at most one filter take whole
+    days from them and only read the blocks of the partial days at either
+    end of the range.
+    """
+
+    def __init__(
+        self,
+        segments: SegmentLog,
+        organization_lookup: Callable[[str], Tuple[str, str]],
+        rollups: Optional[AccessLogRollups] = None
+    ):
+        self.segments = segments
+        self._organization_lookup = organization_lookup
+        self.rollups = rollups
+
+    def _select(
+        self,
+        user_id: str,
+        since: float,
+        until: Optional[float],
+        before: Optional[Tuple[int, str]],
+        after: Optional[Tuple[int, str]],
+        ascending: bool,
+        organization_id: Optional[str],
+        status: Optional[str],
+        data_type: Optional[str]
+    ) -> Iterator[Tuple[dict, int]]:
+        """Yield matching (log, micros) in (timestamp, id) order"""
+        low = None if since == float("-inf") else to_micros(since)
+        high = None if until is None else to_micros(until)
+        # Cursors narrow the time range; ids only matter within the cursor's own microsecond
+        if after is not None:
+            low = after[0] if low is None else max(low, after[0])
+        if before is not None:
+            high = before[0] + 1 if high is None else min(high, before[0] + 1)
+
+        blocks = [
+            (segment, start, end, block_min, block_max)
+            for segment in list(self.segments.segments)
+            for start, end, block_min, block_max in segment.blocks(low, high)
+        ]
+        if ascending:
+            blocks.sort(key=lambda block: block[3])
+        else:
+            blocks.sort(key=lambda block: block[4], reverse=True)
+
+        pending: List[Tuple[int, str, dict]] = []
+        for position, (segment, start, end, _, _) in enumerate(blocks):
+            for log, micros in segment.read(start, end):
+                if log["user_id"] != user_id:
+                    continue
+                if (low is not None and micros < low) or (high is not None and micros >= high):
+                    continue
+                if organization_id and log["organization_id"] != organization_id:
+                    continue
+                if status and log["status"] != status:
+                    continue
+                if data_type and log["data_type"] != data_type:
+                    continue
+                if after is not None and (micros, log["id"]) <= after:
+                    continue
+                if before is not None and (micros, log["id"]) >= before:
+                    continue
+                pending.append((micros, log["id"], log))
+            pending.sort(key=lambda match: (match[0], match[1]))
+
+            # Release what no unread block can precede
+            if position + 1 == len(blocks):
+                ready = pending if ascending else pending[::-1]
+                pending = []
+            elif ascending:
+                cut = bisect_left(pending, blocks[position + 1][3], key=lambda match: match[0])
+                ready, pending = pending[:cut], pending[cut:]
+            else:
+                cut = bisect_right(pending, blocks[position + 1][4], key=lambda match: match[0])
+                ready, pending = pending[cut:][::-1], pending[:cut]
+            for micros, _, log in ready:
+                yield log, micros
+
+    def _row(self, log: dict, micros: int) -> dict:
+        """A stored record in the dict shape used by the AccessLog model"""
+        organization_name, organization_logo = self._organization_lookup(log["organization_id"])
+        return {
+            "id": log["id"],
+            "user_id": log["user_id"],
+            "organization_id": log["organization_id"],
+            "organization_name": organization_name,
+            "organization_logo": organization_logo,
+            "data_type": log["data_type"],
+            "purpose": log["purpose"],
+            "timestamp": format_micros(micros),
+            "status": log["status"],
+            "ip_address": log["ip_address"],
+            "user_agent": log["user_agent"]
+        }
+
+    def count(
+        self,
+        user_id: str,
+        since: float,
+        until: Optional[float] = None,
+        organization_id: Optional[str] = None,
+        status: Optional[str] = None,
+        data_type: Optional[str] = None
+    ) -> int:
+        """Number of a user's stored logs in [since, until) matching the filters"""
+        filters = {"organization_id": organization_id, "status": status, "data_type": data_type}
+        if self.rollups is not None and until is not None and self.rollups.answers(**filters):
+            # Whole days in the range from the rollups, the partial ones at each end from the segments
+            first_day = None if since == float("-inf") else -int(-since // DAY_SECONDS)
+            end_day = day_of(until)
+            if first_day is None or first_day < end_day:
+                total = self.rollups.count(user_id, first_day, end_day, **filters)
+                if first_day is not None:
+                    total += self._scan_count(user_id, since, first_day * DAY_SECONDS, filters)
+                return total + self._scan_count(user_id, end_day * DAY_SECONDS, until, filters)
+        return self._scan_count(user_id, since, until, filters)
+
+    def _scan_count(self, user_id: str, since: float, until: Optional[float], filters: dict) -> int:
+        return sum(1 for _ in self._select(user_id, since, until, None, None, True, **filters))
+
+    def iter_recent(
+        self,
+        user_id: str,
+        since: float,
+        until: Optional[float] = None,
+        before: Optional[Tuple[int, str]] = None,
+        after: Optional[Tuple[int, str]] = None,
+        ascending: bool = False,
+        organization_id: Optional[str] = None,
+        status: Optional[str] = None,
+        data_type: Optional[str] = None
+    ) -> Iterator[dict]:
+        """Same contract as AccessLogIndex.iter_recent, read from the segment files"""
+        for log, micros in self._select(user_id, since, until, before, after, ascending, organization_id, status, data_type):
+            yield self._row(log, micros)
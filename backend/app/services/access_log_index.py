@@ -0,0 +1,175 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+import base64
+import binascii
+from typing import Dict, Iterator, Optional, Tuple
+
+from .access_log_columns import ACCESS_LOG_STATUSES, AccessLogColumns, to_micros
+
+def parse_timestamp(value: str) -> float:
+    """Parse an ISO-8601 timestamp (optionally suffixed with Z) into epoch seconds"""
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+def encode_cursor(key: Tuple[int, str]) -> str:
+    """Encode an (epoch micros, id) index key as an opaque pagination cursor"""
+    micros, log_id = key
+    return base64.urlsafe_b64encode(f"{micros}|{log_id}".encode()).decode()
+
+def decode_cursor(cursor: str) -> Tuple[int, str]:
+    """Decode a cursor produced by encode_cursor, raising ValueError if it is malformed"""
+    try:
+        micros, log_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 1)
+        return int(micros), log_id
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+class AccessLogIndex:
+    """
+    Access logs grouped by user and kept sorted by (timestamp, id).
+
+    Rows live in an AccessLogColumns store; per user the index keeps parallel
+    arrays of timestamps and row numbers, so a lookback window is a bisect
+    and a page of results is a slice instead of a scan over every log.
+    """
+
+    def __init__(self, columns: AccessLogColumns):
+        self.columns = columns
+        self._times: Dict[int, array] = {}
+        self._rows: Dict[int, array] = {}
+        self._by_id: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def add(self, log: dict, timestamp: Optional[float] = None) -> float:
+        """Store a log, keeping the user's entries in time order, and return its epoch timestamp"""
+        if timestamp is None:
+            timestamp = parse_timestamp(log["timestamp"])
+        micros = to_micros(timestamp)
+        row = self.columns.append(log, micros)
+
+        user = self.columns.user_codes[row]
+        times = self._times.get(user)
+        if times is None:
+            times = self._times[user] = array('q')
+            self._rows[user] = array('i')
+        rows = self._rows[user]
+
+        # New logs almost always arrive in time order, so appending is the common case
+        if not times or (micros, log["id"]) >= (times[-1], self.columns.ids[rows[-1]]):
+            times.append(micros)
+            rows.append(row)
+        else:
+            position = self._position(times, rows, (micros, log["id"]), right=True)
+            times.insert(position, micros)
+            rows.insert(position, row)
+
+        self._by_id[log["id"]] = row
+        return timestamp
+
+    def get(self, log_id: str) -> Optional[dict]:
+        row = self._by_id.get(log_id)
+        return None if row is None else self.columns.row(row)
+
+    @staticmethod
+    def key_of(log: dict) -> Tuple[int, str]:
+        """Index key of a log, as used for ordering and cursors"""
+        return to_micros(parse_timestamp(log["timestamp"])), log["id"]
+
+    def _position(self, times: array, rows: array, key: Tuple[int, str], right: bool = False) -> int:
+        """Bisect on (timestamp, id); ids only break ties between equal timestamps"""
+        micros, log_id = key
+        position = bisect_left(times, micros)
+        end = bisect_right(times, micros, position)
+        ids = self.columns.ids
+        while position < end and (ids[rows[position]] < log_id or (right and ids[rows[position]] == log_id)):
+            position += 1
+        return position
+
+    def _select(
+        self,
+        user_id: str,
+        since: float,
+        until: Optional[float],
+        before: Optional[Tuple[int, str]],
+        after: Optional[Tuple[int, str]],
+        ascending: bool,
+        organization_id: Optional[str],
+        status: Optional[str],
+        data_type: Optional[str]
+    ) -> Iterator[int]:
+        """Yield matching row numbers, comparing dictionary codes rather than strings"""
+        columns = self.columns
+        user = columns.users.lookup(user_id)
+        times = self._times.get(user)
+        if not times:
+            return
+        rows = self._rows[user]
+
+        start = 0 if since == float("-inf") else bisect_left(times, to_micros(since))
+        end = len(times) if until is None else bisect_left(times, to_micros(until))
+        if after is not None:
+            start = max(start, self._position(times, rows, after, right=True))
+        if before is not None:
+            end = min(end, self._position(times, rows, before))
+
+        # A filter value that was never stored can't match anything
+        organization_code = columns.organizations.lookup(organization_id) if organization_id else None
+        data_type_code = columns.data_types.lookup(data_type) if data_type else None
+        status_code = ACCESS_LOG_STATUSES.index(status) if status in ACCESS_LOG_STATUSES else None
+        if organization_code == -1 or data_type_code == -1 or (status and status_code is None):
+            return
+
+        positions = range(start, end) if ascending else range(end - 1, start - 1, -1)
+        for position in positions:
+            row = rows[position]
+            if organization_code is not None and columns.organization_codes[row] != organization_code:
+                continue
+            if status_code is not None and columns.statuses[row] != status_code:
+                continue
+            if data_type_code is not None and columns.data_type_codes[row] != data_type_code:
+                continue
+            yield row
+
+    def count(
+        self,
+        user_id: str,
+        since: float,
+        organization_id: Optional[str] = None,
+        status: Optional[str] = None,
+        data_type: Optional[str] = None
+    ) -> int:
+        """Number of a user's logs at or after `since` matching the filters"""
+        if organization_id or status or data_type:
+            return sum(1 for _ in self._select(
+                user_id, since, None, None, None, False, organization_id, status, data_type
+            ))
+
+        times = self._times.get(self.columns.users.lookup(user_id))
+        if not times:
+            return 0
+        return len(times) - bisect_left(times, to_micros(since))
+
+    def iter_recent(
+        self,
+        user_id: str,
+        since: float,
+        until: Optional[float] = None,
+        before: Optional[Tuple[int, str]] = None,
+        after: Optional[Tuple[int, str]] = None,
+        ascending: bool = False,
+        organization_id: Optional[str] = None,
+        status: Optional[str] = None,
+        data_type: Optional[str] = None
+    ) -> Iterator[dict]:
+        """
+        Yield a user's logs at or after `since` (and before `until`), most recent first.
+
+        `before` and `after` are exclusive (timestamp, id) keys that narrow the
+        range, so resuming from a cursor costs a bisect regardless of how far
+        back it points. Pass `ascending=True` to walk oldest first instead.
+        Rows are only materialized once they pass the filters.
+        """
+        for row in self._select(user_id, since, until, before, after, ascending, organization_id, status, data_type):
+            yield self.columns.row(row)
@@ -0,0 +1,223 @@
+from bisect import bisect_right
+import time
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .access_log_columns import MICROS, AccessLogColumns
+from .access_log_history import SegmentHistory
+from .access_log_index import AccessLogIndex, parse_timestamp
+from .access_log_rollups import DAY_SECONDS
+
+WEEK_SECONDS = 7 * DAY_SECONDS
+
+# 1970-01-05 was a Monday; week partitions start on Mondays (UTC)
+_WEEK_OFFSET = 4 * DAY_SECONDS
+
+PARTITION_SPANS = {
+    "day": DAY_SECONDS,
+    "week": WEEK_SECONDS
+}
+
+class AccessLogPartition:
+    """Access logs with timestamps in [start, end), stored and indexed independently"""
+
+    __slots__ = ("start", "end", "index")
+
+    def __init__(self, start: float, end: float, index: AccessLogIndex):
+        self.start = start
+        self.end = end
+        self.index = index
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+class PartitionedAccessLogs:
+    """
+    Access logs split into day or week partitions by timestamp.
+
+    Each partition has its own columns and per-user index. Queries only open
+    partitions that overlap their time window, retention drops expired
+    partitions whole, and compaction merges runs of small closed partitions.
+    Exposes the same query methods as AccessLogIndex.
+
+    Given a SegmentHistory and `memory_days`, only logs from `memory_since`
+    on are kept in memory: older ones are not added, evict() drops
+    partitions as they age out, and queries reaching further back continue
+    into the segment files.
+    """
+
+    def __init__(
+        self,
+        organization_lookup: Callable[[str], Tuple[str, str]],
+        partition: str = "day",
+        retention_days: Optional[int] = None,
+        small_partition_rows: int = 10_000,
+        history: Optional[SegmentHistory] = None,
+        memory_days: Optional[int] = None
+    ):
+        if partition not in PARTITION_SPANS:
+            raise ValueError(f"Partition must be one of {', '.join(PARTITION_SPANS)}")
+
+        self._organization_lookup = organization_lookup
+        self.span = PARTITION_SPANS[partition]
+        self.retention_seconds = retention_days * DAY_SECONDS if retention_days else None
+        self.small_partition_rows = small_partition_rows
+        # Compaction never lets one partition cover more than this many seconds
+        self.max_compacted_span = 7 * self.span
+        self.partitions: List[AccessLogPartition] = []
+        self._starts: List[float] = []
+        self.history = history
+        self.memory_seconds = memory_days * DAY_SECONDS if history is not None and memory_days else None
+        # Logs before this are only in the segment files
+        self.memory_since = time.time() - self.memory_seconds if self.memory_seconds else float("-inf")
+
+    def __len__(self) -> int:
+        return sum(len(partition) for partition in self.partitions)
+
+    key_of = staticmethod(AccessLogIndex.key_of)
+
+    def _new_index(self) -> AccessLogIndex:
+        return AccessLogIndex(AccessLogColumns(self._organization_lookup))
+
+    def _partition_for(self, timestamp: float) -> AccessLogPartition:
+        position = bisect_right(self._starts, timestamp) - 1
+        if position >= 0 and timestamp < self.partitions[position].end:
+            return self.partitions[position]
+
+        offset = _WEEK_OFFSET if self.span == WEEK_SECONDS else 0
+        start = (timestamp - offset) // self.span * self.span + offset
+        partition = AccessLogPartition(start, start + self.span, self._new_index())
+        self.partitions.insert(position + 1, partition)
+        self._starts.insert(position + 1, start)
+        return partition
+
+    def add(self, log: dict, timestamp: Optional[float] = None) -> float:
+        """Store a log in the partition covering its timestamp and return the timestamp"""
+        if timestamp is None:
+            timestamp = parse_timestamp(log["timestamp"])
+        if timestamp < self.memory_since:
+            # Older than the in-memory window; it is read back from the segment files
+            return timestamp
+        return self._partition_for(timestamp).index.add(log, timestamp)
+
+    def get(self, log_id: str) -> Optional[dict]:
+        for partition in reversed(self.partitions):
+            log = partition.index.get(log_id)
+            if log is not None:
+                return log
+        return None
+
+    def forget_organization_details(self) -> None:
+        for partition in self.partitions:
+            partition.index.columns.forget_organization_details()
+
+    def _overlapping(self, since: float, until: Optional[float], ascending: bool) -> List[AccessLogPartition]:
+        partitions = [
+            partition for partition in self.partitions
+            if partition.end > since and (until is None or partition.start < until)
+        ]
+        return partitions if ascending else partitions[::-1]
+
+    def _history_since(self, since: float) -> float:
+        """`since`, moved up to the retention cutoff: segments are only dropped whole"""
+        if self.retention_seconds is None:
+            return since
+        return max(since, time.time() - self.retention_seconds)
+
+    def count(self, user_id: str, since: float, **filters) -> int:
+        memory_since = max(since, self.memory_since)
+        total = sum(
+            partition.index.count(user_id, memory_since, **filters)
+            for partition in self._overlapping(memory_since, None, True)
+        )
+        if since < self.memory_since:
+            total += self.history.count(user_id, self._history_since(since), until=self.memory_since, **filters)
+        return total
+
+    def iter_recent(
+        self,
+        user_id: str,
+        since: float,
+        until: Optional[float] = None,
+        ascending: bool = False,
+        **options
+    ) -> Iterator[dict]:
+        """
+        Chain AccessLogIndex.iter_recent across the partitions overlapping the window, in order,
+        and SegmentHistory.iter_recent for any part of it before `memory_since`
+        """
+        memory_since = max(since, self.memory_since)
+        older = None
+        if since < self.memory_since:
+            older = self.history.iter_recent(
+                user_id,
+                self._history_since(since),
+                until=self.memory_since if until is None else min(until, self.memory_since),
+                ascending=ascending,
+                **options
+            )
+        if older is not None and ascending:
+            yield from older
+        if until is None or until > memory_since:
+            for partition in self._overlapping(memory_since, until, ascending):
+                yield from partition.index.iter_recent(user_id, memory_since, until=until, ascending=ascending, **options)
+        if older is not None and not ascending:
+            yield from older
+
+    def evict(self, now: float) -> int:
+        """Drop partitions that have aged out of the in-memory window; returns the rows dropped"""
+        if self.memory_seconds is None:
+            return 0
+
+        cutoff = now - self.memory_seconds
+        evicted = 0
+        while self.partitions and self.partitions[0].end <= cutoff:
+            partition = self.partitions.pop(0)
+            self._starts.pop(0)
+            evicted += len(partition)
+            self.memory_since = max(self.memory_since, partition.end)
+        return evicted
+
+    def drop_expired(self, now: float) -> int:
+        """Drop every partition that ended before the retention window and return the rows removed"""
+        if self.retention_seconds is None:
+            return 0
+
+        cutoff = now - self.retention_seconds
+        expired = 0
+        while self.partitions and self.partitions[0].end <= cutoff:
+            expired += len(self.partitions.pop(0))
+            self._starts.pop(0)
+        return expired
+
+    def compact(self, now: float) -> int:
+        """Merge runs of small, closed neighbouring partitions; returns the number of partitions merged away"""
+        merged_away = 0
+        position = 0
+        while position < len(self.partitions):
+            run_end = position
+            rows = len(self.partitions[position])
+            while (
+                run_end + 1 < len(self.partitions)
+                and self.partitions[run_end + 1].end <= now
+                and rows + len(self.partitions[run_end + 1]) <= self.small_partition_rows
+                and self.partitions[run_end + 1].end - self.partitions[position].start <= self.max_compacted_span
+            ):
+                run_end += 1
+                rows += len(self.partitions[run_end])
+
+            if run_end > position and self.partitions[position].end <= now:
+                self._merge(position, run_end)
+                merged_away += run_end - position
+            position += 1
+        return merged_away
+
+    def _merge(self, first: int, last: int) -> None:
+        run = self.partitions[first:last + 1]
+        index = self._new_index()
+        for partition in run:
+            columns = partition.index.columns
+            for row in range(len(columns)):
+                index.add(columns.row(row), columns.timestamps[row] / MICROS)
+
+        self.partitions[first:last + 1] = [AccessLogPartition(run[0].start, run[-1].end, index)]
+        self._starts[first:last + 1] = [run[0].start]
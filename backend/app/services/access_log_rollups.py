@@ -0,0 +1,142 @@
+from bisect import bisect_left, insort
+from collections import Counter
+from typing import Dict, Iterable, List, Optional
+
+from .access_log_index import parse_timestamp
+
+DAY_SECONDS = 86400
+
+def day_of(timestamp: float) -> int:
+    """UTC day number of an epoch timestamp"""
+    return int(timestamp // DAY_SECONDS)
+
+class AccessLogBucket:
+    """
+    Approved/denied totals plus organization and data type counts for a set of logs.
+
+    Organizations are counted by id; names are resolved when the counts are
+    read, so renaming an organization never splits or strands its counts.
+    """
+
+    __slots__ = ("total", "approved", "denied", "organizations", "data_types")
+
+    def __init__(self):
+        self.total = 0
+        self.approved = 0
+        self.denied = 0
+        self.organizations: Counter = Counter()
+        self.data_types: Counter = Counter()
+
+    def add(self, log: dict) -> None:
+        self.total += 1
+        if log["status"] == "approved":
+            self.approved += 1
+        elif log["status"] == "denied":
+            self.denied += 1
+        self.organizations[log["organization_id"]] += 1
+        self.data_types[log["data_type"]] += 1
+
+    def merge(self, other: "AccessLogBucket") -> None:
+        self.total += other.total
+        self.approved += other.approved
+        self.denied += other.denied
+        self.organizations.update(other.organizations)
+        self.data_types.update(other.data_types)
+
+class AccessLogRollups:
+    """
+    Per-user, per-day access log buckets maintained on ingest.
+
+    A summary over N days merges at most N buckets; only the partially
+    covered first day of the window needs to be read from the raw logs.
+    """
+
+    def __init__(self, logs: Iterable[dict] = ()):
+        self._buckets: Dict[str, Dict[int, AccessLogBucket]] = {}
+        self._days: Dict[str, List[int]] = {}
+        for log in logs:
+            self.add(log, parse_timestamp(log["timestamp"]))
+
+    def add(self, log: dict, timestamp: float) -> None:
+        """Count a newly ingested log in its user's bucket for that day"""
+        day = day_of(timestamp)
+        buckets = self._buckets.setdefault(log["user_id"], {})
+        bucket = buckets.get(day)
+        if bucket is None:
+            bucket = buckets[day] = AccessLogBucket()
+            days = self._days.setdefault(log["user_id"], [])
+            if not days or day > days[-1]:
+                days.append(day)
+            else:
+                insort(days, day)
+        bucket.add(log)
+
+    def merge(self, user_id: str, first_day: int) -> AccessLogBucket:
+        """Combine a user's buckets from `first_day` onwards into a new bucket"""
+        merged = AccessLogBucket()
+        days = self._days.get(user_id)
+        if not days:
+            return merged
+
+        buckets = self._buckets[user_id]
+        for day in days[bisect_left(days, first_day):]:
+            merged.merge(buckets[day])
+        return merged
+
+    def count(
+        self,
+        user_id: str,
+        first_day: Optional[int],
+        end_day: int,
+        organization_id: Optional[str] = None,
+        status: Optional[str] = None,
+        data_type: Optional[str] = None
+    ) -> int:
+        """
+        A user's logs on days [first_day, end_day) (from the first, if None) matching at most one filter.
+
+        Buckets keep no combined counts, so callers check `answers` first.
+        """
+        days = self._days.get(user_id)
+        if not days:
+            return 0
+
+        buckets = self._buckets[user_id]
+        start = 0 if first_day is None else bisect_left(days, first_day)
+        total = 0
+        for day in days[start:bisect_left(days, end_day)]:
+            bucket = buckets[day]
+            if organization_id:
+                total += bucket.organizations[organization_id]
+            elif data_type:
+                total += bucket.data_types[data_type]
+            elif status == "approved":
+                total += bucket.approved
+            elif status == "denied":
+                total += bucket.denied
+            elif status == "pending":
+                total += bucket.total - bucket.approved - bucket.denied
+            elif not status:
+                total += bucket.total
+        return total
+
+    @staticmethod
+    def answers(organization_id: Optional[str] = None, status: Optional[str] = None, data_type: Optional[str] = None) -> bool:
+        """Whether `count` can answer this filter combination"""
+        return sum(1 for value in (organization_id, status, data_type) if value) <= 1
+
+    def drop_before(self, first_day: int) -> None:
+        """Discard every bucket for days before `first_day`"""
+        for user_id in list(self._days):
+            days = self._days[user_id]
+            expired = bisect_left(days, first_day)
+            if not expired:
+                continue
+            buckets = self._buckets[user_id]
+            for day in days[:expired]:
+                del buckets[day]
+            if expired == len(days):
+                del self._days[user_id]
+                del self._buckets[user_id]
+            else:
+                del days[:expired]
@@ -0,0 +1,270 @@
+from array import array
+import mmap
+import os
+import struct
+from typing import Iterable, Iterator, List, Optional, Tuple
+
+from .access_log_columns import ACCESS_LOG_STATUSES
+
+# Every record is a little-endian u32 payload length followed by the payload:
+# i64 epoch micros, u8 status, then id, user_id, organization_id, data_type,
+# purpose, ip_address and user_agent as u16-length-prefixed UTF-8 (0xFFFF = None)
+_LENGTH = struct.Struct("<I")
+_HEADER = struct.Struct("<qB")
+_STRING_LENGTH = struct.Struct("<H")
+_NONE = 0xFFFF
+_STRING_FIELDS = ("id", "user_id", "organization_id", "data_type", "purpose", "ip_address", "user_agent")
+
+SEGMENT_SUFFIX = ".seg"
+INDEX_SUFFIX = ".idx"
+
+def encode_record(log: dict, micros: int) -> bytes:
+    """Serialize a log as a length-prefixed segment record"""
+    parts = [_HEADER.pack(micros, ACCESS_LOG_STATUSES.index(log["status"]))]
+    for field in _STRING_FIELDS:
+        value = log.get(field)
+        if value is None:
+            parts.append(_STRING_LENGTH.pack(_NONE))
+        else:
+            encoded = value.encode("utf-8")
+            if len(encoded) >= _NONE:
+                encoded = encoded[:_NONE - 1].decode("utf-8", "ignore").encode("utf-8")
+            parts.append(_STRING_LENGTH.pack(len(encoded)))
+            parts.append(encoded)
+    payload = b"".join(parts)
+    return _LENGTH.pack(len(payload)) + payload
+
+def decode_record(buffer, offset: int) -> Tuple[dict, int, int]:
+    """Decode the record at `offset`, returning (log without organization details, micros, next offset)"""
+    (length,) = _LENGTH.unpack_from(buffer, offset)
+    position = offset + _LENGTH.size
+    end = position + length
+    micros, status = _HEADER.unpack_from(buffer, position)
+    position += _HEADER.size
+
+    log = {"status": ACCESS_LOG_STATUSES[status]}
+    for field in _STRING_FIELDS:
+        (size,) = _STRING_LENGTH.unpack_from(buffer, position)
+        position += _STRING_LENGTH.size
+        if size == _NONE:
+            log[field] = None
+        else:
+            log[field] = bytes(buffer[position:position + size]).decode("utf-8")
+            position += size
+    return log, micros, end
+
+class Segment:
+    """
+    One append-only segment file plus its sparse index.
+
+    The sparse index holds an (offset, min micros, max micros) entry per
+    block of records, so a time-bounded read only touches blocks that can
+    contain matching records even when records arrive out of time order.
+    """
+
+    def __init__(self, path: str, block_records: int):
+        self.path = path
+        self.block_records = block_records
+        self.size = 0
+        self.records = 0
+        self.min_micros: Optional[int] = None
+        self.max_micros: Optional[int] = None
+        self._offsets = array('q')
+        self._block_min = array('q')
+        self._block_max = array('q')
+
+    @property
+    def index_path(self) -> str:
+        return self.path[:-len(SEGMENT_SUFFIX)] + INDEX_SUFFIX
+
+    def note(self, offset: int, micros: int) -> None:
+        """Account for a record written at `offset`"""
+        if self.records % self.block_records == 0:
+            self._offsets.append(offset)
+            self._block_min.append(micros)
+            self._block_max.append(micros)
+        else:
+            self._block_min[-1] = min(self._block_min[-1], micros)
+            self._block_max[-1] = max(self._block_max[-1], micros)
+        self.min_micros = micros if self.min_micros is None else min(self.min_micros, micros)
+        self.max_micros = micros if self.max_micros is None else max(self.max_micros, micros)
+        self.records += 1
+
+    def load(self) -> None:
+        """Restore the sparse index from its sidecar file, or rebuild it by scanning the segment"""
+        self.size = os.path.getsize(self.path)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb") as index_file:
+                header = index_file.read(16)
+                if len(header) == 16:
+                    self.records, self.size = struct.unpack("<qq", header)
+                    entries = array('q')
+                    entries.frombytes(index_file.read())
+                    self._offsets = entries[0::3]
+                    self._block_min = entries[1::3]
+                    self._block_max = entries[2::3]
+                    if self._block_min:
+                        self.min_micros = min(self._block_min)
+                        self.max_micros = max(self._block_max)
+                    return
+
+        # No usable sidecar (the segment was still being written): scan it, dropping any torn tail
+        size = self.size
+        self.size = 0
+        if size == 0:
+            return
+        with self._open() as buffer:
+            for offset, _, micros, end in self._iter_raw(buffer, 0, size):
+                self.note(offset, micros)
+                self.size = end
+
+    def seal(self) -> None:
+        """Persist the sparse index once the segment will no longer be written to"""
+        entries = array('q')
+        for offset, low, high in zip(self._offsets, self._block_min, self._block_max):
+            entries.extend((offset, low, high))
+        with open(self.index_path, "wb") as index_file:
+            index_file.write(struct.pack("<qq", self.records, self.size))
+            index_file.write(entries.tobytes())
+
+    def _open(self):
+        """Memory-map the segment for reading"""
+        with open(self.path, "rb") as segment_file:
+            return mmap.mmap(segment_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @staticmethod
+    def _iter_raw(buffer, start: int, end: int) -> Iterator[Tuple[int, dict, int, int]]:
+        """Yield (offset, log, micros, next offset) for complete records between two offsets"""
+        end = min(end, len(buffer))
+        offset = start
+        while offset + _LENGTH.size <= end:
+            (length,) = _LENGTH.unpack_from(buffer, offset)
+            if offset + _LENGTH.size + length > end:
+                break
+            log, micros, next_offset = decode_record(buffer, offset)
+            yield offset, log, micros, next_offset
+            offset = next_offset
+
+    def blocks(self, since: Optional[int] = None, until: Optional[int] = None) -> Iterator[Tuple[int, int, int, int]]:
+        """Yield (start offset, end offset, min micros, max micros) of blocks that may hold records in [since, until)"""
+        if self.records == 0:
+            return
+        for block, offset in enumerate(self._offsets):
+            if since is not None and self._block_max[block] < since:
+                continue
+            if until is not None and self._block_min[block] >= until:
+                continue
+            block_end = self._offsets[block + 1] if block + 1 < len(self._offsets) else self.size
+            yield offset, block_end, self._block_min[block], self._block_max[block]
+
+    def read(self, start: int, end: int) -> List[Tuple[dict, int]]:
+        """(log, micros) for the records between two offsets, e.g. one block"""
+        with self._open() as buffer:
+            return [(log, micros) for _, log, micros, _ in self._iter_raw(buffer, start, end)]
+
+    def scan(self, since: Optional[int] = None, until: Optional[int] = None) -> Iterator[Tuple[dict, int]]:
+        """Yield (log, micros) in write order for records with since <= micros < until"""
+        if self.records == 0:
+            return
+        if (since is not None and self.max_micros < since) or (until is not None and self.min_micros >= until):
+            return
+
+        with self._open() as buffer:
+            for block, offset in enumerate(self._offsets):
+                if since is not None and self._block_max[block] < since:
+                    continue
+                if until is not None and self._block_min[block] >= until:
+                    continue
+                block_end = self._offsets[block + 1] if block + 1 < len(self._offsets) else self.size
+                for _, log, micros, _ in self._iter_raw(buffer, offset, block_end):
+                    if (since is None or micros >= since) and (until is None or micros < until):
+                        yield log, micros
+
+class SegmentLog:
+    """
+    Append-only access log persistence in a directory of segment files.
+
+    Writes go sequentially to the newest segment, which rolls over once it
+    reaches `max_segment_bytes`. Reads memory-map the segment files and use
+    each segment's sparse index to skip blocks outside the requested window,
+    so history never has to be loaded into memory as a whole.
+    """
+
+    def __init__(self, directory: str, max_segment_bytes: int = 64 * 1024 * 1024, block_records: int = 1024):
+        self.directory = directory
+        self.max_segment_bytes = max_segment_bytes
+        self.block_records = block_records
+        self.segments: List[Segment] = []
+        self._file = None
+
+        os.makedirs(directory, exist_ok=True)
+        for name in sorted(os.listdir(directory)):
+            if name.endswith(SEGMENT_SUFFIX):
+                segment = Segment(os.path.join(directory, name), block_records)
+                segment.load()
+                self.segments.append(segment)
+
+        if self.segments:
+            active = self.segments[-1]
+            if os.path.exists(active.index_path):
+                os.remove(active.index_path)
+            self._file = open(active.path, "r+b")
+            self._file.truncate(active.size)
+            self._file.seek(active.size)
+        else:
+            self._roll()
+
+    @property
+    def records(self) -> int:
+        return sum(segment.records for segment in self.segments)
+
+    def _roll(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self.segments[-1].seal()
+        number = 0
+        if self.segments:
+            number = int(os.path.basename(self.segments[-1].path)[:-len(SEGMENT_SUFFIX)]) + 1
+        segment = Segment(os.path.join(self.directory, f"{number:010d}{SEGMENT_SUFFIX}"), self.block_records)
+        self.segments.append(segment)
+        self._file = open(segment.path, "wb")
+
+    def append(self, entries: Iterable[Tuple[dict, int]]) -> None:
+        """Append (log, micros) entries, writing each segment's share in one sequential write"""
+        pending = []
+        for log, micros in entries:
+            record = encode_record(log, micros)
+            active = self.segments[-1]
+            if active.size and active.size + len(record) > self.max_segment_bytes:
+                self._file.write(b"".join(pending))
+                pending = []
+                self._roll()
+                active = self.segments[-1]
+            active.note(active.size, micros)
+            active.size += len(record)
+            pending.append(record)
+        if pending:
+            self._file.write(b"".join(pending))
+        self._file.flush()
+
+    def scan(self, since: Optional[int] = None, until: Optional[int] = None) -> Iterator[Tuple[dict, int]]:
+        """Yield persisted (log, micros) entries in write order, optionally bounded by time"""
+        for segment in list(self.segments):
+            yield from segment.scan(since, until)
+
+    def drop_before(self, micros: int) -> int:
+        """Delete sealed segments whose records are all older than `micros`; returns the number deleted"""
+        dropped = 0
+        while len(self.segments) > 1 and (self.segments[0].records == 0 or self.segments[0].max_micros < micros):
+            segment = self.segments.pop(0)
+            os.remove(segment.path)
+            if os.path.exists(segment.index_path):
+                os.remove(segment.index_path)
+            dropped += 1
+        return dropped
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self.segments[-1].seal()
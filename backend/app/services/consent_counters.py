@@ -0,0 +1,69 @@
+from collections import Counter
+from typing import Dict, Iterable, Optional
+
+CONSENT_STATUSES = ("active", "revoked", "expired")
+
+class UserConsentCounts:
+    """One user's consents counted by status, plus consents per organization"""
+
+    __slots__ = ("active", "revoked", "expired", "organizations")
+
+    def __init__(self):
+        self.active = 0
+        self.revoked = 0
+        self.expired = 0
+        self.organizations: Counter = Counter()
+
+    def summary(self) -> dict:
+        return {
+            "total": self.active + self.revoked + self.expired,
+            "active": self.active,
+            "revoked": self.revoked,
+            "expired": self.expired,
+            "organizations": len(self.organizations)
+        }
+
+class ConsentCounters:
+    """
+    Per-user consent counts kept current as consents are added or change status.
+
+    The stats summary reads one entry instead of filtering a user's consents.
+    drift() rebuilds the counts from a full set of consents and reports every
+    user whose maintained summary disagrees.
+    """
+
+    def __init__(self, consents: Iterable[dict] = ()):
+        self._users: Dict[str, UserConsentCounts] = {}
+        for consent in consents:
+            self.move(consent, None)
+
+    def move(self, consent: dict, previous_status: Optional[str]) -> None:
+        """Count a consent under its current status; `previous_status` is None for a new consent"""
+        status = consent["status"]
+        if status == previous_status:
+            return
+
+        counts = self._users.get(consent["user_id"])
+        if counts is None:
+            counts = self._users[consent["user_id"]] = UserConsentCounts()
+        if previous_status is None:
+            counts.organizations[consent["organization_id"]] += 1
+        elif previous_status in CONSENT_STATUSES:
+            setattr(counts, previous_status, getattr(counts, previous_status) - 1)
+        if status in CONSENT_STATUSES:
+            setattr(counts, status, getattr(counts, status) + 1)
+
+    def summary(self, user_id: str) -> dict:
+        counts = self._users.get(user_id)
+        return (counts or UserConsentCounts()).summary()
+
+    def drift(self, consents: Iterable[dict]) -> Dict[str, dict]:
+        """Recompute from scratch and return {user_id: {"expected", "actual"}} for every mismatch"""
+        expected = ConsentCounters(consents)
+        report = {}
+        for user_id in expected._users.keys() | self._users.keys():
+            expected_summary = expected.summary(user_id)
+            actual_summary = self.summary(user_id)
+            if expected_summary != actual_summary:
+                report[user_id] = {"expected": expected_summary, "actual": actual_summary}
+        return report
@@ -0,0 +1,66 @@
+from typing import Dict, Iterable, List, Tuple
+
+from .consent_repository import ConsentRepository
+
+class ConsentDecisions:
+    """
+    Which data types each organization may currently read for each user.
+
+    Data type names are interned to bit positions, and every (user,
+    organization) pair maps to an int bitmask: the union of its active
+    consents. A decision is two dict lookups and a shift. Masks are
+    recomputed for one pair whenever one of its consents changes.
+    """
+
+    def __init__(self, repository: ConsentRepository):
+        self._repository = repository
+        self._bits: Dict[str, int] = {}
+        self._masks: Dict[Tuple[str, str], int] = {}
+        for consent in repository:
+            if consent["status"] == "active":
+                key = (consent["user_id"], consent["organization_id"])
+                self._masks[key] = self._masks.get(key, 0) | self.mask_of(consent["data_types"])
+
+    def __len__(self) -> int:
+        return len(self._masks)
+
+    def mask_of(self, data_types: Iterable[str]) -> int:
+        """Bitmask for a set of data type names, interning any new ones"""
+        mask = 0
+        for data_type in data_types:
+            bit = self._bits.get(data_type)
+            if bit is None:
+                bit = self._bits[data_type] = len(self._bits)
+            mask |= 1 << bit
+        return mask
+
+    def refresh(self, user_id: str, organization_id: str) -> None:
+        """Recompute one pair's mask from its active consents"""
+        mask = 0
+        for consent in self._repository.find(user_id, status="active", organization_id=organization_id):
+            mask |= self.mask_of(consent["data_types"])
+        if mask:
+            self._masks[(user_id, organization_id)] = mask
+        else:
+            self._masks.pop((user_id, organization_id), None)
+
+    def allowed(self, user_id: str, organization_id: str, data_type: str) -> bool:
+        bit = self._bits.get(data_type)
+        if bit is None:
+            return False
+        return bool(self._masks.get((user_id, organization_id), 0) >> bit & 1)
+
+    def allowed_many(self, checks: Iterable[Tuple[str, str, str]]) -> List[bool]:
+        """allowed() for a batch of (user_id, organization_id, data_type) tuples"""
+        bits = self._bits
+        masks = self._masks
+        results = []
+        for user_id, organization_id, data_type in checks:
+            bit = bits.get(data_type)
+            results.append(bit is not None and bool(masks.get((user_id, organization_id), 0) >> bit & 1))
+        return results
+
+    def permitted(self, user_id: str, organization_id: str) -> List[str]:
+        """Data type names the organization may currently read for the user"""
+        mask = self._masks.get((user_id, organization_id), 0)
+        return [data_type for data_type, bit in self._bits.items() if mask >> bit & 1]
@@ -0,0 +1,214 @@
+import asyncio
+from bisect import bisect_left
+import gc
+import json
+import os
+import pickle
+from typing import Dict, Iterable, List, Optional
+
+from .consent_repository import ConsentRepository
+
+EVENTS_FILE = "consent_events.ndjson"
+SNAPSHOT_FILE = "consent_snapshot.pickle"
+
+# One shared encoder: json.dumps with custom separators builds a new one per call.
+# ensure_ascii (the default) keeps every line ASCII, so str length == byte length.
+_encode_event = json.JSONEncoder(separators=(",", ":")).encode
+
+def apply_event(repository: ConsentRepository, event: dict) -> Optional[dict]:
+    """Fold one consent event into the repository and return the affected consent"""
+    action = event["action"]
+    consent = repository.get(event["consent_id"])
+
+    if action == "granted" and consent is None:
+        consent = {
+            "id": event["consent_id"],
+            "user_id": event["user_id"],
+            "organization_id": event["organization_id"],
+            "organization_name": event["organization_name"],
+            "data_types": event["data_types"],
+            "purpose": event["purpose"],
+            "status": "active",
+            "granted_at": event["timestamp"],
+            "revoked_at": None,
+            "expires_at": event.get("expires_at")
+        }
+        repository.add(consent)
+    elif consent is None:
+        return None
+    elif action == "revoked":
+        repository.update(consent["id"], status="revoked", revoked_at=event["timestamp"])
+    elif action == "expired":
+        repository.update(consent["id"], status="expired")
+    elif action == "updated" and event.get("data_types") is not None:
+        repository.update(consent["id"], data_types=event["data_types"])
+    return consent
+
+class ConsentEventLog:
+    """
+    Append-only log of consent events with a per-consent index.
+
+    In memory only by default. Given a directory, events are appended to an
+    NDJSON file and the index holds byte offsets into it, so reading one
+    consent's history is k reads. A snapshot saves the derived consents and
+    the index together with the file position they cover; load() restores
+    the latest snapshot and replays only the events written after it.
+    """
+
+    def __init__(self, directory: Optional[str] = None):
+        self.directory = directory
+        self.count = 0
+        self.count_at_snapshot = 0
+        self._history: Dict[str, list] = {}
+        self._file = None
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._file = open(os.path.join(directory, EVENTS_FILE), "a+b")
+
+    @property
+    def persistent(self) -> bool:
+        return self._file is not None
+
+    def index(self, events: Iterable[dict]) -> None:
+        """Add events to the in-memory history index"""
+        for event in events:
+            self._history.setdefault(event["consent_id"], []).append(event)
+            self.count += 1
+
+    def append(self, events: List[dict]) -> None:
+        """Durably append events and index them"""
+        if not self.persistent:
+            self.index(events)
+            return
+
+        self._file.seek(0, os.SEEK_END)
+        offset = self._file.tell()
+        lines = []
+        for event in events:
+            line = _encode_event(event) + "\n"
+            self._offsets(event["consent_id"]).append(offset)
+            offset += len(line)
+            lines.append(line)
+        self._file.write("".join(lines).encode("ascii"))
+        self._file.flush()
+        self.count += len(events)
+
+    def _offsets(self, consent_id: str) -> List[int]:
+        offsets = self._history.get(consent_id)
+        if offsets is None:
+            offsets = self._history[consent_id] = []
+        return offsets
+
+    def history(self, consent_id: str) -> List[dict]:
+        """Events for one consent in the order they happened"""
+        entries = self._history.get(consent_id, [])
+        if not self.persistent:
+            return list(entries)
+
+        events = []
+        for offset in entries:
+            self._file.seek(offset)
+            events.append(json.loads(self._file.readline()))
+        return events
+
+    def load(self, repository: ConsentRepository) -> bool:
+        """
+        Restore state from disk: the latest snapshot, then any events after it.
+        Returns False when there is nothing on disk yet.
+        """
+        if not self.persistent:
+            return False
+
+        # Loading allocates millions of long-lived objects; the cyclic GC
+        # would rescan all of them repeatedly for nothing
+        collecting = gc.isenabled()
+        gc.disable()
+        try:
+            return self._load(repository)
+        finally:
+            if collecting:
+                gc.enable()
+
+    def _load(self, repository: ConsentRepository) -> bool:
+        position = 0
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        if os.path.exists(snapshot_path):
+            with open(snapshot_path, "rb") as snapshot_file:
+                snapshot = pickle.load(snapshot_file)
+            for consent in snapshot["consents"]:
+                repository.add(consent)
+            self._history = snapshot["history"]
+            self.count = self.count_at_snapshot = snapshot["count"]
+            position = snapshot["position"]
+
+        self._file.seek(0, os.SEEK_END)
+        end = self._file.tell()
+        if position == 0 and end == 0:
+            return False
+
+        self._file.seek(position)
+        while position < end:
+            line = self._file.readline()
+            if not line.endswith(b"\n"):
+                # Torn final write: drop it so the next append starts on a clean line
+                self._file.truncate(position)
+                break
+            event = json.loads(line.decode("utf-8"))
+            self._offsets(event["consent_id"]).append(position)
+            apply_event(repository, event)
+            self.count += 1
+            position += len(line)
+        return True
+
+    def snapshot_state(self, repository: ConsentRepository) -> dict:
+        """Copy what a snapshot needs in one go; for startup, before requests are served"""
+        self._file.seek(0, os.SEEK_END)
+        return {
+            "position": self._file.tell(),
+            "count": self.count,
+            "consents": [dict(consent) for consent in repository],
+            "history": {consent_id: list(offsets) for consent_id, offsets in self._history.items()}
+        }
+
+    async def snapshot_state_incrementally(self, repository: ConsentRepository, chunk_size: int = 10_000) -> dict:
+        """
+        Copy what a snapshot needs in chunks, yielding to the event loop between them.
+
+        The snapshot covers the log up to the position taken at the start.
+        Changes made while copying may also show up in it; that is harmless,
+        because load() replays every event after the position and each event
+        sets absolute values, so replaying one already reflected changes nothing.
+        Offsets past the position are left out: replay indexes them again.
+        """
+        self._file.seek(0, os.SEEK_END)
+        position = self._file.tell()
+        count = self.count
+        consents = list(repository)
+        histories = list(self._history.items())
+
+        copied = []
+        for start in range(0, len(consents), chunk_size):
+            copied.extend(dict(consent) for consent in consents[start:start + chunk_size])
+            await asyncio.sleep(0)
+
+        history = {}
+        for start in range(0, len(histories), chunk_size):
+            for consent_id, offsets in histories[start:start + chunk_size]:
+                if offsets and offsets[0] < position:
+                    history[consent_id] = offsets[:bisect_left(offsets, position)]
+            await asyncio.sleep(0)
+
+        return {"position": position, "count": count, "consents": copied, "history": history}
+
+    def write_snapshot(self, state: dict) -> None:
+        """Write a snapshot atomically; safe to run off the event loop"""
+        snapshot_path = os.path.join(self.directory, SNAPSHOT_FILE)
+        with open(snapshot_path + ".tmp", "wb") as snapshot_file:
+            pickle.dump(state, snapshot_file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(snapshot_path + ".tmp", snapshot_path)
+        self.count_at_snapshot = state["count"]
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
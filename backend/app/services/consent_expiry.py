@@ -0,0 +1,54 @@
+import heapq
+from typing import Iterable, List, Optional, Tuple
+
+from .access_log_index import parse_timestamp
+from .consent_repository import ConsentRepository
+
+class ConsentExpiryQueue:
+    """
+    Min-heap of pending consent expirations ordered by expires_at.
+
+    Entries are never removed when a consent is revoked or re-dated; they are
+    checked against the repository when they reach the top and skipped if
+    stale. Finding due consents is O(k log n) for k due entries, so the
+    expiry job never walks the consent table.
+    """
+
+    def __init__(self, repository: ConsentRepository, consents: Iterable[dict] = ()):
+        self._repository = repository
+        self._heap: List[Tuple[float, str, str]] = [
+            entry for entry in map(self._entry, consents) if entry is not None
+        ]
+        heapq.heapify(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    @staticmethod
+    def _entry(consent: dict) -> Optional[Tuple[float, str, str]]:
+        if consent["status"] != "active" or not consent.get("expires_at"):
+            return None
+        return (parse_timestamp(consent["expires_at"]), consent["id"], consent["expires_at"])
+
+    def schedule(self, consent: dict) -> None:
+        """Track an active consent's expiry; a no-op for consents without one"""
+        entry = self._entry(consent)
+        if entry is not None:
+            heapq.heappush(self._heap, entry)
+
+    def next_due(self) -> Optional[float]:
+        """Epoch seconds of the earliest pending expiry, if any"""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float, limit: int) -> List[dict]:
+        """Remove and return up to `limit` active consents whose expiry is at or before `now`"""
+        due = []
+        heap = self._heap
+        while heap and heap[0][0] <= now and len(due) < limit:
+            _, consent_id, expires_at = heapq.heappop(heap)
+            consent = self._repository.get(consent_id)
+            # Stale entry: revoked, already expired, or given a new expiry since it was queued
+            if consent is None or consent["status"] != "active" or consent.get("expires_at") != expires_at:
+                continue
+            due.append(consent)
+        return due
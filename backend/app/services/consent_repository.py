@@ -0,0 +1,80 @@
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+GroupKey = Tuple[str, Optional[str], Optional[str]]
+
+def _group_keys(consent: dict, with_status: bool = True, without_status: bool = True) -> List[GroupKey]:
+    """The (user_id, organization_id, status) lookups a consent belongs to; None means any"""
+    user_id = consent["user_id"]
+    organization_id = consent["organization_id"]
+    keys = []
+    if without_status:
+        keys += [(user_id, None, None), (user_id, organization_id, None)]
+    if with_status:
+        keys += [(user_id, None, consent["status"]), (user_id, organization_id, consent["status"])]
+    return keys
+
+class ConsentRepository:
+    """
+    Consents indexed by id and by every (user, organization, status) filter combination.
+
+    Each group is an insertion-ordered dict keyed by consent id, so adding a
+    consent or moving it between statuses is O(1) and a lookup returns just
+    the matching consents.
+    """
+
+    def __init__(self, consents: Iterable[dict] = ()):
+        self._by_id: Dict[str, dict] = {}
+        self._groups: Dict[GroupKey, Dict[str, dict]] = {}
+        for consent in consents:
+            self.add(consent)
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def __iter__(self) -> Iterator[dict]:
+        return iter(self._by_id.values())
+
+    def _link(self, consent: dict, keys: List[GroupKey]) -> None:
+        groups = self._groups
+        for key in keys:
+            group = groups.get(key)
+            if group is None:
+                group = groups[key] = {}
+            group[consent["id"]] = consent
+
+    def _unlink(self, consent: dict, keys: List[GroupKey]) -> None:
+        groups = self._groups
+        for key in keys:
+            group = groups.get(key)
+            if group is not None:
+                group.pop(consent["id"], None)
+                if not group:
+                    del groups[key]
+
+    def add(self, consent: dict) -> None:
+        self._by_id[consent["id"]] = consent
+        self._link(consent, _group_keys(consent))
+
+    def get(self, consent_id: str) -> Optional[dict]:
+        return self._by_id.get(consent_id)
+
+    def find(self, user_id: str, status: Optional[str] = None, organization_id: Optional[str] = None) -> List[dict]:
+        """A user's consents, optionally narrowed by status and/or organization"""
+        return list(self._groups.get((user_id, organization_id, status), {}).values())
+
+    def active_for(self, user_id: str, organization_id: str) -> Optional[dict]:
+        """The oldest active consent a user has given an organization"""
+        group = self._groups.get((user_id, organization_id, "active"))
+        return next(iter(group.values())) if group else None
+
+    def update(self, consent_id: str, **changes) -> dict:
+        """Apply field changes to a consent, re-indexing it if its status changes"""
+        consent = self._by_id[consent_id]
+        moved = "status" in changes and changes["status"] != consent["status"]
+        if moved:
+            # Only the status-specific groups change; the others keep their order
+            self._unlink(consent, _group_keys(consent, without_status=False))
+        consent.update(changes)
+        if moved:
+            self._link(consent, _group_keys(consent, without_status=False))
+        return consent
@@ -0,0 +1,108 @@
+import asyncio
+from collections import Counter, OrderedDict
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+def _retrieve_exception(task: asyncio.Task) -> None:
+    # Every waiter may be gone when a generation fails; don't log it as unretrieved
+    if not task.cancelled():
+        task.exception()
+
+class GenerationCache:
+    """
+    Results of a slow async generation step, bounded by count and age.
+
+    Entries live in an OrderedDict in least-recently-used order with the
+    time they were generated; beyond `max_entries` the stalest is evicted
+    and entries older than `ttl_seconds` are regenerated on their next use.
+    Concurrent misses on one key share a single generation instead of each
+    starting their own; it runs as its own task, so a waiter being cancelled
+    (a client disconnecting) leaves it running for the others. Keys are
+    tuples whose first item is the language, so hit rates are also kept per
+    language.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._pending: Dict[Hashable, asyncio.Task] = {}
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.evicted = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Tuple, now: Optional[float] = None) -> Optional[Any]:
+        """The cached value for `key`, or None if it is missing or too old"""
+        entry = self._entries.get(key)
+        if entry is not None:
+            now = time.monotonic() if now is None else now
+            if now - entry[0] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits[key[0]] += 1
+                return entry[1]
+            del self._entries[key]
+            self.expired += 1
+        return None
+
+    def put(self, key: Tuple, value: Any, now: Optional[float] = None) -> None:
+        self._entries[key] = (time.monotonic() if now is None else now, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evicted += 1
+
+    async def get_or_generate(self, key: Tuple, generate: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """(value, True) from the cache, or (value, False) after generating it once for all waiters"""
+        value = self.get(key)
+        if value is not None:
+            return value, True
+        self.misses[key[0]] += 1
+
+        pending = self._pending.get(key)
+        if pending is None:
+            pending = self._pending[key] = asyncio.ensure_future(self._generate(key, generate))
+            pending.add_done_callback(_retrieve_exception)
+        # Cancelling one waiter cancels only its wait, never the shared generation
+        return await asyncio.shield(pending), False
+
+    async def _generate(self, key: Tuple, generate: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            value = await generate()
+        finally:
+            del self._pending[key]
+        self.put(key, value)
+        return value
+
+    def clear(self, language: Optional[str] = None) -> int:
+        """Drop every entry, or those of one language; returns how many were dropped"""
+        keys = [key for key in self._entries if language is None or key[0] == language]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def stats(self) -> dict:
+        hits = sum(self.hits.values())
+        misses = sum(self.misses.values())
+        languages = {}
+        for language in sorted(set(self.hits) | set(self.misses)):
+            lookups = self.hits[language] + self.misses[language]
+            languages[language] = {
+                "hits": self.hits[language],
+                "misses": self.misses[language],
+                "hit_rate": self.hits[language] / lookups
+            }
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / (hits + misses) if hits + misses else 0.0,
+            "evicted": self.evicted,
+            "expired": self.expired,
+            "languages": languages
+        }
@@ -0,0 +1,195 @@
+import asyncio
+import json
+import re
+import time
+import urllib.request
+from typing import Dict, Iterable, Optional, Tuple
+
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+GOOGLE_JWKS_URL = "https://www.googleapis.com/oauth2/v3/certs"
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+class InvalidIdToken(Exception):
+    """An ID token that is malformed, badly signed, expired or meant for someone else"""
+
+class SigningKeysUnavailable(Exception):
+    """No signing keys have been loaded yet"""
+
+def _is_number(value) -> bool:
+    """A JSON number; bools are ints to isinstance but not NumericDate values"""
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+class FileJwksSource:
+    """JWKS read from a local JSON file - a stand-in for the provider's endpoint"""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def fetch(self) -> Tuple[dict, Optional[float]]:
+        with open(self.path, "r", encoding="utf-8") as f:
+            return json.load(f), None
+
+class HttpJwksSource:
+    """JWKS fetched over HTTPS, honouring the response's Cache-Control max-age"""
+
+    def __init__(self, url: str = GOOGLE_JWKS_URL, timeout: float = 10):
+        self.url = url
+        self.timeout = timeout
+
+    def fetch(self) -> Tuple[dict, Optional[float]]:
+        with urllib.request.urlopen(self.url, timeout=self.timeout) as response:
+            match = re.search(r"max-age=(\d+)", response.headers.get("Cache-Control", ""))
+            return json.load(response), float(match.group(1)) if match else None
+
+class GoogleIdTokens:
+    """
+    Verifies Google ID tokens against a cached JWKS.
+
+    Keys are parsed into jose Key objects once per refresh and looked up by
+    the token's `kid`, so verifying is local crypto with no network call.
+    `run()` refreshes the key set in the background every `refresh_seconds`
+    (sooner if the source sends a shorter max-age, or when a token names a
+    kid not seen yet, at most once per `min_refresh_seconds`). A failed
+    refresh keeps the previous keys. The source is anything with a blocking
+    `fetch() -> (jwks, max_age)`; it runs in a worker thread.
+    """
+
+    def __init__(
+        self,
+        source,
+        audiences: Iterable[str],
+        issuers: Iterable[str] = GOOGLE_ISSUERS,
+        refresh_seconds: float = 3600,
+        min_refresh_seconds: float = 60,
+        leeway_seconds: float = 60
+    ):
+        self.source = source
+        self.audiences = frozenset(audiences)
+        self.issuers = tuple(issuers)
+        self.refresh_seconds = refresh_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        self.leeway_seconds = leeway_seconds
+        self._keys: Dict[str, Tuple[Key, str]] = {}
+        self._refresh_wanted: Optional[asyncio.Event] = None
+        self.refreshed_at: Optional[float] = None
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.last_error: Optional[str] = None
+        self.verified = 0
+        self.rejected = 0
+
+    @property
+    def ready(self) -> bool:
+        return bool(self._keys)
+
+    def load(self, jwks: dict) -> int:
+        """Replace the key set with the keys of a JWKS document; returns how many were loaded"""
+        keys = {}
+        for key_data in jwks.get("keys", []):
+            kid = key_data.get("kid")
+            if kid and key_data.get("use", "sig") == "sig":
+                algorithm = key_data.get("alg", "RS256")
+                keys[kid] = (jwk.construct(key_data, algorithm), algorithm)
+        if not keys:
+            raise ValueError("JWKS contains no signing keys")
+        self._keys = keys
+        self.refreshed_at = time.time()
+        self.refreshes += 1
+        return len(keys)
+
+    async def refresh(self) -> Optional[float]:
+        """Fetch and load the key set; returns the source's max-age, if it sent one"""
+        jwks, max_age = await asyncio.to_thread(self.source.fetch)
+        self.load(jwks)
+        return max_age
+
+    def _request_refresh(self) -> None:
+        if self._refresh_wanted is not None:
+            self._refresh_wanted.set()
+
+    def verify(self, id_token: str, now: Optional[float] = None) -> dict:
+        """Claims of a valid ID token; raises InvalidIdToken otherwise, SigningKeysUnavailable before the first refresh"""
+        if not self._keys:
+            raise SigningKeysUnavailable()
+        now = time.time() if now is None else now
+        try:
+            kid = jwt.get_unverified_header(id_token).get("kid")
+            if not isinstance(kid, str):
+                raise InvalidIdToken("Malformed key id")
+            entry = self._keys.get(kid)
+            if entry is None:
+                # Probably rotated in since the last refresh; the next sign-in will find it
+                self._request_refresh()
+                raise InvalidIdToken("Unknown signing key")
+            # The key's own algorithm, never the header's. Expiry and audience are
+            # checked below: against `now`, and for any of several client ids
+            key, algorithm = entry
+            claims = jwt.decode(
+                id_token,
+                key,
+                algorithms=[algorithm],
+                issuer=self.issuers,
+                options={"verify_aud": False, "verify_exp": False, "verify_iat": False, "verify_nbf": False}
+            )
+        except JWTError as exc:
+            self.rejected += 1
+            raise InvalidIdToken(str(exc))
+        except InvalidIdToken:
+            self.rejected += 1
+            raise
+
+        # Claims are attacker-shaped JSON: check types before using them, so a
+        # bad value is an InvalidIdToken rather than a TypeError
+        audiences = claims.get("aud")
+        audiences = [audiences] if isinstance(audiences, str) else audiences
+        if not isinstance(audiences, list) or not self.audiences.intersection(
+            audience for audience in audiences if isinstance(audience, str)
+        ):
+            self.rejected += 1
+            raise InvalidIdToken("Token was issued for another client")
+        if not _is_number(claims.get("exp")) or claims["exp"] + self.leeway_seconds <= now:
+            self.rejected += 1
+            raise InvalidIdToken("Token has expired")
+        if "iat" in claims and (not _is_number(claims["iat"]) or claims["iat"] - self.leeway_seconds > now):
+            self.rejected += 1
+            raise InvalidIdToken("Token was issued in the future")
+        if not all(isinstance(claims.get(name), str) and claims[name] for name in ("sub", "email")):
+            self.rejected += 1
+            raise InvalidIdToken("Token is missing required claims")
+        self.verified += 1
+        return claims
+
+    async def run(self, retry_seconds: float = 30) -> None:
+        """Background job: keep the key set fresh"""
+        self._refresh_wanted = asyncio.Event()
+        while True:
+            try:
+                max_age = await self.refresh()
+                self.last_error = None
+                delay = min(self.refresh_seconds, max_age) if max_age else self.refresh_seconds
+            except Exception as exc:
+                self.refresh_failures += 1
+                self.last_error = str(exc)
+                delay = retry_seconds if self._keys else min(retry_seconds, 5)
+            delay = max(delay, self.min_refresh_seconds if self._keys else 0)
+
+            self._refresh_wanted.clear()
+            try:
+                await asyncio.wait_for(self._refresh_wanted.wait(), timeout=delay)
+                # Asked to refresh early: still no more often than min_refresh_seconds
+                await asyncio.sleep(max(0, self.min_refresh_seconds - (time.time() - (self.refreshed_at or 0))))
+            except asyncio.TimeoutError:
+                pass
+
+    def stats(self) -> dict:
+        return {
+            "keys": sorted(self._keys),
+            "refreshed_at": self.refreshed_at,
+            "refreshes": self.refreshes,
+            "refresh_failures": self.refresh_failures,
+            "last_error": self.last_error,
+            "verified": self.verified,
+            "rejected": self.rejected
+        }
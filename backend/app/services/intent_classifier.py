@@ -0,0 +1,89 @@
+import re
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+from .org_search import normalize
+
+def _trie_pattern(words: Iterable[str]) -> str:
+    """
+    Regex alternation of `words` shaped as a trie ("ba(?:nk(?:i)?|...)").
+
+    Alternatives share their prefixes, so at each text position the regex
+    engine follows one branch per character instead of trying every word,
+    and the greedy optional tails prefer the longest word.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        branches = [re.escape(char) + emit(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+class KeywordClassifier:
+    """
+    Classifies text by which keyword groups occur in it, in one pass.
+
+    Every keyword of every group is compiled at construction into a single
+    trie-shaped regex, so the text is read once by the C regex engine
+    however many keywords there are. Each keyword maps to the bitmask of
+    the groups it belongs to, plus those of the shorter keywords it starts
+    with, since a match starting at a position only reports the longest.
+    Searching resumes one character after each match start, so overlapping
+    keywords are all seen. Intents are checked in order and the first whose
+    required groups all occurred wins.
+
+    Text and keywords are compared after `normalize` (lowercased; accents
+    stripped from non-ASCII text).
+    """
+
+    def __init__(self, groups: Dict[str, Iterable[str]], intents: Sequence[Tuple[str, Sequence[str]]], default: str = "default"):
+        bits = {group: 1 << position for position, group in enumerate(groups)}
+        masks: Dict[str, int] = {}
+        for group, keywords in groups.items():
+            for keyword in keywords:
+                keyword = normalize(keyword)
+                if keyword:
+                    masks[keyword] = masks.get(keyword, 0) | bits[group]
+        for keyword in masks:
+            for prefix in range(1, len(keyword)):
+                masks[keyword] |= masks.get(keyword[:prefix], 0)
+
+        self._masks = masks
+        self._pattern = re.compile(_trie_pattern(masks)) if masks else None
+        self._intents: List[Tuple[str, int]] = [
+            (intent, sum(bits[group] for group in required)) for intent, required in intents
+        ]
+        self._all_groups = (1 << len(bits)) - 1
+        self.default = default
+
+    def groups_mask(self, text: str) -> int:
+        """Bitmask of the keyword groups occurring in `text`"""
+        if self._pattern is None:
+            return 0
+        text = normalize(text)
+        search = self._pattern.search
+        masks = self._masks
+        all_groups = self._all_groups
+        mask = 0
+        match = search(text)
+        while match is not None:
+            mask |= masks[match.group()]
+            if mask == all_groups:
+                break
+            match = search(text, match.start() + 1)
+        return mask
+
+    def classify(self, text: str) -> str:
+        mask = self.groups_mask(text)
+        for intent, required in self._intents:
+            if required & mask == required:
+                return intent
+        return self.default
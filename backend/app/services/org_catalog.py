@@ -0,0 +1,119 @@
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Type
+
+from pydantic import BaseModel
+
+UNKNOWN_ORGANIZATION = ("Unknown Organization", "business")
+
+class OrgCatalog:
+    """
+    The organizations every router reads, indexed once.
+
+    Holds the raw org dicts by id, a prebuilt response model per org and
+    per-category model lists, so lookups on ingest and listing endpoints do
+    no scanning or model construction. `version` increases on every change;
+    callers that cache anything derived from orgs compare against it or
+    register an on_change callback.
+    """
+
+    def __init__(self, organizations: Iterable[dict], model: Type[BaseModel]):
+        self._model = model
+        self.version = 0
+        self.organizations: Dict[str, dict] = {}
+        self._models: Dict[str, BaseModel] = {}
+        self._by_category: Dict[str, Dict[str, BaseModel]] = {}
+        self._category_lists: Dict[str, List[BaseModel]] = {}
+        self._all: Optional[List[BaseModel]] = None
+        self._listeners: List[Callable[[List[str]], None]] = []
+        for org in organizations:
+            self._put(org)
+
+    def __len__(self) -> int:
+        return len(self.organizations)
+
+    @staticmethod
+    def category_of(org: dict) -> str:
+        return org.get("category") or "Other"
+
+    def _put(self, org: dict) -> None:
+        self._drop(org["id"])
+        model = self._model(**org)
+        category = self.category_of(org)
+        self.organizations[org["id"]] = org
+        self._models[org["id"]] = model
+        self._by_category.setdefault(category, {})[org["id"]] = model
+        self._category_lists.pop(category, None)
+
+    def _drop(self, org_id: str) -> None:
+        org = self.organizations.pop(org_id, None)
+        if org is None:
+            return
+        del self._models[org_id]
+        category = self.category_of(org)
+        members = self._by_category[category]
+        del members[org_id]
+        if not members:
+            del self._by_category[category]
+        self._category_lists.pop(category, None)
+
+    def _changed(self, org_ids: List[str]) -> None:
+        self.version += 1
+        self._all = None
+        for listener in self._listeners:
+            listener(org_ids)
+
+    def on_change(self, listener: Callable[[List[str]], None]) -> None:
+        """Call `listener` with the affected org ids after every change"""
+        self._listeners.append(listener)
+
+    def upsert(self, org: dict) -> None:
+        """Add an organization or replace the one with the same id"""
+        self._put(org)
+        self._changed([org["id"]])
+
+    def update_fields(self, changes: Dict[str, dict]) -> None:
+        """Merge field changes into many organizations with a single version bump; unknown ids are skipped"""
+        updated = []
+        for org_id, fields in changes.items():
+            org = self.organizations.get(org_id)
+            if org is not None:
+                self._put({**org, **fields})
+                updated.append(org_id)
+        if updated:
+            self._changed(updated)
+
+    def remove(self, org_id: str) -> bool:
+        if org_id not in self.organizations:
+            return False
+        self._drop(org_id)
+        self._changed([org_id])
+        return True
+
+    def get(self, org_id: str) -> Optional[dict]:
+        return self.organizations.get(org_id)
+
+    def model(self, org_id: str) -> Optional[BaseModel]:
+        """The prebuilt response model for one organization"""
+        return self._models.get(org_id)
+
+    def models(self, category: Optional[str] = None) -> List[BaseModel]:
+        """Prebuilt models for every organization, or for one category; callers must not mutate the list"""
+        if category is None:
+            if self._all is None:
+                self._all = list(self._models.values())
+            return self._all
+
+        models = self._category_lists.get(category)
+        if models is None:
+            models = self._category_lists[category] = list(self._by_category.get(category, {}).values())
+        return models
+
+    def categories(self) -> List[str]:
+        return sorted(self._by_category)
+
+    def details(self, org_id: str) -> Tuple[str, str]:
+        """Name and logo for an organization, with a placeholder for unknown ids"""
+        org = self.organizations.get(org_id)
+        return (org["name"], org["logo"]) if org is not None else UNKNOWN_ORGANIZATION
+
+    def name(self, org_id: str) -> str:
+        return self.details(org_id)[0]
@@ -0,0 +1,134 @@
+from bisect import bisect_left, insort
+import heapq
+from typing import Dict, Iterable, List, Tuple
+import re
+import unicodedata
+
+# How much a match in each field counts towards an org's rank
+FIELD_WEIGHTS = {
+    "name": 3.0,
+    "category": 2.0,
+    "dataTypes": 1.5,
+    "description": 1.0
+}
+
+# A query token that is only a prefix of the indexed token counts this much of a whole-word match
+PREFIX_MATCH_FACTOR = 0.5
+
+_TOKEN = re.compile(r"\w+")
+
+def normalize(text: str) -> str:
+    """Casefold and strip accents, so "Ọ̀yọ́" and "oyo" compare equal"""
+    if text.isascii():
+        return text.lower()
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(normalize(text))
+
+class OrgSearchIndex:
+    """
+    Inverted index over organization name, description, category and data types.
+
+    Each token maps to the orgs containing it with a field-weighted score;
+    a sorted vocabulary turns a query prefix into a bisect range. Every
+    query token must match (whole word or prefix) and orgs are ranked by
+    the summed weights. Orgs are re-indexed individually as they change.
+    """
+
+    def __init__(self, organizations: Iterable[dict] = ()):
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._vocabulary: List[str] = []
+        self._documents: Dict[str, Dict[str, float]] = {}
+        for org in organizations:
+            self.update(org)
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    @staticmethod
+    def _weights(org: dict) -> Dict[str, float]:
+        weights: Dict[str, float] = {}
+        for field, weight in FIELD_WEIGHTS.items():
+            value = org.get(field)
+            if not value:
+                continue
+            for text in (value if isinstance(value, list) else [value]):
+                for token in tokenize(text):
+                    weights[token] = weights.get(token, 0.0) + weight
+        return weights
+
+    def update(self, org: dict) -> None:
+        """Index an org, replacing whatever was indexed for its id"""
+        weights = self._weights(org)
+        if self._documents.get(org["id"]) == weights:
+            return
+        self.remove(org["id"])
+        self._documents[org["id"]] = weights
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                insort(self._vocabulary, token)
+            postings[org["id"]] = weight
+
+    def remove(self, org_id: str) -> None:
+        weights = self._documents.pop(org_id, None)
+        if weights is None:
+            return
+        for token in weights:
+            postings = self._postings[token]
+            del postings[org_id]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect_left(self._vocabulary, token)]
+
+    def _matches(self, query_token: str) -> Dict[str, float]:
+        """Orgs matching one query token, as a whole word or a prefix, with their weight"""
+        matches: Dict[str, float] = {}
+        vocabulary = self._vocabulary
+        position = bisect_left(vocabulary, query_token)
+        while position < len(vocabulary) and vocabulary[position].startswith(query_token):
+            token = vocabulary[position]
+            factor = 1.0 if token == query_token else PREFIX_MATCH_FACTOR
+            postings = self._postings[token]
+            if not matches:
+                matches = {org_id: weight * factor for org_id, weight in postings.items()}
+            else:
+                for org_id, weight in postings.items():
+                    score = weight * factor
+                    if score > matches.get(org_id, 0.0):
+                        matches[org_id] = score
+            position += 1
+        return matches
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[str, float]]:
+        """(org_id, score) pairs for orgs matching every token of `query`, best first"""
+        query_tokens = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not query_tokens:
+            return []
+
+        # Longest tokens first: they usually match the fewest orgs
+        scores = self._matches(query_tokens[0])
+        for query_token in query_tokens[1:]:
+            if not scores:
+                break
+            matches = self._matches(query_token)
+            scores = {org_id: score + matches[org_id] for org_id, score in scores.items() if org_id in matches}
+
+        # Scores take few distinct values, so rank by score bucket and only
+        # order ids (alphabetically, for stable results) within the buckets used
+        buckets: Dict[float, List[str]] = {}
+        for org_id, score in scores.items():
+            bucket = buckets.get(score)
+            if bucket is None:
+                bucket = buckets[score] = []
+            bucket.append(org_id)
+
+        ranked = []
+        for score in sorted(buckets, reverse=True):
+            ranked.extend((org_id, score) for org_id in heapq.nsmallest(limit - len(ranked), buckets[score]))
+            if len(ranked) >= limit:
+                break
+        return ranked
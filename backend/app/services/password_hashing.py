@@ -0,0 +1,82 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import time
+from typing import Optional
+
+from passlib.context import CryptContext
+
+class PasswordHasherBusy(Exception):
+    """Too many password operations are already waiting for the pool"""
+
+class PasswordHasher:
+    """
+    bcrypt hashing and verification on a small dedicated thread pool.
+
+    bcrypt releases the GIL, so the event loop keeps serving other requests
+    while a hash runs. At most `max_concurrency` operations run at once;
+    up to `max_waiting` more queue for a slot and anything beyond that is
+    rejected with PasswordHasherBusy instead of piling up behind a login
+    storm. Queue depth and wait/run times are kept for stats().
+    """
+
+    def __init__(self, rounds: int = 12, max_concurrency: int = 2, max_waiting: int = 64):
+        self.context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds)
+        self.max_concurrency = max_concurrency
+        self.max_waiting = max_waiting
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="password-hash")
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.running = 0
+        self.waiting = 0
+        self.peak_waiting = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_seconds = 0.0
+        self._run_seconds = 0.0
+
+    async def _run(self, function, *args):
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+        if self._slots.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise PasswordHasherBusy()
+
+        queued_at = time.perf_counter()
+        self.waiting += 1
+        self.peak_waiting = max(self.peak_waiting, self.waiting)
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+
+        started_at = time.perf_counter()
+        self._wait_seconds += started_at - queued_at
+        self.running += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+        finally:
+            self.running -= 1
+            self.completed += 1
+            self._run_seconds += time.perf_counter() - started_at
+            self._slots.release()
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self.context.hash, password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return await self._run(self.context.verify, password, password_hash)
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_waiting": self.max_waiting,
+            "running": self.running,
+            "waiting": self.waiting,
+            "peak_waiting": self.peak_waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "average_wait_ms": 1000 * self._wait_seconds / self.completed if self.completed else 0.0,
+            "average_run_ms": 1000 * self._run_seconds / self.completed if self.completed else 0.0
+        }
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False)
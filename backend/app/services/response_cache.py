@@ -0,0 +1,88 @@
+from collections import OrderedDict
+from hashlib import blake2b
+from typing import Any, Callable, Hashable, Optional, Tuple
+import json
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+
+class CachedResponse:
+    """Serialized JSON body and its strong ETag, valid for one data version"""
+
+    __slots__ = ("version", "body", "etag")
+
+    def __init__(self, version: Hashable, body: bytes):
+        self.version = version
+        self.body = body
+        self.etag = '"' + blake2b(body, digest_size=16).hexdigest() + '"'
+
+def _serialize(payload: Any) -> bytes:
+    if isinstance(payload, BaseModel):
+        return payload.model_dump_json().encode("utf-8")
+    # Same encoding FastAPI's JSONResponse uses
+    return json.dumps(jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in if_none_match.split(","))
+
+class ResponseCache:
+    """
+    Serialized GET responses keyed by route and query parameters.
+
+    Entries are tagged with the data version they were built from and
+    rebuilt on first use after the version moves. A request whose
+    If-None-Match carries the current ETag gets an empty 304, so an
+    unchanged response costs a dict lookup and a string comparison.
+    """
+
+    def __init__(self, version: Callable[[], Hashable], max_entries: int = 1024):
+        self._version = version
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "not_modified": self.not_modified,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+    def lookup(self, key: Hashable, build: Callable[[], Any]) -> CachedResponse:
+        """The cached response for `key`, building and serializing it on a miss"""
+        version = self._version()
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return entry
+
+        self.misses += 1
+        entry = self._entries[key] = CachedResponse(version, _serialize(build()))
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return entry
+
+    def respond(self, request: Request, key: Tuple, build: Callable[[], Any]) -> Response:
+        """Serve `key` from the cache, honoring If-None-Match"""
+        entry = self.lookup(key, build)
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if _matches(request.headers.get("if-none-match"), entry.etag):
+            self.not_modified += 1
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
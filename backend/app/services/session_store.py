@@ -0,0 +1,99 @@
+from collections import OrderedDict
+import heapq
+import time
+from typing import List, Optional, Tuple
+
+class Session:
+    __slots__ = ("token", "user_id", "created_at", "expires_at")
+
+    def __init__(self, token: str, user_id: str, created_at: float, expires_at: float):
+        self.token = token
+        self.user_id = user_id
+        self.created_at = created_at
+        self.expires_at = expires_at
+
+class SessionStore:
+    """
+    Sessions by token with a sliding TTL and a hard cap on how many are kept.
+
+    Tokens live in an OrderedDict kept in least-recently-used order, so a
+    check is O(1) and, at the cap, the stalest session is evicted. Expiry
+    runs from a min-heap of deadlines: a session touched since its entry was
+    pushed is re-queued at its new deadline when the old one comes due, and
+    the heap is rebuilt whenever logouts and evictions leave it mostly stale.
+    """
+
+    def __init__(self, ttl_seconds: float = 86400, max_sessions: int = 100_000):
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._deadlines: List[Tuple[float, str]] = []
+        self.evicted = 0
+        self.expired = 0
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, token: str, user_id: str, now: Optional[float] = None) -> Session:
+        now = time.time() if now is None else now
+        session = Session(token, user_id, now, now + self.ttl_seconds)
+        self._sessions[token] = session
+        self._sessions.move_to_end(token)
+        heapq.heappush(self._deadlines, (session.expires_at, token))
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+        self._compact()
+        return session
+
+    def get(self, token: str, now: Optional[float] = None) -> Optional[Session]:
+        """The live session for a token, sliding its expiry forward; None if unknown or expired"""
+        session = self._sessions.get(token)
+        if session is None:
+            return None
+        now = time.time() if now is None else now
+        if session.expires_at <= now:
+            del self._sessions[token]
+            self.expired += 1
+            return None
+        session.expires_at = now + self.ttl_seconds
+        self._sessions.move_to_end(token)
+        return session
+
+    def delete(self, token: str) -> bool:
+        return self._sessions.pop(token, None) is not None
+
+    def expire(self, now: Optional[float] = None, limit: int = 10_000) -> int:
+        """Remove up to `limit` sessions whose deadline has passed; returns how many were removed"""
+        now = time.time() if now is None else now
+        removed = 0
+        deadlines = self._deadlines
+        while deadlines and deadlines[0][0] <= now and removed < limit:
+            _, token = heapq.heappop(deadlines)
+            session = self._sessions.get(token)
+            if session is None:
+                continue
+            if session.expires_at > now:
+                # Touched since this entry was queued: wait for the new deadline
+                heapq.heappush(deadlines, (session.expires_at, token))
+                continue
+            del self._sessions[token]
+            self.expired += 1
+            removed += 1
+        return removed
+
+    def _compact(self) -> None:
+        # Logged-out and evicted tokens leave entries behind; keep the heap within 2x the live sessions
+        if len(self._deadlines) > 2 * len(self._sessions) + 1024:
+            self._deadlines = [(session.expires_at, token) for token, session in self._sessions.items()]
+            heapq.heapify(self._deadlines)
+
+    def stats(self) -> dict:
+        return {
+            "sessions": len(self._sessions),
+            "max_sessions": self.max_sessions,
+            "ttl_seconds": self.ttl_seconds,
+            "pending_deadlines": len(self._deadlines),
+            "expired": self.expired,
+            "evicted": self.evicted
+        }
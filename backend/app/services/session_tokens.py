@@ -0,0 +1,116 @@
+from collections import OrderedDict
+import time
+import uuid
+from typing import Dict, Optional
+
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
+
+class InvalidToken(Exception):
+    """A session token that is malformed, badly signed, expired or revoked"""
+
+class SessionTokens:
+    """
+    Issues and verifies signed session tokens (JWTs carrying user id and expiry).
+
+    Any process holding the signing keys can verify a token without shared
+    state. Signing keys are parsed once into jose Key objects and picked by
+    the token's `kid`; tokens verified recently are remembered so repeat
+    checks skip the signature; logout records the token's `jti` in a
+    revocation map that forgets entries once the token would have expired.
+    """
+
+    def __init__(
+        self,
+        keys: Dict[str, str],
+        active_kid: str,
+        algorithm: str = "HS256",
+        ttl_seconds: float = 1800,
+        verified_cache_size: int = 4096
+    ):
+        self.algorithm = algorithm
+        self.ttl_seconds = ttl_seconds
+        self.active_kid = active_kid
+        self._secrets = dict(keys)
+        self._keys: Dict[str, Key] = {}
+        self.verified_cache_size = verified_cache_size
+        self._verified: "OrderedDict[str, dict]" = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+        self._revoked_purge_at = 1024
+
+    def _key(self, kid: str) -> Key:
+        """Parsed signing key for a kid, constructed on first use"""
+        key = self._keys.get(kid)
+        if key is None:
+            secret = self._secrets.get(kid)
+            if secret is None:
+                raise InvalidToken(f"Unknown signing key: {kid}")
+            key = self._keys[kid] = jwk.construct(secret, self.algorithm)
+        return key
+
+    def issue(self, user_id: str, now: Optional[float] = None) -> str:
+        now = time.time() if now is None else now
+        claims = {
+            "sub": user_id,
+            "iat": int(now),
+            "exp": int(now + self.ttl_seconds),
+            "jti": uuid.uuid4().hex[:16]
+        }
+        return jwt.encode(claims, self._key(self.active_kid), algorithm=self.algorithm, headers={"kid": self.active_kid})
+
+    def verify(self, token: str, now: Optional[float] = None) -> dict:
+        """Claims of a valid token; raises InvalidToken otherwise"""
+        now = time.time() if now is None else now
+        claims = self._verified.get(token)
+        if claims is None:
+            try:
+                kid = jwt.get_unverified_header(token).get("kid", self.active_kid)
+                if not isinstance(kid, str):
+                    raise InvalidToken("Malformed key id")
+                # Expiry is checked below against `now`, for cached and fresh tokens alike
+                claims = jwt.decode(token, self._key(kid), algorithms=[self.algorithm], options={"verify_exp": False})
+            except JWTError as exc:
+                raise InvalidToken(str(exc))
+            if not {"sub", "exp", "jti"} <= claims.keys():
+                raise InvalidToken("Token is missing required claims")
+            self._verified[token] = claims
+            if len(self._verified) > self.verified_cache_size:
+                self._verified.popitem(last=False)
+        else:
+            self._verified.move_to_end(token)
+
+        if claims["exp"] <= now:
+            self._verified.pop(token, None)
+            raise InvalidToken("Token has expired")
+        if claims["jti"] in self._revoked:
+            raise InvalidToken("Token has been revoked")
+        return claims
+
+    def revoke(self, token: str, now: Optional[float] = None) -> bool:
+        """Revoke a valid token until it expires; returns False if it was already unusable"""
+        now = time.time() if now is None else now
+        try:
+            claims = self.verify(token, now)
+        except InvalidToken:
+            return False
+        self._revoked[claims["jti"]] = claims["exp"]
+        self._verified.pop(token, None)
+        if len(self._revoked) >= self._revoked_purge_at:
+            self.purge_revocations(now)
+        return True
+
+    def purge_revocations(self, now: Optional[float] = None) -> int:
+        """Forget revocations of tokens that have expired anyway"""
+        now = time.time() if now is None else now
+        expired = [jti for jti, exp in self._revoked.items() if exp <= now]
+        for jti in expired:
+            del self._revoked[jti]
+        self._revoked_purge_at = max(1024, 2 * len(self._revoked))
+        return len(expired)
+
+    def stats(self) -> dict:
+        return {
+            "verified_cached": len(self._verified),
+            "revoked": len(self._revoked),
+            "keys": len(self._secrets)
+        }
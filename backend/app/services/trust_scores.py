@@ -0,0 +1,135 @@
+from typing import Dict, Iterable, List, Tuple
+
+import numpy as np
+
+# Share of the score lost to each behaviour at a rate of 100%
+DENIAL_WEIGHT = 0.4
+REVOCATION_WEIGHT = 0.35
+OUT_OF_CONSENT_WEIGHT = 0.25
+
+# Events needed before observed behaviour outweighs an org's baseline score
+PRIOR_WEIGHT = 20
+
+SUMMARY_PERCENTILES = (10, 25, 50, 75, 90)
+
+class TrustScoreEngine:
+    """
+    Trust scores on a 0-10 scale derived from how organizations behave.
+
+    Per-org counters (accesses, denials, approved accesses to data types the
+    user had not consented to, consents granted and revoked) are plain list
+    slots bumped as events arrive. recompute() turns them into NumPy arrays
+    and scores every org in one vectorized pass; each org's baseline score
+    acts as a prior, so orgs with little history stay close to it.
+    """
+
+    def __init__(self, baselines: Iterable[Tuple[str, float]] = ()):
+        self._rows: Dict[str, int] = {}
+        self.org_ids: List[str] = []
+        self._baselines: List[float] = []
+        self._accesses: List[int] = []
+        self._denied: List[int] = []
+        self._out_of_consent: List[int] = []
+        self._consents: List[int] = []
+        self._revoked: List[int] = []
+        self.scores = np.zeros(0)
+        for org_id, baseline in baselines:
+            self.set_baseline(org_id, baseline)
+        # Score the initial orgs now (their baselines, with no events yet), so
+        # readers never see the empty scores of an engine nobody has recomputed
+        self.recompute()
+
+    def __len__(self) -> int:
+        return len(self.org_ids)
+
+    def __contains__(self, org_id: str) -> bool:
+        return org_id in self._rows
+
+    def set_baseline(self, org_id: str, baseline: float) -> None:
+        """Start tracking an org (or reset its baseline); events for untracked orgs are ignored"""
+        row = self._rows.get(org_id)
+        if row is None:
+            row = self._rows[org_id] = len(self.org_ids)
+            self.org_ids.append(org_id)
+            self._baselines.append(baseline)
+            for counters in (self._accesses, self._denied, self._out_of_consent, self._consents, self._revoked):
+                counters.append(0)
+        else:
+            self._baselines[row] = baseline
+
+    def record_access(self, org_id: str, status: str, out_of_consent: bool = False) -> None:
+        row = self._rows.get(org_id)
+        if row is None:
+            return
+        self._accesses[row] += 1
+        if status == "denied":
+            self._denied[row] += 1
+        elif out_of_consent:
+            self._out_of_consent[row] += 1
+
+    def record_consent(self, org_id: str, granted: int = 0, revoked: int = 0) -> None:
+        row = self._rows.get(org_id)
+        if row is None:
+            return
+        self._consents[row] += granted
+        self._revoked[row] += revoked
+
+    def recompute(self) -> np.ndarray:
+        """Score every org from the current counters, rounded to one decimal; returns the rows whose score changed"""
+        accesses = np.array(self._accesses, dtype=np.float64)
+        consents = np.array(self._consents, dtype=np.float64)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            denial_ratio = np.where(accesses > 0, np.array(self._denied) / accesses, 0.0)
+            out_of_consent_ratio = np.where(accesses > 0, np.array(self._out_of_consent) / accesses, 0.0)
+            revocation_rate = np.where(consents > 0, np.array(self._revoked) / consents, 0.0)
+
+        observed = 10.0 * (1.0 - (
+            DENIAL_WEIGHT * denial_ratio
+            + REVOCATION_WEIGHT * revocation_rate
+            + OUT_OF_CONSENT_WEIGHT * out_of_consent_ratio
+        ))
+        evidence = accesses + consents
+        baselines = np.array(self._baselines, dtype=np.float64)
+        scores = (evidence * observed + PRIOR_WEIGHT * baselines) / (evidence + PRIOR_WEIGHT)
+        scores = np.clip(np.round(scores, 1), 0.0, 10.0)
+
+        previous = self.scores
+        changed = np.flatnonzero(scores[:len(previous)] != previous)
+        if len(scores) > len(previous):
+            changed = np.concatenate([changed, np.arange(len(previous), len(scores))])
+        self.scores = scores
+        return changed
+
+    def score(self, org_id: str) -> float:
+        row = self._rows.get(org_id)
+        return float(self.scores[row]) if row is not None and row < len(self.scores) else 0.0
+
+    def summary(self, org_ids: Iterable[str]) -> dict:
+        """Average, extremes, buckets and percentiles over the last recomputed scores of `org_ids`"""
+        # Rows added since the last recompute have no score yet
+        scored = len(self.scores)
+        rows = [row for row in map(self._rows.get, org_ids) if row is not None and row < scored]
+        scores = self.scores[np.array(rows, dtype=np.intp)] if rows else np.zeros(0)
+        if not len(scores):
+            return {"average": 0.0, "highest": 0.0, "lowest": 0.0, "distribution": {}, "percentiles": {}}
+
+        excellent, good, fair = (
+            int(np.count_nonzero(scores >= 9.0)),
+            int(np.count_nonzero((scores >= 7.5) & (scores < 9.0))),
+            int(np.count_nonzero((scores >= 6.0) & (scores < 7.5)))
+        )
+        return {
+            "average": float(scores.mean()),
+            "highest": float(scores.max()),
+            "lowest": float(scores.min()),
+            "distribution": {
+                "excellent": excellent,
+                "good": good,
+                "fair": fair,
+                "poor": len(scores) - excellent - good - fair
+            },
+            "percentiles": {
+                f"p{percentile}": round(float(value), 2)
+                for percentile, value in zip(SUMMARY_PERCENTILES, np.percentile(scores, SUMMARY_PERCENTILES))
+            }
+        }
@@ -0,0 +1,72 @@
+"""
+Memory benchmark: dict-per-row access logs vs the columnar store.
+
+Run from the backend directory:
+    python -m benchmarks.access_log_memory [rows]
+"""
+import json
+import sys
+import tracemalloc
+import uuid
+
+from app.services.access_log_columns import AccessLogColumns
+from app.services.access_log_index import AccessLogIndex
+
+ORGANIZATIONS = [
+    ("org_1", "First Bank Nigeria", "account_balance", "FirstBank-Mobile/2.1.0", "197.210.70.1"),
+    ("org_2", "MTN Nigeria", "phone", "MyMTN-App/3.2.1", "41.203.64.1"),
+    ("org_3", "Jumia", "shopping_cart", "Jumia-App/4.1.2", "154.113.16.1"),
+    ("org_4", "Paystack", "payment", "Paystack-Gateway/1.0", "52.31.139.75"),
+    ("org_5", "Flutterwave", "credit_card", "Flutterwave-API/3.0", "34.246.12.9")
+]
+DATA_TYPES = ["Transaction History", "Usage Data", "Payment Information", "Location Data", "Contact Info"]
+DETAILS = {org_id: (name, logo) for org_id, name, logo, _, _ in ORGANIZATIONS}
+
+def generate_logs(rows: int):
+    for i in range(rows):
+        org_id, name, logo, agent, ip = ORGANIZATIONS[i % len(ORGANIZATIONS)]
+        yield {
+            "id": f"log_{uuid.uuid4().hex[:8]}",
+            "user_id": f"user_{i % 10_000}",
+            "organization_id": org_id,
+            "organization_name": name,
+            "organization_logo": logo,
+            "data_type": DATA_TYPES[i % len(DATA_TYPES)],
+            "purpose": "Account verification",
+            "timestamp": f"2023-11-{1 + (i // 86400) % 28:02d}T{(i // 3600) % 24:02d}:{(i // 60) % 60:02d}:{i % 60:02d}Z",
+            "status": "denied" if i % 7 == 0 else "approved",
+            "ip_address": ip,
+            "user_agent": agent
+        }
+
+def measure(build) -> float:
+    tracemalloc.start()
+    kept = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del kept
+    return current / (1024 * 1024)
+
+def main():
+    rows = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    # Round-trip through JSON so every row owns its strings, as rows decoded from a request do
+    def build_dicts():
+        return [json.loads(json.dumps(log)) for log in generate_logs(rows)]
+
+    def build_columns():
+        index = AccessLogIndex(AccessLogColumns(lambda org_id: DETAILS.get(org_id, ("Unknown Organization", "business"))))
+        for i, log in enumerate(generate_logs(rows)):
+            index.add(log, 1_700_000_000 + i)
+        return index
+
+    dict_mb = measure(build_dicts)
+    columns_mb = measure(build_columns)
+
+    print(f"rows:               {rows:,}")
+    print(f"dict-of-strings:    {dict_mb:8.1f} MiB ({dict_mb * 1024 * 1024 / rows:6.0f} bytes/row)")
+    print(f"columnar + index:   {columns_mb:8.1f} MiB ({columns_mb * 1024 * 1024 / rows:6.0f} bytes/row)")
+    print(f"reduction:          {dict_mb / columns_mb:8.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Throughput benchmark for consent decisions (GET /consents/check and its batch form).
+
+Run from the backend directory:
+    python -m benchmarks.consent_checks [consents] [checks]
+"""
+import asyncio
+import random
+import sys
+import time
+
+from app.routes import consents
+from app.services.consent_decisions import ConsentDecisions
+from app.services.consent_repository import ConsentRepository
+
+ORGANIZATIONS = [f"org_{i}" for i in range(1, 51)]
+DATA_TYPES = [
+    "Personal Info", "Financial Data", "Transaction History", "Contact Info", "Usage Data",
+    "Location Data", "Purchase History", "Preferences", "Delivery Address", "Payment Info"
+]
+
+def generate_consents(count: int):
+    rng = random.Random(7)
+    for i in range(count):
+        yield {
+            "id": f"consent_{i}",
+            "user_id": f"user_{i % (count // 5 or 1)}",
+            "organization_id": rng.choice(ORGANIZATIONS),
+            "organization_name": "Benchmark Org",
+            "data_types": rng.sample(DATA_TYPES, 3),
+            "purpose": "Benchmark",
+            "status": "revoked" if i % 10 == 0 else "active",
+            "granted_at": "2024-01-15T10:30:00Z",
+            "revoked_at": None,
+            "expires_at": None
+        }
+
+def report(label: str, checks: int, seconds: float) -> None:
+    print(f"{label:<28} {checks / seconds:>12,.0f} checks/s  {seconds / checks * 1e6:6.2f} us/check")
+
+def main():
+    consent_count = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    check_count = int(sys.argv[2]) if len(sys.argv) > 2 else 100_000
+
+    started = time.perf_counter()
+    repository = ConsentRepository(generate_consents(consent_count))
+    decisions = ConsentDecisions(repository)
+    print(f"consents:                    {consent_count:,} ({len(decisions):,} user/org pairs, built in {time.perf_counter() - started:.1f}s)")
+
+    rng = random.Random(11)
+    users = consent_count // 5 or 1
+    checks = [
+        (f"user_{rng.randrange(users)}", rng.choice(ORGANIZATIONS), rng.choice(DATA_TYPES))
+        for _ in range(check_count)
+    ]
+
+    started = time.perf_counter()
+    allowed = sum(decisions.allowed(*check) for check in checks)
+    report("single (in-process)", check_count, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    decisions.allowed_many(checks)
+    report("batch (in-process)", check_count, time.perf_counter() - started)
+
+    # The route handlers, minus HTTP parsing; swap the benchmark decisions in
+    consents.CONSENT_DECISIONS = decisions
+    request = consents.ConsentCheckBatch(checks=[
+        {"user_id": user_id, "organization_id": organization_id, "data_type": data_type}
+        for user_id, organization_id, data_type in checks
+    ])
+
+    async def run_single():
+        for user_id, organization_id, data_type in checks:
+            await consents.check_consent(user_id, organization_id, data_type)
+
+    started = time.perf_counter()
+    asyncio.run(run_single())
+    report("GET /check handler", check_count, time.perf_counter() - started)
+
+    started = time.perf_counter()
+    asyncio.run(consents.check_consents(request))
+    report("POST /check/batch handler", check_count, time.perf_counter() - started)
+
+    print(f"allowed:                     {allowed:,} of {check_count:,}")
+
+if __name__ == "__main__":
+    main()
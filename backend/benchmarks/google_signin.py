@@ -0,0 +1,104 @@
+"""
+Google ID token verification against a local JWKS stand-in file.
+
+Generates RSA signing keys, writes them as a JWKS file, loads it through
+FileJwksSource and times verify() on freshly signed ID tokens. Also checks
+that bad tokens are rejected and that a rotated-in key is picked up by a
+refresh.
+
+Run from the backend directory:
+    python -m benchmarks.google_signin [tokens]
+"""
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from app.services.google_id_tokens import FileJwksSource, GoogleIdTokens, InvalidIdToken
+
+CLIENT_ID = "demo-client.apps.googleusercontent.com"
+
+def signing_key(kid: str):
+    """(private PEM, public JWK) for a fresh RSA key"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+    public_jwk.update({"kid": kid, "use": "sig", "alg": "RS256"})
+    return private_pem, public_jwk
+
+def id_token(private_pem, kid: str, i: int, **overrides) -> str:
+    now = int(time.time())
+    claims = {
+        "iss": "https://accounts.google.com",
+        "aud": CLIENT_ID,
+        "sub": str(100000 + i),
+        "email": f"user{i}@gmail.com",
+        "email_verified": True,
+        "iat": now,
+        "exp": now + 3600,
+        **overrides
+    }
+    return jwt.encode(claims, private_pem, algorithm="RS256", headers={"kid": kid})
+
+def expect_rejected(verifier: GoogleIdTokens, token: str, label: str) -> None:
+    try:
+        verifier.verify(token)
+    except InvalidIdToken as exc:
+        print(f"  rejected {label}: {exc}")
+    else:
+        raise AssertionError(f"{label} was accepted")
+
+async def run(tokens: int) -> None:
+    first_pem, first_jwk = signing_key("key-1")
+    second_pem, second_jwk = signing_key("key-2")
+    other_pem, _ = signing_key("key-1")
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "jwks.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"keys": [first_jwk]}, f)
+
+        verifier = GoogleIdTokens(FileJwksSource(path), audiences=[CLIENT_ID])
+        await verifier.refresh()
+
+        signed = [id_token(first_pem, "key-1", i) for i in range(tokens)]
+        timings = []
+        for token in signed:
+            started = time.perf_counter()
+            verifier.verify(token)
+            timings.append((time.perf_counter() - started) * 1_000_000)
+        timings.sort()
+        print(f"verified {tokens:,} ID tokens: p50 {statistics.median(timings):.0f} us  p99 {timings[int(0.99 * len(timings))]:.0f} us")
+
+        expect_rejected(verifier, id_token(other_pem, "key-1", 0), "wrong signature")
+        expect_rejected(verifier, id_token(first_pem, "key-1", 0, aud="someone-else"), "wrong audience")
+        expect_rejected(verifier, id_token(first_pem, "key-1", 0, iss="https://evil.example"), "wrong issuer")
+        expect_rejected(verifier, id_token(first_pem, "key-1", 0, exp=int(time.time()) - 3600), "expired")
+
+        # Rotation: a token signed with a new key is rejected until the keys are refreshed
+        rotated = id_token(second_pem, "key-2", 0)
+        expect_rejected(verifier, rotated, "unknown kid before refresh")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"keys": [first_jwk, second_jwk]}, f)
+        await verifier.refresh()
+        verifier.verify(rotated)
+        print(f"  accepted rotated key after refresh; stats {verifier.stats()}")
+
+def main():
+    tokens = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    asyncio.run(run(tokens))
+
+if __name__ == "__main__":
+    main()
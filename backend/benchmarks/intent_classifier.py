@@ -0,0 +1,104 @@
+"""
+Keyword intent classification: compiled single-pass matcher vs substring scans.
+
+Two cases:
+- the real YarnGPT table (INTENT_KEYWORDS/INTENT_RULES, en-ng) against the
+  hard-coded if/elif `any(keyword in text)` function it replaced;
+- a synthetic table of N intents (one keyword group each, several keywords
+  per group) against one `any(keyword in text)` scan per group.
+Both are run on a short question, a typical prompt and a 10 KB document,
+and each pair is checked to give the same answers.
+
+Run from the backend directory:
+    python -m benchmarks.intent_classifier [intents]
+"""
+import random
+import string
+import sys
+import time
+
+from app.routes.yarn_adapter import INTENT_CLASSIFIERS
+from app.services.intent_classifier import KeywordClassifier
+
+KEYWORDS_PER_INTENT = 6
+
+def original_classify(text: str) -> str:
+    """The hard-coded English classifier replaced by the keyword table"""
+    text_lower = text.lower()
+    if any(keyword in text_lower for keyword in ['explain', 'why', 'access', 'purpose', 'first bank', 'bank']):
+        if any(keyword in text_lower for keyword in ['bank', 'first bank', 'financial', 'loan', 'transaction']):
+            return 'banking_data'
+        elif any(keyword in text_lower for keyword in ['mtn', 'telecom', 'phone', 'network', 'usage']):
+            return 'telecom_data'
+        else:
+            return 'explain_access'
+    elif any(keyword in text_lower for keyword in ['rights', 'consent', 'withdraw', 'delete', 'revoke']):
+        return 'consent_rights'
+    else:
+        return 'default'
+
+def synthetic_table(intents: int, rng: random.Random):
+    groups = {
+        f"intent_{i}": [
+            "".join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) + rng.choice(["", " data", " access"])
+            for _ in range(KEYWORDS_PER_INTENT)
+        ]
+        for i in range(intents)
+    }
+    return groups, [(group, [group]) for group in groups]
+
+def scan_classify(text: str, groups: dict, rules: list) -> str:
+    """One substring scan of the text per keyword, groups checked in rule order"""
+    text_lower = text.lower()
+    for intent, required in rules:
+        if all(any(keyword in text_lower for keyword in groups[group]) for group in required):
+            return intent
+    return "default"
+
+def filler(rng: random.Random, length: int) -> str:
+    words = []
+    while sum(map(len, words)) + len(words) < length:
+        words.append("".join(rng.choices(string.ascii_lowercase, k=rng.randint(2, 9))))
+    return " ".join(words)
+
+def timed(function, text: str, repeat: int) -> float:
+    """Best of three runs, in seconds per call"""
+    best = float("inf")
+    for _ in range(3):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function(text)
+        best = min(best, (time.perf_counter() - started) / repeat)
+    return best
+
+def compare(label: str, compiled, scanned, texts) -> None:
+    for text, repeat in texts:
+        assert compiled(text) == scanned(text), "classifiers disagree"
+        compiled_seconds = timed(compiled, text, repeat)
+        scan_seconds = timed(scanned, text, repeat)
+        print(f"{label:12} {len(text):6} chars   compiled {compiled_seconds * 1e6:9.2f} us   scans {scan_seconds * 1e6:9.2f} us   ({scan_seconds / compiled_seconds:.2f}x)")
+
+def main():
+    intents = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    rng = random.Random(25)
+
+    compare("real table", INTENT_CLASSIFIERS["en-ng"].classify, original_classify, [
+        ("Tell me about data privacy policy.", 20_000),
+        ("Why did First Bank Nigeria access my transaction history last week, and who else can see it now?", 20_000),
+        (filler(rng, 10_000), 200)
+    ])
+
+    groups, rules = synthetic_table(intents, rng)
+    started = time.perf_counter()
+    classifier = KeywordClassifier(groups, rules)
+    print(f"compiled {intents} intents ({intents * KEYWORDS_PER_INTENT} keywords) in {(time.perf_counter() - started) * 1000:.1f} ms")
+    # Keywords of intents late in the table, so the scans can't stop early
+    late = [groups[f"intent_{i}"][0] for i in range(intents - 3, intents)]
+    compare(f"{intents} intents", classifier.classify, lambda text: scan_classify(text, groups, rules), [
+        (f"please tell me why {late[0]} happened", 500),
+        (f"why did they look at my {late[1]} last week, and who else can see it now", 500),
+        (filler(rng, 10_000) + " " + late[2], 10)
+    ])
+
+if __name__ == "__main__":
+    main()
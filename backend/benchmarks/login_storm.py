@@ -0,0 +1,99 @@
+"""
+Latency of unrelated endpoints during a login storm.
+
+Probes GET /orgs/{org_id} at a steady rate while many first-time logins
+(each hashing a new password) run at once, first with bcrypt on the
+password hashing pool (as the app does) and then with bcrypt called
+inline on the event loop, for comparison.
+
+Run from the backend directory:
+    python -m benchmarks.login_storm [logins] [concurrency]
+"""
+import asyncio
+import statistics
+import sys
+import time
+import uuid
+
+import httpx
+
+from app.main import app
+from app.routes import auth
+
+PROBE_INTERVAL = 0.01
+
+class InlineHasher:
+    """bcrypt on the event loop: what login would do without the pool"""
+
+    def __init__(self, context):
+        self.context = context
+
+    async def hash(self, password: str) -> str:
+        return self.context.hash(password)
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        return self.context.verify(password, password_hash)
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+async def probe(client: httpx.AsyncClient, stop: asyncio.Event, samples: list) -> None:
+    while not stop.is_set():
+        # Timed from when the request was due, so a stalled event loop counts against it
+        due = time.perf_counter() + PROBE_INTERVAL
+        await asyncio.sleep(PROBE_INTERVAL)
+        response = await client.get("/orgs/org_1")
+        response.raise_for_status()
+        samples.append((time.perf_counter() - due) * 1000)
+
+async def run(label: str, logins: int, concurrency: int) -> None:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        samples = []
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe(client, stop, samples))
+
+        # Baseline before the storm
+        await asyncio.sleep(1.0)
+        baseline = list(samples)
+        samples.clear()
+
+        semaphore = asyncio.Semaphore(concurrency)
+        statuses = []
+
+        # New emails, so every login registers and hashes its password
+        run_id = uuid.uuid4().hex[:8]
+        async def login(number: int):
+            async with semaphore:
+                response = await client.post("/auth/login", json={"email": f"storm.{run_id}.{number}@example.com", "password": "storm-password"})
+                statuses.append(response.status_code)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(login(number) for number in range(logins)))
+        storm_seconds = time.perf_counter() - started
+        stop.set()
+        await prober
+
+    storm = samples
+    print(f"{label}")
+    print(f"  logins:        {logins} in {storm_seconds:.1f}s, statuses {sorted(set(statuses))}")
+    print(f"  probe before:  p50 {statistics.median(baseline):6.1f} ms  p99 {percentile(baseline, 0.99):7.1f} ms  ({len(baseline)} requests)")
+    print(f"  probe storm:   p50 {statistics.median(storm):6.1f} ms  p99 {percentile(storm, 0.99):7.1f} ms  ({len(storm)} requests)")
+
+def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 40
+    concurrency = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+
+    pool = auth.PASSWORD_HASHER
+    asyncio.run(run("bcrypt on the hashing pool", logins, concurrency))
+    print(f"  pool stats:    {pool.stats()}")
+
+    auth.PASSWORD_HASHER = InlineHasher(pool.context)
+    try:
+        asyncio.run(run("bcrypt inline on the event loop", logins, concurrency))
+    finally:
+        auth.PASSWORD_HASHER = pool
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Organization search benchmark: index N synthetic orgs and time typical queries.
+
+Run from the backend directory:
+    python -m benchmarks.org_search [organizations]
+"""
+import random
+import sys
+import time
+
+from app.services.org_search import OrgSearchIndex
+
+CATEGORIES = ["Banking", "Telecommunications", "E-commerce", "Fintech", "Insurance", "Health", "Logistics"]
+WORDS = [
+    "first", "bank", "nigeria", "payments", "mobile", "money", "lagos", "abuja", "ọ̀yọ́", "kano",
+    "digital", "trust", "credit", "savings", "network", "market", "health", "care", "express", "global"
+]
+# Filler vocabulary so common words are common, not in every other org
+FILLER = [f"word{i}" for i in range(5000)]
+DATA_TYPES = ["Personal Info", "Financial Data", "Transaction History", "Contact Info", "Location Data", "Payment Info"]
+QUERIES = ["bank", "pay", "oyo", "first bank", "fin", "mobile money lagos", "health care", "zzz"]
+
+def generate_orgs(count: int):
+    rng = random.Random(5)
+    for i in range(count):
+        yield {
+            "id": f"org_{i}",
+            "name": f"{rng.choice(WORDS)} {rng.choice(FILLER)} {i}".title(),
+            "description": " ".join(rng.sample(WORDS, 1) + rng.sample(FILLER, 8)),
+            "category": rng.choice(CATEGORIES),
+            "dataTypes": rng.sample(DATA_TYPES, 2)
+        }
+
+def main():
+    organizations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+
+    started = time.perf_counter()
+    index = OrgSearchIndex(generate_orgs(organizations))
+    print(f"indexed {organizations:,} orgs in {time.perf_counter() - started:.2f}s")
+
+    for query in QUERIES:
+        started = time.perf_counter()
+        for _ in range(10):
+            results = index.search(query)
+        elapsed = (time.perf_counter() - started) / 10
+        print(f"{query!r:<24} {elapsed * 1000:8.2f} ms  top: {results[0][0] if results else '-'}")
+
+    started = time.perf_counter()
+    for org in generate_orgs(1000):
+        index.update({**org, "name": org["name"] + " Renamed"})
+    print(f"re-indexed 1,000 orgs in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Trust score recompute benchmark: score N organizations from random behaviour counters.
+
+Run from the backend directory:
+    python -m benchmarks.trust_scores [organizations] [events]
+"""
+import random
+import sys
+import time
+
+from app.services.trust_scores import TrustScoreEngine
+
+def main():
+    organizations = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    events = int(sys.argv[2]) if len(sys.argv) > 2 else 1_000_000
+
+    rng = random.Random(3)
+    org_ids = [f"org_{i}" for i in range(organizations)]
+    engine = TrustScoreEngine((org_id, round(rng.uniform(5.0, 9.5), 1)) for org_id in org_ids)
+
+    started = time.perf_counter()
+    for _ in range(events):
+        org_id = org_ids[rng.randrange(organizations)]
+        if rng.random() < 0.8:
+            engine.record_access(org_id, "denied" if rng.random() < 0.1 else "approved", out_of_consent=rng.random() < 0.02)
+        else:
+            engine.record_consent(org_id, granted=1, revoked=rng.random() < 0.15)
+    recorded = time.perf_counter() - started
+
+    started = time.perf_counter()
+    engine.recompute()
+    first = time.perf_counter() - started
+
+    for _ in range(1000):
+        engine.record_access(org_ids[rng.randrange(organizations)], "denied")
+    started = time.perf_counter()
+    changed = engine.recompute()
+    second = time.perf_counter() - started
+
+    started = time.perf_counter()
+    summary = engine.summary(org_ids)
+    summarized = time.perf_counter() - started
+
+    print(f"organizations:     {organizations:,}")
+    print(f"record events:     {events:,} in {recorded:.2f}s ({recorded / events * 1e6:.2f} us/event)")
+    print(f"recompute:         {first * 1000:8.1f} ms")
+    print(f"recompute (+1k):   {second * 1000:8.1f} ms ({len(changed):,} scores changed)")
+    print(f"summary:           {summarized * 1000:8.1f} ms")
+    print(f"percentiles:       {summary['percentiles']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import random
+import time
+
+import pytest
+
+from app.services.access_log_columns import MICROS
+from app.services.access_log_history import SegmentHistory
+from app.services.access_log_partitions import PartitionedAccessLogs
+from app.services.access_log_rollups import DAY_SECONDS, AccessLogRollups
+from app.services.access_log_segments import SegmentLog
+
+START = 1_700_000_000
+
+def _details(org_id: str):
+    return f"Name of {org_id}", "business"
+
+def random_logs(count: int, seed: int = 1):
+    rng = random.Random(seed)
+    for number in range(count):
+        timestamp = START + rng.randint(0, 20 * DAY_SECONDS) + rng.choice([0, 0.5, 0.000001])
+        yield {
+            "id": f"log_{number:06d}",
+            "user_id": rng.choice(["u1", "u2"]),
+            "organization_id": rng.choice(["org_1", "org_2", "org_3"]),
+            "data_type": rng.choice(["Usage Data", "Contact Info"]),
+            "purpose": "p",
+            "status": rng.choice(["approved", "denied", "pending"]),
+            "ip_address": None,
+            "user_agent": None
+        }, timestamp
+
+@pytest.fixture
+def stored(tmp_path):
+    logs = list(random_logs(1500))
+    segments = SegmentLog(str(tmp_path), max_segment_bytes=40_000, block_records=64)
+    segments.append((log, round(timestamp * MICROS)) for log, timestamp in logs)
+    rollups = AccessLogRollups()
+    for log, timestamp in logs:
+        rollups.add(log, timestamp)
+    yield logs, segments, rollups
+    segments.close()
+
+def test_history_pages_in_key_order(stored):
+    logs, segments, _ = stored
+    history = SegmentHistory(segments, _details)
+    expected = sorted((round(timestamp * MICROS), log["id"]) for log, timestamp in logs if log["user_id"] == "u1")
+    newest_first = [log["id"] for log in history.iter_recent("u1", float("-inf"))]
+    assert newest_first == [log_id for _, log_id in reversed(expected)]
+    since = START + 5 * DAY_SECONDS + 0.25
+    oldest_first = [log["id"] for log in history.iter_recent("u1", since, ascending=True)]
+    assert oldest_first == [log_id for micros, log_id in expected if micros >= round(since * MICROS)]
+
+@pytest.mark.parametrize("filters", [
+    {},
+    {"status": "denied"},
+    {"status": "pending"},
+    {"organization_id": "org_2"},
+    {"data_type": "Contact Info"},
+    {"status": "approved", "organization_id": "org_1"}
+])
+def test_count_from_rollups_matches_scanning(stored, filters):
+    _, segments, rollups = stored
+    scanning = SegmentHistory(segments, _details)
+    with_rollups = SegmentHistory(segments, _details, rollups)
+    rng = random.Random(2)
+    ranges = [(float("-inf"), START + 21 * DAY_SECONDS), (START + 3 * DAY_SECONDS, START + 4 * DAY_SECONDS)]
+    for _ in range(8):
+        since = START + rng.uniform(-DAY_SECONDS, 21 * DAY_SECONDS)
+        ranges.append((since, since + rng.uniform(0, 8 * DAY_SECONDS)))
+    for since, until in ranges:
+        for user_id in ("u1", "nobody"):
+            assert with_rollups.count(user_id, since, until, **filters) == scanning.count(user_id, since, until, **filters)
+
+def test_store_answers_the_same_across_memory_since(tmp_path):
+    now = time.time()
+    rng = random.Random(3)
+    logs = []
+    for log, _ in random_logs(1200, seed=4):
+        logs.append((log, now - rng.uniform(0, 12 * DAY_SECONDS)))
+    segments = SegmentLog(str(tmp_path), max_segment_bytes=30_000, block_records=32)
+    segments.append((log, round(timestamp * MICROS)) for log, timestamp in logs)
+    rollups = AccessLogRollups()
+    reference = PartitionedAccessLogs(_details)
+    hot = PartitionedAccessLogs(_details, history=SegmentHistory(segments, _details, rollups), memory_days=4)
+    for log, timestamp in logs:
+        rollups.add(log, timestamp)
+        reference.add(log, timestamp)
+        hot.add(log, timestamp)
+    assert 0 < len(hot) < len(reference)
+
+    def answers(store):
+        results = []
+        for since in (now - 30 * DAY_SECONDS, now - 6.5 * DAY_SECONDS, now - 2 * DAY_SECONDS):
+            for filters in ({}, {"status": "denied"}, {"organization_id": "org_3", "data_type": "Usage Data"}):
+                results.append(store.count("u1", since, **filters))
+                for ascending in (False, True):
+                    rows = list(store.iter_recent("u1", since, ascending=ascending, **filters))
+                    results.append(rows)
+                    if rows:
+                        middle = store.key_of(rows[len(rows) // 2])
+                        results.append(list(store.iter_recent("u1", since, before=middle, ascending=ascending, **filters)))
+                        results.append(list(store.iter_recent("u1", since, after=middle, ascending=ascending, **filters)))
+                results.append(list(store.iter_recent("u1", since, until=now - 3 * DAY_SECONDS, **filters)))
+        return results
+
+    expected = answers(reference)
+    assert answers(hot) == expected
+
+    # Ageing out two more days moves memory_since forward without changing any answer
+    memory_since = hot.memory_since
+    evicted = hot.evict(now + 2 * DAY_SECONDS)
+    assert evicted > 0 and hot.memory_since > memory_since
+    assert answers(hot) == expected
+    segments.close()
@@ -0,0 +1,88 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+USER_ID = "paging_user"
+
+@pytest.fixture(scope="module")
+def stored_ids():
+    """Ids of the user's logs newest first; five of them share one timestamp"""
+    now = datetime.now(timezone.utc)
+    timestamps = [now - timedelta(hours=hours) for hours in range(1, 16)] + [now - timedelta(hours=20)] * 5
+    logs = [
+        {
+            "user_id": USER_ID,
+            "organization_id": "org_1",
+            "data_type": "Usage Data",
+            "purpose": "Paging test",
+            "status": "approved",
+            "timestamp": timestamp.isoformat().replace("+00:00", "Z")
+        }
+        for timestamp in timestamps
+    ]
+    results = client.post("/access-logs/batch", json=logs).json()["results"]
+    keyed = sorted(zip(timestamps, (result["log_id"] for result in results)), reverse=True)
+    return [log_id for _, log_id in keyed]
+
+def page(**params):
+    response = client.get("/access-logs/", params={"user_id": USER_ID, **params})
+    assert response.status_code == 200
+    return response.json()
+
+def ids(body):
+    return [log["id"] for log in body["access_logs"]]
+
+def test_before_cursor_walks_every_log_once(stored_ids):
+    seen, cursor = [], None
+    while True:
+        body = page(limit=3, **({"before": cursor} if cursor else {}))
+        assert body["total"] == len(stored_ids)
+        seen += ids(body)
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == stored_ids
+
+def test_equal_timestamps_are_split_across_pages_by_id(stored_ids):
+    tied = stored_ids[-5:]
+    first = page(limit=17)
+    second = page(limit=2, before=first["next_cursor"])
+    third = page(limit=2, before=second["next_cursor"])
+    assert ids(first)[-2:] + ids(second) + ids(third) == tied
+    assert third["next_cursor"] is None
+
+def test_after_cursor_returns_the_logs_just_newer(stored_ids):
+    first = page(limit=4)
+    second = page(limit=4, before=first["next_cursor"])
+    back = page(limit=4, after=second["prev_cursor"])
+    assert ids(back) == ids(first)
+    assert back["prev_cursor"] == first["prev_cursor"]
+
+def test_cursors_round_trip(stored_ids):
+    middle = page(limit=5, before=page(limit=5)["next_cursor"])
+    assert ids(middle) == stored_ids[5:10]
+    # Each page's own cursors point at its oldest and newest logs
+    assert ids(page(limit=4, after=middle["next_cursor"])) == stored_ids[5:9]
+    assert ids(page(limit=4, before=middle["prev_cursor"])) == stored_ids[6:10]
+    assert ids(page(limit=5, before=middle["next_cursor"])) == stored_ids[10:15]
+
+def test_after_the_newest_log_is_empty(stored_ids):
+    newest = page(limit=1)
+    body = page(after=newest["prev_cursor"])
+    assert body["access_logs"] == []
+    assert body["prev_cursor"] == newest["prev_cursor"]
+    assert body["next_cursor"] is None
+
+@pytest.mark.parametrize("params", [
+    {"before": "not a cursor"},
+    {"after": "bm8tc2VwYXJhdG9y"},
+    {"before": "MXxsb2c=", "after": "MXxsb2c="}
+])
+def test_bad_cursors_are_rejected(params):
+    response = client.get("/access-logs/", params={"user_id": USER_ID, **params})
+    assert response.status_code == 400
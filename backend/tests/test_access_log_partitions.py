@@ -0,0 +1,120 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from app.services.access_log_history import SegmentHistory
+from app.services.access_log_partitions import WEEK_SECONDS, PartitionedAccessLogs
+from app.services.access_log_rollups import DAY_SECONDS
+from app.services.access_log_segments import SegmentLog
+
+# A Monday, 00:00 UTC
+MONDAY = datetime(2024, 1, 1, tzinfo=timezone.utc).timestamp()
+
+def _details(org_id: str):
+    return f"Name of {org_id}", "business"
+
+def make_log(number: int) -> dict:
+    return {
+        "id": f"log_{number:06d}",
+        "user_id": "u1",
+        "organization_id": "org_1",
+        "data_type": "Usage Data",
+        "purpose": "p",
+        "status": "approved",
+        "ip_address": None,
+        "user_agent": None
+    }
+
+def fill(store: PartitionedAccessLogs, timestamps) -> None:
+    for number, timestamp in enumerate(timestamps):
+        store.add(make_log(number), timestamp)
+
+def stored_ids(store: PartitionedAccessLogs) -> list:
+    return [row["id"] for row in store.iter_recent("u1", MONDAY - 400 * DAY_SECONDS, ascending=True)]
+
+def test_week_partitions_start_on_mondays():
+    store = PartitionedAccessLogs(_details, partition="week")
+    # Sunday night, Monday morning, Wednesday and the next Sunday
+    fill(store, [MONDAY - 60, MONDAY + 60, MONDAY + 2.5 * DAY_SECONDS, MONDAY + 6.9 * DAY_SECONDS])
+
+    assert [(partition.start, partition.end) for partition in store.partitions] == [
+        (MONDAY - WEEK_SECONDS, MONDAY),
+        (MONDAY, MONDAY + WEEK_SECONDS)
+    ]
+    assert [len(partition) for partition in store.partitions] == [1, 3]
+    for partition in store.partitions:
+        assert datetime.fromtimestamp(partition.start, timezone.utc).weekday() == 0
+
+def test_compact_merges_small_closed_partitions_up_to_the_span_limit():
+    store = PartitionedAccessLogs(_details, small_partition_rows=100)
+    # One log a day for 20 days; the last two days are still open
+    fill(store, [MONDAY + day * DAY_SECONDS + 3600 for day in range(20)])
+    before = stored_ids(store)
+    now = MONDAY + 18.5 * DAY_SECONDS
+
+    merged_away = store.compact(now)
+
+    spans = [partition.end - partition.start for partition in store.partitions]
+    assert spans == [7 * DAY_SECONDS, 7 * DAY_SECONDS, 4 * DAY_SECONDS, DAY_SECONDS, DAY_SECONDS]
+    assert all(span <= store.max_compacted_span for span in spans)
+    assert merged_away == 20 - len(store.partitions)
+    assert store._starts == [partition.start for partition in store.partitions]
+    assert stored_ids(store) == before
+    assert store.compact(now) == 0
+
+def test_compact_stops_at_the_row_limit():
+    store = PartitionedAccessLogs(_details, small_partition_rows=5)
+    # Three logs a day for four days
+    fill(store, [MONDAY + day * DAY_SECONDS + 60 * number for day in range(4) for number in range(3)])
+    before = stored_ids(store)
+
+    store.compact(MONDAY + 10 * DAY_SECONDS)
+
+    # No two days fit together, and a day at the limit is never merged with another
+    assert [len(partition) for partition in store.partitions] == [3, 3, 3, 3]
+
+    store.small_partition_rows = 6
+    store.compact(MONDAY + 10 * DAY_SECONDS)
+    assert [len(partition) for partition in store.partitions] == [6, 6]
+    assert stored_ids(store) == before
+
+def test_drop_expired_removes_whole_partitions_past_retention():
+    store = PartitionedAccessLogs(_details, retention_days=3)
+    fill(store, [MONDAY + day * DAY_SECONDS + 3600 for day in range(6)])
+
+    # Days ending at or before now - 3 days go; the partly expired one stays whole
+    assert store.drop_expired(MONDAY + 5.5 * DAY_SECONDS) == 2
+    assert store.partitions[0].start == MONDAY + 2 * DAY_SECONDS
+    assert stored_ids(store) == [f"log_{number:06d}" for number in range(2, 6)]
+    assert store._starts == [partition.start for partition in store.partitions]
+
+    assert PartitionedAccessLogs(_details).drop_expired(MONDAY + 1000 * DAY_SECONDS) == 0
+
+def test_evict_moves_memory_since_forward(tmp_path):
+    segments = SegmentLog(str(tmp_path))
+    store = PartitionedAccessLogs(_details, history=SegmentHistory(segments, _details), memory_days=3)
+    store.memory_since = MONDAY
+    fill(store, [MONDAY - 3600] + [MONDAY + day * DAY_SECONDS + 3600 for day in range(6)])
+    # Too old for memory; it lives in the segment files only
+    assert len(store) == 6
+
+    assert store.evict(MONDAY + 4.5 * DAY_SECONDS) == 1
+    assert store.memory_since == MONDAY + DAY_SECONDS
+    assert store.evict(MONDAY + 4.5 * DAY_SECONDS) == 0
+
+    assert store.evict(MONDAY + 6.5 * DAY_SECONDS) == 2
+    assert store.memory_since == MONDAY + 3 * DAY_SECONDS
+    assert store.partitions[0].start == store.memory_since
+    # Logs older than the new window are no longer taken into memory
+    store.add(make_log(99), MONDAY + 2 * DAY_SECONDS)
+    assert len(store) == 3
+    segments.close()
+
+@pytest.mark.parametrize("options", [{}, {"memory_days": 3}])
+def test_evict_is_a_no_op_without_history(options):
+    store = PartitionedAccessLogs(_details, **options)
+    fill(store, [MONDAY + day * DAY_SECONDS for day in range(5)])
+
+    assert store.evict(MONDAY + 100 * DAY_SECONDS) == 0
+    assert store.memory_since == float("-inf")
+    assert len(store) == 5
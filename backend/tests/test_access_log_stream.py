@@ -0,0 +1,121 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.routes import access_logs
+from app.services.access_log_columns import to_micros
+from app.services.access_log_feed import AccessLogFeed
+from app.services.access_log_index import decode_cursor, encode_cursor
+
+def record(user_id: str, count: int) -> list:
+    """Store `count` logs for a user a second apart, returning their (micros, id) keys in order"""
+    now = time.time()
+    entries = [
+        ({
+            "id": f"log_{user_id}_{number}",
+            "user_id": user_id,
+            "organization_id": "org_1",
+            "organization_name": "First Bank Nigeria",
+            "organization_logo": "bank",
+            "data_type": "Usage Data",
+            "purpose": "Stream test",
+            "timestamp": "",
+            "status": "approved",
+            "ip_address": None,
+            "user_agent": None
+        }, now - count + number)
+        for number in range(count)
+    ]
+    access_logs._record_access_logs(entries)
+    return [(to_micros(timestamp), log["id"]) for log, timestamp in entries]
+
+def event_key(event: str):
+    """The (micros, id) key of an access_log event"""
+    assert "event: access_log" in event
+    return decode_cursor(event.split("\n", 1)[0][len("id: "):])
+
+def test_last_event_id_replays_only_the_missed_logs():
+    async def scenario():
+        keys = record("stream_replay", 5)
+        events = access_logs._iter_stream_events("stream_replay", encode_cursor(keys[1]))
+        received = [event_key(await events.__anext__())]
+
+        # A live copy of a replayed log is skipped; new logs follow the replay
+        access_logs.ACCESS_LOG_FEED.publish("stream_replay", keys[3][1], lambda: "duplicate\n\n")
+        live = record("stream_replay", 1)
+        received.append(event_key(await events.__anext__()))
+        received.append(event_key(await events.__anext__()))
+        received.append(event_key(await events.__anext__()))
+
+        await events.aclose()
+        return keys, live, received
+
+    keys, live, received = asyncio.run(scenario())
+    assert received == keys[2:] + live
+    assert access_logs.ACCESS_LOG_FEED.subscriber_count == 0
+
+def test_replay_beyond_the_limit_ends_with_a_truncated_event(monkeypatch):
+    monkeypatch.setattr(access_logs, "STREAM_REPLAY_LIMIT", 3)
+
+    async def scenario():
+        keys = record("stream_truncated", 6)
+        events = [event async for event in access_logs._iter_stream_events("stream_truncated", encode_cursor(keys[0]))]
+        return keys, events
+
+    keys, events = asyncio.run(scenario())
+    assert [event_key(event) for event in events[:3]] == keys[1:4]
+    assert len(events) == 4
+    name, data = events[3].strip().split("\n")
+    assert name == "event: truncated"
+    # Paging from `after` picks up right behind the last replayed log
+    assert decode_cursor(json.loads(data[len("data: "):])["after"]) == keys[3]
+    assert access_logs.ACCESS_LOG_FEED.subscriber_count == 0
+
+def test_invalid_last_event_id_starts_with_live_events():
+    async def scenario():
+        record("stream_invalid", 2)
+        events = access_logs._iter_stream_events("stream_invalid", "not a cursor")
+        first = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0)
+        live = record("stream_invalid", 1)
+        received = event_key(await first)
+        await events.aclose()
+        return live, received
+
+    live, received = asyncio.run(scenario())
+    assert [received] == live
+
+def test_slow_consumer_is_dropped_after_draining_its_buffer(monkeypatch):
+    feed = AccessLogFeed(buffer_size=2)
+    monkeypatch.setattr(access_logs, "ACCESS_LOG_FEED", feed)
+
+    async def scenario():
+        events = access_logs._iter_stream_events("stream_slow", None)
+        first = asyncio.ensure_future(events.__anext__())
+        await asyncio.sleep(0)
+        assert feed.subscriber_count == 1
+        for number in range(3):
+            feed.publish("stream_slow", f"log_{number}", lambda number=number: f"event {number}\n\n")
+        return [await first] + [event async for event in events]
+
+    events = asyncio.run(scenario())
+    assert events == ["event 0\n\n", "event 1\n\n", "event: dropped\ndata: {}\n\n"]
+    assert feed.dropped_total == 1
+    assert feed.subscriber_count == 0
+
+def test_publish_only_encodes_for_listeners():
+    feed = AccessLogFeed(buffer_size=1)
+    feed.publish("nobody", "log_1", lambda: pytest.fail("encoded without subscribers"))
+
+    first, second = feed.subscribe("u1"), feed.subscribe("u1")
+    encoded = []
+    feed.publish("u1", "log_1", lambda: encoded.append(1) or "event")
+    assert encoded == [1]
+    assert first.queue.get_nowait() == ("log_1", "event")
+
+    # Only the subscriber whose buffer is still full is dropped
+    feed.publish("u1", "log_2", lambda: "event")
+    assert (first.dropped, second.dropped) == (False, True)
+    assert feed.subscriber_count == 1
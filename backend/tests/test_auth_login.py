@@ -0,0 +1,43 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+def login(email: str, password: str):
+    return client.post("/auth/login", json={"email": email, "password": password})
+
+def test_demo_user_logs_in_with_its_password():
+    response = login("demo@trustbase.ng", "demo123")
+    assert response.status_code == 200
+    assert response.json()["user"]["id"] == "demo_user_1"
+
+def test_known_user_accepts_any_password_of_six_or_more_characters():
+    assert login("demo@trustbase.ng", "something-else").json()["user"]["id"] == "demo_user_1"
+
+def test_google_account_can_use_email_login():
+    assert login("adaora.okafor@gmail.com", "x").json()["user"]["id"] == "demo_google_user"
+
+def test_short_wrong_password_is_rejected():
+    assert login("demo@trustbase.ng", "abc").status_code == 401
+
+def test_new_email_is_registered_and_can_return_with_another_password():
+    first = login("new.person@example.com", "first-password").json()["user"]
+    again = login("new.person@example.com", "second-password").json()["user"]
+    assert again["id"] == first["id"]
+    assert (first["firstName"], first["lastName"]) == ("New", "Person")
+
+def test_new_email_needs_six_characters():
+    assert login("short.one@example.com", "abc").status_code == 401
+
+def test_legacy_demo_token_does_not_expire():
+    from app.routes.auth import SESSIONS
+    assert SESSIONS.get("demo_google_token_456", now=4_000_000_000).user_id == "demo_google_user"
+    response = client.post("/auth/session-check", json={"token": "demo_google_token_456"})
+    assert response.json()["user"]["id"] == "demo_google_user"
+
+def test_login_token_is_signed_not_stored():
+    from app.routes.auth import SESSIONS
+    token = login("demo@trustbase.ng", "demo123").json()["token"]
+    assert token.count(".") == 2 and SESSIONS.get(token) is None
+    assert client.get("/auth/me", headers={"Authorization": f"Bearer {token}"}).json()["user"]["id"] == "demo_user_1"
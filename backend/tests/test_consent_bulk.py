@@ -0,0 +1,52 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.routes import consents
+
+client = TestClient(app)
+
+def operation(action: str, organization_id: str = "org_2", **fields) -> dict:
+    if action == "grant":
+        fields.setdefault("data_types", ["Usage Data"])
+        fields.setdefault("purpose", "Bulk test")
+    return {"action": action, "user_id": "bulk_user", "organization_id": organization_id, **fields}
+
+def test_bulk_logs_every_event_before_applying_any(monkeypatch):
+    appended = []
+    append = consents.CONSENT_EVENTS.append
+
+    def checked_append(events):
+        # Nothing in the batch may have reached memory before it is logged
+        appended.append([consents.CONSENTS.get(event["consent_id"]) for event in events if event["action"] == "granted"])
+        append(events)
+
+    monkeypatch.setattr(consents.CONSENT_EVENTS, "append", checked_append)
+    response = client.post("/consents/bulk", json={"operations": [
+        operation("grant"),
+        operation("grant", data_types=["Contact Info"]),
+        operation("revoke"),
+        operation("revoke"),
+        operation("revoke"),
+        operation("grant", purpose=None),
+        operation("grant", organization_id="org_3")
+    ]})
+
+    assert response.status_code == 200
+    body = response.json()
+    assert appended == [[None, None, None]]
+    assert (body["succeeded"], body["failed"]) == (5, 2)
+
+    results = body["results"]
+    first, second = results[0]["consent_id"], results[1]["consent_id"]
+    # Revokes take the oldest consent still active at their point in the batch
+    assert [result["consent_id"] for result in results[2:4]] == [first, second]
+    assert [result["success"] for result in results] == [True, True, True, True, False, False, True]
+    assert results[4]["error"] == "Active consent not found"
+
+    assert consents.CONSENTS.get(first)["status"] == "revoked"
+    assert consents.CONSENTS.get(second)["status"] == "revoked"
+    assert consents.CONSENTS.get(results[6]["consent_id"])["status"] == "active"
+    assert [event["data_types"] for event in consents.CONSENT_EVENTS.history(second)] == [["Contact Info"]] * 2
+    assert consents.CONSENT_COUNTERS.drift(consents.CONSENTS) == {}
+    assert not consents.CONSENT_DECISIONS.allowed("bulk_user", "org_2", "Usage Data")
+    assert consents.CONSENT_DECISIONS.allowed("bulk_user", "org_3", "Usage Data")
@@ -0,0 +1,97 @@
+import asyncio
+import os
+
+import pytest
+
+from app.services.consent_events import EVENTS_FILE, ConsentEventLog, apply_event
+from app.services.consent_repository import ConsentRepository
+
+def granted(consent_id: str, user_id: str = "u1", data_types=("Usage Data",)) -> dict:
+    return {
+        "consent_id": consent_id,
+        "action": "granted",
+        "user_id": user_id,
+        "organization_id": "org_1",
+        "organization_name": "First Bank Nigeria",
+        "data_types": list(data_types),
+        "purpose": "p",
+        "timestamp": "2024-01-01T00:00:00Z"
+    }
+
+def changed(consent_id: str, action: str, **fields) -> dict:
+    return {"consent_id": consent_id, "action": action, "timestamp": "2024-02-01T00:00:00Z", **fields}
+
+def record(log: ConsentEventLog, repository: ConsentRepository, events: list) -> None:
+    log.append(events)
+    for event in events:
+        apply_event(repository, event)
+
+def state(repository: ConsentRepository) -> dict:
+    return {consent["id"]: dict(consent) for consent in repository}
+
+def reopen(directory: str):
+    log = ConsentEventLog(directory)
+    repository = ConsentRepository()
+    assert log.load(repository)
+    return log, repository
+
+BEFORE_SNAPSHOT = [granted("c1"), granted("c2"), granted("c3", user_id="u2"), changed("c1", "revoked")]
+AFTER_SNAPSHOT = [
+    changed("c2", "updated", data_types=["Contact Info"]),
+    granted("c4"),
+    changed("c3", "expired"),
+    changed("c4", "revoked")
+]
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_load_replays_events_written_after_the_snapshot(tmp_path, incremental):
+    log, repository = ConsentEventLog(str(tmp_path)), ConsentRepository()
+    record(log, repository, BEFORE_SNAPSHOT)
+    if incremental:
+        snapshot = asyncio.run(log.snapshot_state_incrementally(repository, chunk_size=1))
+    else:
+        snapshot = log.snapshot_state(repository)
+    log.write_snapshot(snapshot)
+    record(log, repository, AFTER_SNAPSHOT)
+    expected = state(repository)
+    histories = {consent_id: log.history(consent_id) for consent_id in expected}
+    log.close()
+
+    log, restored = reopen(str(tmp_path))
+    assert state(restored) == expected
+    assert expected["c2"]["data_types"] == ["Contact Info"]
+    assert [consent["status"] for consent in restored.find("u1")] == ["revoked", "active", "revoked"]
+    assert {consent_id: log.history(consent_id) for consent_id in expected} == histories
+    assert log.count == len(BEFORE_SNAPSHOT) + len(AFTER_SNAPSHOT)
+    assert log.count_at_snapshot == len(BEFORE_SNAPSHOT)
+    log.close()
+
+def test_load_drops_a_partial_last_line(tmp_path):
+    log, repository = ConsentEventLog(str(tmp_path)), ConsentRepository()
+    record(log, repository, BEFORE_SNAPSHOT)
+    expected = state(repository)
+    log.close()
+
+    path = os.path.join(str(tmp_path), EVENTS_FILE)
+    size = os.path.getsize(path)
+    with open(path, "ab") as events_file:
+        events_file.write(b'{"consent_id":"c2","action":"rev')
+
+    log, restored = reopen(str(tmp_path))
+    assert state(restored) == expected
+    assert os.path.getsize(path) == size
+    assert log.count == len(BEFORE_SNAPSHOT)
+
+    # Later appends start on a clean line and survive another reload
+    record(log, restored, [changed("c2", "revoked")])
+    log.close()
+    log, reloaded = reopen(str(tmp_path))
+    assert reloaded.get("c2")["status"] == "revoked"
+    assert [event["action"] for event in log.history("c2")] == ["granted", "revoked"]
+    log.close()
+
+def test_load_reports_an_empty_directory(tmp_path):
+    log = ConsentEventLog(str(tmp_path))
+    assert not log.load(ConsentRepository())
+    log.close()
+    assert not ConsentEventLog().load(ConsentRepository())
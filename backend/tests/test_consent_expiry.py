@@ -0,0 +1,107 @@
+import time
+import uuid
+
+from app.routes import consents
+from app.services.access_log_index import parse_timestamp
+from app.services.consent_expiry import ConsentExpiryQueue
+from app.services.consent_repository import ConsentRepository
+
+def consent(consent_id: str, expires_at, status: str = "active") -> dict:
+    return {
+        "id": consent_id,
+        "user_id": "u1",
+        "organization_id": f"org_{consent_id}",
+        "organization_name": "Org",
+        "data_types": ["Usage Data"],
+        "purpose": "p",
+        "status": status,
+        "granted_at": "2024-01-01T00:00:00Z",
+        "revoked_at": None,
+        "expires_at": expires_at
+    }
+
+def test_pop_due_returns_consents_in_expiry_order_up_to_the_limit():
+    repository = ConsentRepository([
+        consent("c1", "2024-03-01T00:00:00Z"),
+        consent("c2", "2024-01-15T00:00:00Z"),
+        consent("c3", "2024-02-01T00:00:00Z"),
+        consent("c4", None),
+        consent("c5", "2024-01-20T00:00:00Z", status="revoked")
+    ])
+    queue = ConsentExpiryQueue(repository, repository)
+    queue.schedule(consent("c6", "2024-01-10T00:00:00Z"))
+    repository.add(consent("c6", "2024-01-10T00:00:00Z"))
+
+    # Consents without an expiry or that are not active are never queued
+    assert len(queue) == 4
+    assert queue.next_due() == parse_timestamp("2024-01-10T00:00:00Z")
+
+    march = parse_timestamp("2024-03-01T00:00:00Z")
+    assert [due["id"] for due in queue.pop_due(march, limit=2)] == ["c6", "c2"]
+    assert [due["id"] for due in queue.pop_due(march - 1, limit=10)] == ["c3"]
+    assert [due["id"] for due in queue.pop_due(march, limit=10)] == ["c1"]
+    assert queue.next_due() is None
+
+def test_pop_due_skips_revoked_and_redated_consents():
+    repository = ConsentRepository([
+        consent("c1", "2024-01-10T00:00:00Z"),
+        consent("c2", "2024-01-11T00:00:00Z"),
+        consent("c3", "2024-01-12T00:00:00Z")
+    ])
+    queue = ConsentExpiryQueue(repository, repository)
+    repository.update("c1", status="revoked", revoked_at="2024-01-05T00:00:00Z")
+    # Given a later expiry: the old entry is stale, the new one waits its turn
+    repository.update("c2", expires_at="2024-06-01T00:00:00Z")
+    queue.schedule(repository.get("c2"))
+
+    assert [due["id"] for due in queue.pop_due(parse_timestamp("2024-02-01T00:00:00Z"), limit=1)] == ["c3"]
+    assert len(queue) == 1
+    assert [due["id"] for due in queue.pop_due(parse_timestamp("2024-06-01T00:00:00Z"), limit=10)] == ["c2"]
+
+def grant(user_id: str, organization_id: str, expires_at: str) -> str:
+    consent_id = f"consent_{uuid.uuid4().hex[:8]}"
+    consents._record_consent_events([{
+        "id": f"history_{uuid.uuid4().hex[:8]}",
+        "consent_id": consent_id,
+        "action": "granted",
+        "timestamp": "2024-01-01T00:00:00",
+        "data_types": ["Usage Data"],
+        "reason": "Expiry test",
+        "user_id": user_id,
+        "organization_id": organization_id,
+        "organization_name": consents.ORG_CATALOG.name(organization_id),
+        "purpose": "Expiry test",
+        "expires_at": expires_at
+    }])
+    return consent_id
+
+def test_expire_due_consents_updates_counters_and_decisions():
+    user_id = "expiry_user"
+    expired_id = grant(user_id, "org_1", "2024-01-02T00:00:00")
+    revoked_id = grant(user_id, "org_2", "2024-01-02T00:00:00")
+    future_id = grant(user_id, "org_3", "2999-01-01T00:00:00")
+    consents._record_consent_events([{
+        "id": f"history_{uuid.uuid4().hex[:8]}",
+        "consent_id": revoked_id,
+        "action": "revoked",
+        "timestamp": "2024-01-01T12:00:00",
+        "data_types": ["Usage Data"],
+        "reason": "Expiry test"
+    }])
+    assert consents.CONSENT_DECISIONS.allowed(user_id, "org_1", "Usage Data")
+
+    # Drain everything due, whatever other tests left in the shared queue
+    while consents.expire_due_consents(time.time(), batch_size=100):
+        pass
+
+    assert consents.CONSENTS.get(expired_id)["status"] == "expired"
+    assert consents.CONSENTS.get(revoked_id)["status"] == "revoked"
+    assert consents.CONSENTS.get(future_id)["status"] == "active"
+    assert not consents.CONSENT_DECISIONS.allowed(user_id, "org_1", "Usage Data")
+    assert consents.CONSENT_DECISIONS.allowed(user_id, "org_3", "Usage Data")
+    assert consents.CONSENT_COUNTERS.summary(user_id) == {
+        "total": 3, "active": 1, "revoked": 1, "expired": 1, "organizations": 3
+    }
+    assert consents.CONSENT_COUNTERS.drift(consents.CONSENTS) == {}
+    assert [event["action"] for event in consents.CONSENT_EVENTS.history(expired_id)] == ["granted", "expired"]
+    assert [event["action"] for event in consents.CONSENT_EVENTS.history(revoked_id)] == ["granted", "revoked"]
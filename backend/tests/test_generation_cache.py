@@ -0,0 +1,115 @@
+import asyncio
+import gc
+
+import pytest
+
+from app.services.generation_cache import GenerationCache
+
+KEY = ("en-ng", "banking_data", "default")
+
+class Generator:
+    """A generation step that waits until released and counts its runs"""
+
+    def __init__(self, value="response", error=None):
+        self.value = value
+        self.error = error
+        self.runs = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.runs += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+def test_concurrent_misses_share_one_generation():
+    async def scenario():
+        cache, generate = GenerationCache(), Generator()
+        waiters = [asyncio.ensure_future(cache.get_or_generate(KEY, generate)) for _ in range(3)]
+        await asyncio.sleep(0)
+        generate.release.set()
+        results = await asyncio.gather(*waiters)
+        return cache, generate, results
+
+    cache, generate, results = asyncio.run(scenario())
+    assert results == [("response", False)] * 3
+    assert generate.runs == 1
+    assert cache.get(KEY) == "response"
+
+def test_cancelling_the_first_waiter_leaves_the_generation_to_the_others():
+    async def scenario():
+        cache, generate = GenerationCache(), Generator()
+        first = asyncio.ensure_future(cache.get_or_generate(KEY, generate))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get_or_generate(KEY, generate))
+        await asyncio.sleep(0)
+
+        # The request that started generating goes away (client disconnect)
+        first.cancel()
+        await asyncio.sleep(0)
+        generate.release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return cache, generate, await second
+
+    cache, generate, result = asyncio.run(scenario())
+    assert result == ("response", False)
+    assert generate.runs == 1
+    assert cache.get(KEY) == "response"
+
+def test_generation_finishes_and_is_cached_when_every_waiter_is_cancelled():
+    async def scenario():
+        cache, generate = GenerationCache(), Generator()
+        waiter = asyncio.ensure_future(cache.get_or_generate(KEY, generate))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        generate.release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        return cache, generate, await cache.get_or_generate(KEY, generate)
+
+    cache, generate, result = asyncio.run(scenario())
+    assert result == ("response", True)
+    assert generate.runs == 1
+    assert not cache._pending
+
+def test_failures_reach_every_waiter_and_are_not_cached():
+    async def scenario():
+        cache, generate = GenerationCache(), Generator(error=RuntimeError("generation failed"))
+        waiters = [asyncio.ensure_future(cache.get_or_generate(KEY, generate)) for _ in range(2)]
+        await asyncio.sleep(0)
+        generate.release.set()
+        results = await asyncio.gather(*waiters, return_exceptions=True)
+
+        generate.error = None
+        return cache, generate, results, await cache.get_or_generate(KEY, generate)
+
+    cache, generate, results, retried = asyncio.run(scenario())
+    assert [str(result) for result in results] == ["generation failed"] * 2
+    assert retried == ("response", False)
+    assert generate.runs == 2
+
+def test_a_failure_nobody_waits_for_is_not_reported_as_unretrieved():
+    reported = []
+
+    async def scenario():
+        asyncio.get_running_loop().set_exception_handler(lambda loop, context: reported.append(context))
+        cache, generate = GenerationCache(), Generator(error=RuntimeError("generation failed"))
+        waiter = asyncio.ensure_future(cache.get_or_generate(KEY, generate))
+        await asyncio.sleep(0)
+        waiter.cancel()
+        # Fail only once the cancelled waiter has stopped listening
+        for _ in range(3):
+            await asyncio.sleep(0)
+        generate.release.set()
+        for _ in range(3):
+            await asyncio.sleep(0)
+        del waiter
+        # The failed task is finalized here, while the loop's handler is set
+        gc.collect()
+        return cache
+
+    cache = asyncio.run(scenario())
+    assert not cache._pending
+    assert reported == []
@@ -0,0 +1,66 @@
+import base64
+import json
+
+import pytest
+from jose import jwt
+
+from app.services.google_id_tokens import GoogleIdTokens, InvalidIdToken
+
+def _segment(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+
+def _token_with_header(header) -> str:
+    return ".".join([_segment(header), _segment({"sub": "1", "aud": "client", "iss": "accounts.google.com"}), "c2ln"])
+
+@pytest.fixture
+def id_tokens():
+    verifier = GoogleIdTokens(source=None, audiences=["client"])
+    verifier.load({"keys": [{"kty": "oct", "kid": "g1", "alg": "HS256", "k": base64.urlsafe_b64encode(b"signing-secret").rstrip(b"=").decode()}]})
+    return verifier
+
+@pytest.mark.parametrize("kid", [["g1"], {"kid": "g1"}, 1, None])
+def test_non_string_kid_is_invalid(id_tokens, kid):
+    with pytest.raises(InvalidIdToken):
+        id_tokens.verify(_token_with_header({"alg": "HS256", "kid": kid}))
+    assert id_tokens.rejected == 1
+
+@pytest.mark.parametrize("token", ["not-a-token", _token_with_header(["HS256"]), "." * 2])
+def test_malformed_header_is_invalid(id_tokens, token):
+    with pytest.raises(InvalidIdToken):
+        id_tokens.verify(token)
+
+NOW = 1_700_000_000
+
+def _signed(**claims) -> str:
+    claims = {"sub": "1", "email": "ada@example.com", "aud": "client", "iss": "accounts.google.com", "exp": NOW + 600, "iat": NOW, **claims}
+    claims = {name: value for name, value in claims.items() if value is not None}
+    return jwt.encode(claims, "signing-secret", algorithm="HS256", headers={"kid": "g1"})
+
+def test_valid_token_is_verified(id_tokens):
+    assert id_tokens.verify(_signed(aud=["other", "client"]), now=NOW)["email"] == "ada@example.com"
+    assert id_tokens.verify(_signed(iat=None), now=NOW)["sub"] == "1"
+    assert (id_tokens.verified, id_tokens.rejected) == (2, 0)
+
+@pytest.mark.parametrize("claims", [
+    {"aud": 7},
+    {"aud": [["client"]]},
+    {"aud": {"client": True}},
+    {"aud": "other"},
+    {"exp": "9999999999"},
+    {"exp": True},
+    {"exp": None},
+    {"exp": NOW - 3600},
+    {"iat": "0"},
+    {"iat": [NOW]},
+    {"iat": {"at": NOW}},
+    {"iat": NOW + 3600},
+    {"sub": 1},
+    {"sub": ["1"]},
+    {"sub": None},
+    {"email": {"address": "ada@example.com"}},
+    {"email": ""}
+])
+def test_claims_of_the_wrong_type_or_value_are_invalid(id_tokens, claims):
+    with pytest.raises(InvalidIdToken):
+        id_tokens.verify(_signed(**claims), now=NOW)
+    assert (id_tokens.verified, id_tokens.rejected) == (0, 1)
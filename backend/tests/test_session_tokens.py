@@ -0,0 +1,34 @@
+import base64
+import json
+
+import pytest
+
+from app.services.session_tokens import InvalidToken, SessionTokens
+
+def _segment(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).rstrip(b"=").decode()
+
+def _token_with_header(header: dict) -> str:
+    return ".".join([_segment(header), _segment({"sub": "user_1", "exp": 2_000_000_000, "jti": "abc"}), "c2ln"])
+
+@pytest.fixture
+def tokens():
+    return SessionTokens({"k1": "secret-one", "k2": "secret-two"}, active_kid="k2")
+
+def test_issued_token_verifies(tokens):
+    assert tokens.verify(tokens.issue("user_1"))["sub"] == "user_1"
+
+@pytest.mark.parametrize("kid", [["k1"], {"kid": "k1"}, 1, None])
+def test_non_string_kid_is_invalid(tokens, kid):
+    with pytest.raises(InvalidToken):
+        tokens.verify(_token_with_header({"alg": "HS256", "typ": "JWT", "kid": kid}))
+
+@pytest.mark.parametrize("token", [
+    "not-a-token",
+    _token_with_header(["HS256"]),
+    _token_with_header({"alg": "HS256", "kid": "missing"}),
+    "." * 2
+])
+def test_malformed_header_is_invalid(tokens, token):
+    with pytest.raises(InvalidToken):
+        tokens.verify(token)
@@ -0,0 +1,16 @@
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.services.trust_scores import TrustScoreEngine
+
+def test_new_engine_scores_its_baselines():
+    engine = TrustScoreEngine([("org_a", 8.0), ("org_b", 6.5)])
+    assert engine.score("org_a") == 8.0
+    summary = engine.summary(["org_a", "org_b"])
+    assert (summary["highest"], summary["lowest"]) == (8.0, 6.5)
+
+def test_summary_before_first_refresh_is_not_all_zero():
+    # Without the startup event the refresh task never runs
+    response = TestClient(app).get("/orgs/trust-scores/summary")
+    assert response.status_code == 200
+    assert response.json()["lowest"] > 0